@@ -2,17 +2,57 @@
 Point d'entrée principal de l'application.
 
 Ce module crée et exécute l'application de détection et de suivi.
+
+Utilisation:
+    python __main__.py                       # Traitement avec affichage
+    python __main__.py --replay video.mp4    # Relecture sans affichage d'une course enregistrée
 """
 
-from src.application import Application 
-import cProfile
+# Importé en premier: référence du temps de démarrage
+from src.startup_metrics import mark_startup_event
+
+import argparse
+from datetime import datetime
+
+def parse_arguments():
+    """
+    Analyse les arguments de la ligne de commande.
+
+    Returns:
+        argparse.Namespace: replay, batch_size, start_time, profile et trace
+    """
+    parser = argparse.ArgumentParser(description="Comptage des passages sur la ligne d'arrivée")
+    parser.add_argument("--replay", metavar="VIDEO",
+                        help="Relit la vidéo au plus vite, sans affichage, en n'écrivant que les passages")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="Frames par lot d'inférence en relecture (défaut: 1)")
+    parser.add_argument("--start-time", type=lambda value: datetime.strptime(value, "%Y-%m-%d %H:%M:%S"),
+                        help="Heure de la première frame en relecture, \"AAAA-MM-JJ HH:MM:SS\" "
+                             "(défaut: estimée d'après la date du fichier)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Chronomètre chaque étape et affiche p50/p95/p99 à la fermeture")
+    parser.add_argument("--trace", metavar="FICHIER",
+                        help="Avec --profile, exporte les intervalles au format Chrome trace (JSON)")
+    return parser.parse_args()
 
 def main():
     """Fonction principale du programme."""
+    arguments = parse_arguments()
+    if arguments.profile:
+        from src.stage_profiler import enable_profiling
+        enable_profiling(arguments.trace)
+    
+    if arguments.replay:
+        from src.replay import run_replay, print_replay_stats
+        mark_startup_event('imports')
+        print_replay_stats(run_replay(arguments.replay, max(1, arguments.batch_size), arguments.start_time))
+        return
+
+    from src.application import Application
+    mark_startup_event('imports')
     app = Application()
     app.run()
 
 # Point d'entrée du programme
 if __name__ == "__main__":
-    #cProfile.run('main()')
-    main()
\ No newline at end of file
+    main()
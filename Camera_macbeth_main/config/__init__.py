@@ -11,6 +11,7 @@ from .detection_config import *
 from .display_config import *
 from .storage_config import *
 from .color_config import *
+from .performance_config import *
 
 # Variables globales partagées
 VIDEO_OUTPUT_WRITER = None
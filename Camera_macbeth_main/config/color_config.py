@@ -24,6 +24,20 @@ COLOR_HISTORY_SIZE = 2
 
 # Paramètres d'optimisation de la correction des couleurs
 COLOR_CORRECTION_INTERVAL = 300  # Effectue la correction toutes les 300 frames
+COLOR_CORRECTION_LUT_SIZE = 65   # Nœuds par axe de la LUT 3D (256 = table complète, 0 = calcul direct)
+COLOR_CORRECTION_MODEL = 'gamma'  # 'gamma', 'affine', 'polynomial' ou 'root_polynomial' (voir color_correction_models)
+COLOR_CALIBRATION_MAX_NFEV = None  # Évaluations maximales du solveur par calibration (None = convergence)
+COLOR_CORRECTION_CACHE_SIZE = 8  # États d'éclairage mémorisés (paramètres + LUT, ~3 Mo chacun en 65³), 0 = désactivé
+COLOR_CORRECTION_CACHE_DELTA_E = 2.0  # ΔE moyen (CIE76) des patchs sous lequel un état mémorisé est réutilisé (< COLOR_DRIFT_DELTA_E_THRESHOLD)
+COLOR_CORRECTION_SMOOTHING = 1.0  # Poids par frame de la nouvelle calibration (moyenne exponentielle), 1 = échange immédiat (lissage désactivé)
+
+# Recalibration déclenchée par la dérive des couleurs de la charte (au lieu de COLOR_CORRECTION_INTERVAL)
+COLOR_DRIFT_MONITOR_ENABLED = True     # Si False, recalibration toutes les COLOR_CORRECTION_INTERVAL frames
+COLOR_DRIFT_CHECK_INTERVAL = 5         # Frames entre deux mesures des patchs de la charte
+COLOR_DRIFT_LUMINANCE_THRESHOLD = 0.03 # Variation relative de luminance des patchs avant le calcul du ΔE
+COLOR_DRIFT_DELTA_E_THRESHOLD = 3.0    # ΔE moyen (CIE76, Lab) déclenchant la recalibration
+COLOR_DRIFT_MIN_INTERVAL = 50          # Frames minimales entre deux recalibrations
+COLOR_DRIFT_MAX_INTERVAL = 3000        # Recalibration forcée après ce nombre de frames (0 = jamais)
 
 # Couleurs de référence de la charte Macbeth en BGR
 MACBETH_REFERENCE_COLORS = np.array([
@@ -25,6 +25,27 @@ BINARY_CONSTANT = 2
 MORPHOLOGY_KERNEL_SIZE = (3, 3)
 ROI_EXPANSION_RATIO = 0.2
 
+# Bande de détection autour de la ligne de comptage
+LINE_BAND_ENABLED = False     # Limite l'inférence YOLO à une bande autour de la ligne
+LINE_BAND_MARGIN_ABOVE = 400  # Marge au-dessus de la ligne (en pixels, doit contenir une personne entière)
+LINE_BAND_MARGIN_BELOW = 40   # Marge en dessous de la ligne (en pixels)
+LINE_BAND_MARGIN_SIDE = 40    # Marge à gauche et à droite des extrémités de la ligne (en pixels)
+LINE_BAND_IMGSZ = 320         # Taille d'entrée du détecteur pour la bande (letterbox)
+
+# Recherche du cadre noir de la charte Macbeth sur une frame réduite, coins affinés à pleine résolution
+CHART_DETECTION_PYRAMID_SCALE = 4        # Facteur de réduction maximal (puissance de 2, 1 = pleine résolution)
+CHART_DETECTION_PYRAMID_MIN_WIDTH = 960  # Largeur minimale de la frame réduite (en pixels)
+CHART_CORNER_REFINE_WINDOW = 8           # Demi-côté de la fenêtre d'affinage des coins (cv2.cornerSubPix, en pixels)
+
+# Suivi de la charte Macbeth entre deux détections complètes (DETECT_SQUARES)
+CHART_TRACKING_ENABLED = True           # Coins suivis par flux optique, détecteur complet si la confiance chute
+CHART_TRACKING_SEARCH_MARGIN = 32       # Marge de la fenêtre de recherche autour de la charte (en pixels)
+CHART_TRACKING_MAX_FEATURES = 100       # Points de la charte extraits sur l'image clé (frame de la détection)
+CHART_TRACKING_MIN_INLIERS = 15         # Points cohérents avec l'homographie en deçà desquels le suivi est rejeté
+CHART_TRACKING_MIN_INLIER_RATIO = 0.6   # Proportion minimale de points cohérents avec l'homographie
+CHART_TRACKING_STATIC_THRESHOLD = 0.1   # Déplacement médian (en pixels) par rapport à la frame précédente en deçà duquel la charte est immobile
+CHART_TRACKING_REDETECT_INTERVAL = 300  # Détection complète forcée après ce nombre de frames suivies (0 = jamais)
+
 # Paramètres d'optimisation de la correction des couleurs
 COLOR_CORRECTION_INTERVAL = 300  # Effectue la correction toutes les 30 frames
 
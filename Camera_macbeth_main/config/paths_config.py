@@ -34,4 +34,5 @@ VIDEO_OUTPUT_PATH = os.path.join(OUTPUT_DIR, "output.mp4")
 # Chemins des fichiers de cache
 CACHE_FILE_PATH = os.path.join(CACHE_DIR, "macbeth_cache.json")
 WARPED_IMAGE_PATH = os.path.join(CACHE_DIR, "macbeth_cache_warped.png")
-WARPED_WITH_SQUARES_PATH = os.path.join(CACHE_DIR, "macbeth_cache_warped_with_squares.png")
\ No newline at end of file
+WARPED_WITH_SQUARES_PATH = os.path.join(CACHE_DIR, "macbeth_cache_warped_with_squares.png")
+CAMERA_PROFILE_PATH = os.path.join(CACHE_DIR, "camera_profile.npz")
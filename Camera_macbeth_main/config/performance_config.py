@@ -0,0 +1,68 @@
+"""
+Configuration des paramètres de performance.
+
+Ce module définit les paramètres liés à:
+- La lecture anticipée des frames vidéo
+- L'exécution en pipeline multi-processus
+- Le prétraitement fusionné des frames
+- Le recadrage sur la zone active du masque
+- Le filtrage des frames sans mouvement avant la détection
+- La détection toutes les N frames avec prédiction des trajectoires
+- L'inférence par lots pour le traitement hors ligne des vidéos enregistrées
+- Le chronométrage des étapes du traitement
+- La recalibration des couleurs en arrière-plan
+- Le profil caméra restauré au démarrage
+- La persistance du cache de la charte Macbeth en arrière-plan
+"""
+
+# Lecture anticipée des frames (décodage sur un thread en arrière-plan)
+FRAME_PREFETCH_ENABLED = True     # Active le décodage en arrière-plan
+FRAME_PREFETCH_BUFFER_SIZE = 8    # Nombre de frames préallouées dans le tampon circulaire
+FRAME_PREFETCH_DROP_FRAMES = False  # Si True, écrase la plus ancienne frame quand le tampon est plein (flux caméra)
+
+# Pipeline multi-processus (une étape par processus, frames en mémoire partagée)
+PIPELINE_ENABLED = False          # Active le mode pipeline dans Application.run
+PIPELINE_SLOT_COUNT = 4           # Emplacements de frames en mémoire partagée par étape
+
+# Prétraitement fusionné (redimensionnement + masque + correction en une passe uint8)
+FUSED_PREPROCESSING_ENABLED = True
+
+# Recadrage sur la boîte englobante de la zone non nulle du masque
+MASK_CROP_ENABLED = True          # Correction et détection limitées à la zone active
+MASK_CROP_MARGIN = 16             # Marge autour de la zone active (en pixels)
+
+# Filtre de mouvement: saute l'inférence YOLO quand rien ne bouge dans la zone de détection
+MOTION_GATE_ENABLED = False       # Active le filtre de mouvement dans update_tracker
+MOTION_GATE_METHOD = 'diff'       # 'diff' (différence de frames) ou 'mog2' (soustraction de fond)
+MOTION_GATE_DOWNSCALE = 4         # Facteur de réduction de la frame avant comparaison
+MOTION_GATE_PIXEL_THRESHOLD = 20  # Écart de niveau de gris pour qu'un pixel soit considéré en mouvement
+MOTION_GATE_MIN_AREA_RATIO = 0.002  # Proportion minimale de pixels en mouvement pour lancer la détection
+MOTION_GATE_HOLD_FRAMES = 10      # Frames détectées après la fin du mouvement
+MOTION_GATE_MAX_SKIP = 15         # Détection forcée après ce nombre de frames sautées
+
+# Détection toutes les N frames, boîtes prédites par filtre de Kalman entre deux détections
+DETECTION_INTERVAL_ENABLED = False  # Active la détection espacée dans update_tracker
+DETECTION_INTERVAL_MAX = 5          # Nombre maximal de frames entre deux détections
+DETECTION_NEAR_LINE_DISTANCE = 80   # Distance à la ligne (en pixels) en deçà de laquelle on détecte à chaque frame
+
+# Inférence par lots hors ligne (vidéos enregistrées, sans contrainte de latence)
+OFFLINE_BATCH_ENABLED = False     # Envoie des lots de frames consécutives au détecteur
+OFFLINE_BATCH_SIZE = 8            # Nombre de frames par lot
+
+# Chronométrage des étapes (histogrammes p50/p95/p99, export Chrome trace)
+PROFILING_ENABLED = False         # Active le chronométrage (aussi: option --profile)
+PROFILING_TRACE_PATH = None       # Fichier Chrome trace JSON écrit à la fermeture, None pour ne pas l'écrire
+PROFILING_TRACE_MAX_EVENTS = 500000  # Nombre maximal d'intervalles conservés pour la trace
+
+# Recalibration périodique des couleurs (COLOR_CORRECTION_INTERVAL) sur un thread en arrière-plan
+ASYNC_RECALIBRATION_ENABLED = True  # Si False, la frame qui déclenche la recalibration l'attend
+# Couche de threads numba: les deux threads lancent des noyaux parallèles en même temps,
+# ce que la couche 'workqueue' ne supporte pas (arrêt du processus). 'threadsafe' choisit tbb ou omp.
+NUMBA_THREADING_LAYER = 'threadsafe'
+
+# Profil caméra (géométrie de la charte, dernière correction, masque et ligne) restauré au démarrage
+CAMERA_PROFILE_ENABLED = True       # Si False, la charte est redétectée et le modèle réajusté à chaque démarrage
+
+# Cache de la charte Macbeth: géométrie en mémoire, écritures sur disque par un thread en arrière-plan
+CHART_CACHE_PERSIST_ENABLED = True  # Géométrie écrite dans CACHE_FILE_PATH (JSON) pour les prochains démarrages
+CHART_DEBUG_IMAGES_ENABLED = False  # Images redressées (_warped.png, _warped_with_squares.png) à chaque détection
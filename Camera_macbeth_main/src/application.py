@@ -7,20 +7,38 @@ du système de détection et de suivi.
 
 import signal
 import sys
-import torch
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from config.paths_config import VIDEO_INPUT_PATH
 from config.detection_config import DETECT_SQUARES
-from config.display_config import line_start, line_end
+from config.display_config import line_start, line_end, output_width, output_height
+from config.performance_config import (
+    FRAME_PREFETCH_ENABLED,
+    FRAME_PREFETCH_BUFFER_SIZE,
+    FRAME_PREFETCH_DROP_FRAMES,
+    PIPELINE_ENABLED,
+    PIPELINE_SLOT_COUNT,
+    OFFLINE_BATCH_ENABLED,
+    OFFLINE_BATCH_SIZE
+)
 
 from src.video_processor import (
     load_mask,
     setup_video_capture,
     process_frame,
-    initialize_color_masks
+    process_frame_to_buffer,
+    initialize_color_masks,
+    warmup_kernels,
+    get_processing_region
 ) 
+from src.frame_reader import setup_prefetch_reader
+from src.camera_profile import restore_camera_profile, save_camera_profile
+from src.stage_profiler import profile_stage, finish_profiling
+from src.background_writer import flush_background_writes
+from src.startup_metrics import startup_step
 from src.display_manager import (
     init_display,
     draw_person,
@@ -32,17 +50,24 @@ from src.display_manager import (
 from src.tracker import (
     create_tracker,
     update_tracker,
+    update_tracker_batch,
     check_line_crossing,
-    mark_person_as_crossed
+    setup_compute_device,
+    get_detection_region,
+    warmup_detection_model
 )
 from src.detection_history import (
     cleanup,
     init_detection_history,
-    update_detection_value,
-    get_dominant_detection,
-    record_crossing
+    update_detection_value
+)
+from src.macbeth_color_and_rectangle_detector import get_average_colors, load_chart_geometry
+from src.run_support import (
+    handle_line_crossings,
+    print_motion_gate_stats,
+    print_recalibration_stats,
+    report_first_frame
 )
-from src.macbeth_color_and_rectangle_detector import get_average_colors
 
 class Application:
     """
@@ -65,6 +90,7 @@ class Application:
         """Initialise l'application et ses composants."""
         self.video_capture = None
         self.tracker_state = None
+        self.pipeline = None
         self.running = False
         
         # Configuration des gestionnaires de signaux
@@ -90,76 +116,51 @@ class Application:
         Returns:
             torch.device: Dispositif à utiliser pour les calculs
         """
-        try:
-            if not torch.cuda.is_available():
-                print("CUDA n'est pas disponible")
-                print(f"Version PyTorch: {torch.__version__}")
-                return torch.device("cpu")
-            
-            # Vérification plus détaillée du GPU
-            gpu_count = torch.cuda.device_count()
-            if gpu_count == 0:
-                print("Aucun GPU détecté")
-                return torch.device("cpu")
-                
-            # Sélection du premier GPU disponible
-            compute_device = torch.device("cuda:0")
-            print(f"GPU détectée: {torch.cuda.get_device_name(0)}")
-            print(f"Nombre de GPUs: {gpu_count}")
-            print(f"Version CUDA: {torch.cuda.get_device_capability(0)}")
-            
-            # Test rapide pour vérifier que le GPU fonctionne
-            test_tensor = torch.tensor([1.0], device=compute_device)
-            if test_tensor.device.type == "cuda":
-                print("Test GPU réussi")
-            
-            return compute_device
-            
-        except Exception as e:
-            print(f"Erreur lors de la configuration du GPU: {str(e)}")
-            return torch.device("cpu")
+        return setup_compute_device()
     
     def initialize(self):
         """
         Initialise tous les composants nécessaires au fonctionnement du programme.
         
         Cette méthode:
-        1. Initialise l'historique de détection
-        2. Configure le processeur vidéo et charge le masque
-        3. Initialise le tracker et l'affichage
-        4. Configure le dispositif de calcul
-        5. Effectue la détection initiale des couleurs Macbeth
+        1. Initialise l'historique de détection et les masques de couleurs
+        2. Lance en parallèle deux branches dans des threads:
+           - vidéo: ouverture, lecture de la première frame, profil caméra ou détection Macbeth
+           - modèle: chargement de YOLO, transfert sur le dispositif, inférence de chauffe
+        3. Pendant ce temps, charge le masque, prépare les noyaux numba et
+           initialise l'affichage dans le thread principal
         
         Returns:
             bool: True si l'initialisation a réussi, False sinon
         """
         try:
-            init_detection_history()
+            with startup_step('detection_history'):
+                init_detection_history()
 
-            # Initialisation des masques de couleurs (doit être fait avant toute détection)
-            initialize_color_masks()
-            print("Masques de couleurs initialisés avec succès")
-            
-            # Configuration de la capture vidéo
-            self.video_capture = setup_video_capture(VIDEO_INPUT_PATH)
+                # Initialisation des masques de couleurs (doit être fait avant toute détection)
+                initialize_color_masks()
+                print("Masques de couleurs initialisés avec succès")
             
-            # Chargement et pré-calcul du masque de détection
-            load_mask()
-            print("Masque de détection chargé et pré-calculé")
-
-            self.tracker_state = create_tracker()
-            init_display()  # Initialisation de l'affichage
-
-            compute_device = self.setup_device()
-            self.tracker_state['person_detection_model'] = self.tracker_state['person_detection_model'].to(compute_device)
-
-            _, initial_frame = self.video_capture.read()
-            if initial_frame is not None:
+            # Les noyaux numba parallèles doivent être lancés une première fois
+            # depuis le thread principal: initialisé depuis un autre thread, le
+            # pool TBB bloque la sortie du programme
+            kernels_ready = threading.Event()
+            with ThreadPoolExecutor(max_workers=2, thread_name_prefix="init") as executor:
+                video_future = executor.submit(self._initialize_video, kernels_ready)
+                model_future = executor.submit(self._initialize_model, kernels_ready)
+                
                 try:
-                    get_average_colors(initial_frame, True)
-                except Exception as e:
-                    print(f"Erreur lors de la détection des couleurs Macbeth: {e}")
-            else:
+                    self._initialize_mask()
+                finally:
+                    kernels_ready.set()
+                
+                with startup_step('display'):
+                    init_display()  # Initialisation de l'affichage
+                
+                initial_frame = video_future.result()
+                self.tracker_state = model_future.result()
+            
+            if initial_frame is None:
                 print("Impossible de lire la première frame de la vidéo.")
                 return False
 
@@ -170,6 +171,72 @@ class Application:
             print(f"Erreur lors de l'initialisation du système : {str(e)}")
             return False
     
+    def _initialize_video(self, kernels_ready):
+        """
+        Ouvre la vidéo et restaure le profil caméra ou, à défaut, détecte la charte
+        Macbeth sur la première frame.
+        
+        Args:
+            kernels_ready (threading.Event): Masque chargé et noyaux numba préparés
+        
+        Returns:
+            np.ndarray or None: Première frame, None si la vidéo est vide
+        """
+        with startup_step('video_open'):
+            self.video_capture = setup_video_capture(VIDEO_INPUT_PATH)
+            if FRAME_PREFETCH_ENABLED:
+                self.video_capture = setup_prefetch_reader(
+                    self.video_capture,
+                    FRAME_PREFETCH_BUFFER_SIZE,
+                    FRAME_PREFETCH_DROP_FRAMES
+                )
+            _, initial_frame = self.video_capture.read()
+        
+        if initial_frame is not None:
+            kernels_ready.wait()
+            with startup_step('camera_profile'):
+                profile_restored = restore_camera_profile(initial_frame)
+            if not profile_restored:
+                with startup_step('macbeth_detection'):
+                    try:
+                        get_average_colors(initial_frame, True)
+                    except Exception as e:
+                        print(f"Erreur lors de la détection des couleurs Macbeth: {e}")
+        return initial_frame
+    
+    def _initialize_mask(self):
+        """Charge le masque de détection et prépare les noyaux de correction."""
+        with startup_step('mask_load'):
+            # Chargement et pré-calcul du masque de détection
+            load_mask()
+            print("Masque de détection chargé et pré-calculé")
+        with startup_step('kernel_warmup'):
+            warmup_kernels()
+    
+    def _initialize_model(self, kernels_ready):
+        """
+        Charge le modèle de détection et effectue une inférence de chauffe.
+        
+        Args:
+            kernels_ready (threading.Event): Masque chargé, dont dépend la région de détection
+        
+        Returns:
+            dict: État du tracker (voir create_tracker)
+        """
+        with startup_step('model_load'):
+            tracker_state = create_tracker()
+        
+        with startup_step('model_to_device'):
+            compute_device = self.setup_device()
+            tracker_state['person_detection_model'] = tracker_state['person_detection_model'].to(compute_device)
+        
+        kernels_ready.wait()
+        with startup_step('model_warmup'):
+            frame_shape = (output_height, output_width, 3)
+            warmup_detection_model(tracker_state, frame_shape,
+                                   get_detection_region(get_processing_region(), frame_shape))
+        return tracker_state
+    
     def process_frame_with_tracking(self, current_frame):
         """
         Traite une frame avec détection et suivi des personnes.
@@ -181,8 +248,21 @@ class Application:
             tuple: (processed_frame, should_exit, formatted_time)
         """
         processed_frame = process_frame(current_frame, DETECT_SQUARES)
-        tracked_persons = update_tracker(self.tracker_state, processed_frame)
+        detection_region = get_detection_region(get_processing_region(), processed_frame.shape)
+        tracked_persons = update_tracker(self.tracker_state, processed_frame, detection_region)
+        return self.handle_tracked_frame(processed_frame, tracked_persons)
+    
+    def handle_tracked_frame(self, processed_frame, tracked_persons):
+        """
+        Vérifie les franchissements, dessine et affiche une frame suivie.
         
+        Args:
+            processed_frame (np.ndarray): Frame prétraitée
+            tracked_persons (list): Personnes suivies après cette frame
+            
+        Returns:
+            tuple: (processed_frame, should_exit, formatted_time)
+        """
         persons_to_process = []
         for tracked_person in tracked_persons:
             person_id = tracked_person['id']
@@ -192,30 +272,19 @@ class Application:
             if check_line_crossing(tracked_person, line_start, line_end):
                 persons_to_process.append(person_id)
         
-        for tracked_person in tracked_persons:
-            draw_person(processed_frame, tracked_person)
-        
-        draw_crossing_line(processed_frame, line_start, line_end)
-        draw_counters(processed_frame, self.tracker_state['line_crossing_counter'])
+        with profile_stage('drawing'):
+            for tracked_person in tracked_persons:
+                draw_person(processed_frame, tracked_person)
+            
+            draw_crossing_line(processed_frame, line_start, line_end)
+            draw_counters(processed_frame, self.tracker_state['line_crossing_counter'])
         
         # Affichage de la frame
-        should_exit, _, formatted_time = show_frame(processed_frame)
+        with profile_stage('show_frame'):
+            should_exit, _, formatted_time = show_frame(processed_frame)
         
         # Traitement des personnes qui ont traversé la ligne
-        for person_id in persons_to_process:
-            if person_id in self.tracker_state['active_tracked_persons']:
-                print(f"!!! Ligne traversée par ID={person_id} !!!")
-                
-                detected_value = get_dominant_detection(person_id)
-                update_detection_value(person_id, detected_value)
-                
-                # Utilisation de l'heure formatée pour l'enregistrement
-                record_crossing(person_id, formatted_time)
-                
-                dominant_value = get_dominant_detection(person_id)
-                if dominant_value:
-                    self.tracker_state['line_crossing_counter'][dominant_value] += 1
-                mark_person_as_crossed(self.tracker_state, person_id)
+        handle_line_crossings(self.tracker_state, persons_to_process, formatted_time)
         
         return processed_frame, should_exit, formatted_time
     
@@ -231,6 +300,14 @@ class Application:
         5. Met à jour les compteurs et l'affichage
         6. Enregistre les données de passage
         """
+        if PIPELINE_ENABLED:
+            self.run_pipelined()
+            return
+        
+        if OFFLINE_BATCH_ENABLED:
+            self.run_batched(OFFLINE_BATCH_SIZE)
+            return
+        
         if not self.running:
             if not self.initialize():
                 print("Échec de l'initialisation, impossible de démarrer l'application")
@@ -238,11 +315,14 @@ class Application:
         
         try:
             while True:
-                ret, current_frame = self.video_capture.read()
+                with profile_stage('decode'):
+                    ret, current_frame = self.video_capture.read()
                 if not ret:
                     break
                     
-                _, should_exit, _ = self.process_frame_with_tracking(current_frame)
+                with profile_stage('frame'):
+                    _, should_exit, _ = self.process_frame_with_tracking(current_frame)
+                report_first_frame()
                 
                 if should_exit:
                     break
@@ -253,6 +333,94 @@ class Application:
         finally:
             self.cleanup()
     
+    def run_batched(self, batch_size):
+        """
+        Exécute le traitement hors ligne par lots de frames.
+        
+        Les frames sont prétraitées dans des tampons distincts puis envoyées
+        au détecteur par lots de batch_size (voir update_tracker_batch).
+        Les franchissements, l'affichage et l'enregistrement restent faits
+        frame par frame, dans l'ordre.
+        
+        Args:
+            batch_size (int): Nombre de frames par lot
+        """
+        if not self.running:
+            if not self.initialize():
+                print("Échec de l'initialisation, impossible de démarrer l'application")
+                return
+        
+        batch_buffers = []  # Un tampon par frame du lot (voir process_frame_to_buffer)
+        
+        try:
+            end_of_video = False
+            should_exit = False
+            while not end_of_video and not should_exit:
+                processed_frames = []
+                while len(processed_frames) < batch_size:
+                    ret, current_frame = self.video_capture.read()
+                    if not ret:
+                        end_of_video = True
+                        break
+                    processed_frame = process_frame_to_buffer(current_frame, DETECT_SQUARES,
+                                                              batch_buffers, len(processed_frames))
+                    processed_frames.append(processed_frame)
+                
+                if not processed_frames:
+                    break
+                
+                detection_region = get_detection_region(get_processing_region(), processed_frames[0].shape)
+                tracked_batch = update_tracker_batch(self.tracker_state, processed_frames, detection_region)
+                for processed_frame, tracked_persons in zip(processed_frames, tracked_batch):
+                    _, should_exit, _ = self.handle_tracked_frame(processed_frame, tracked_persons)
+                    report_first_frame()
+                    if should_exit:
+                        break
+                    
+        except Exception as e:
+            print(f"Erreur dans la boucle principale : {e}")
+            
+        finally:
+            self.cleanup()
+    
+    def run_pipelined(self):
+        """
+        Exécute le traitement en pipeline multi-processus.
+        
+        Le décodage, le prétraitement, le suivi et le rendu tournent chacun
+        dans leur propre processus (voir src.pipeline). Seule la détection
+        initiale de la charte Macbeth est faite ici, avant le démarrage
+        des étapes: la géométrie trouvée est transmise au processus de
+        prétraitement. Les écritures du cache en attente sont terminées avant
+        le lancement des processus, qui peuvent à leur tour l'écrire.
+        """
+        from src.pipeline import StagePipeline
+        
+        try:
+            video_capture = setup_video_capture(VIDEO_INPUT_PATH)
+            _, initial_frame = video_capture.read()
+            video_capture.release()
+            if initial_frame is None:
+                print("Impossible de lire la première frame de la vidéo.")
+                return
+            if not restore_camera_profile(initial_frame):
+                try:
+                    get_average_colors(initial_frame, True)
+                except Exception as e:
+                    print(f"Erreur lors de la détection des couleurs Macbeth: {e}")
+            flush_background_writes()
+            
+            self.pipeline = StagePipeline(VIDEO_INPUT_PATH, initial_frame.shape, PIPELINE_SLOT_COUNT,
+                                          load_chart_geometry())
+            self.running = True
+            self.pipeline.run()
+            
+        except Exception as e:
+            print(f"Erreur dans le pipeline : {e}")
+            
+        finally:
+            self.cleanup()
+    
     def cleanup(self):
         """
         Nettoie les ressources utilisées par l'application.
@@ -263,10 +431,26 @@ class Application:
         - Libération des ressources vidéo
         """
         print("Fermeture de l'application...")
+        # En pipeline, la correction vit dans le processus de prétraitement, qui enregistre le profil
+        pipelined = self.pipeline is not None
+        if pipelined:
+            self.pipeline.stop()
+            self.pipeline = None
         cleanup()  # Nettoyage de l'historique de détection
         
         if self.video_capture is not None:
+            if hasattr(self.video_capture, 'get_stats'):
+                reader_stats = self.video_capture.get_stats()
+                print(f"Lecture anticipée: {reader_stats['dropped_frames']} frames perdues, "
+                      f"tampon rempli à {reader_stats['buffer_fill']:.0%}")
             self.video_capture.release()
+        
+        if self.tracker_state is not None and self.tracker_state.get('motion_gate') is not None:
+            print_motion_gate_stats(self.tracker_state['motion_gate'])
+        print_recalibration_stats()
+        if not pipelined:
+            save_camera_profile()
+        finish_profiling()
             
         release_display()
         self.running = False
\ No newline at end of file
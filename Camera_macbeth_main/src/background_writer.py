@@ -0,0 +1,111 @@
+"""
+Module d'écriture sur disque en arrière-plan.
+
+Les écritures (cache JSON de la charte, images de débogage) sont confiées à
+un thread unique, démarré à la première demande, pour que la latence du
+disque ne bloque jamais la boucle des frames. Chaque écriture porte une clé
+(en général le fichier visé): une nouvelle demande remplace celle de même
+clé encore en attente, seule la plus récente est écrite.
+
+Les écritures en attente sont terminées à la sortie de l'interpréteur
+(atexit). Un processus fils de multiprocessing ne passe pas par atexit: il
+doit appeler flush_background_writes avant de se terminer.
+"""
+
+import atexit
+import threading
+import time
+
+# Délai maximal d'attente des écritures en attente à la sortie (secondes)
+EXIT_FLUSH_TIMEOUT = 5.0
+
+# Écritures en attente, par clé (ordre d'insertion), et écriture en cours
+pending_writes = {}
+writes_condition = threading.Condition()
+writer_thread = None
+write_in_progress = False
+writer_stats = {
+    'written': 0,      # Écritures effectuées
+    'coalesced': 0,    # Demandes remplacées par une plus récente avant d'être écrites
+    'failed': 0,       # Écritures en échec (exception)
+    'total_time': 0.0, # Durée cumulée des écritures (secondes)
+    'max_time': 0.0
+}
+
+def _writer_worker():
+    """Boucle du thread d'écriture: exécute les écritures en attente, la plus ancienne d'abord."""
+    global write_in_progress
+
+    while True:
+        with writes_condition:
+            while not pending_writes:
+                writes_condition.wait()
+            write_key = next(iter(pending_writes))
+            write_function, write_args = pending_writes.pop(write_key)
+            write_in_progress = True
+
+        write_start = time.perf_counter()
+        try:
+            write_function(*write_args)
+            failed = False
+        except Exception as e:
+            print(f"Écriture en arrière-plan en échec ({write_key}): {e}")
+            failed = True
+        write_time = time.perf_counter() - write_start
+
+        with writes_condition:
+            write_in_progress = False
+            writer_stats['failed' if failed else 'written'] += 1
+            writer_stats['total_time'] += write_time
+            writer_stats['max_time'] = max(writer_stats['max_time'], write_time)
+            writes_condition.notify_all()
+
+def submit_background_write(write_key, write_function, *write_args):
+    """
+    Confie une écriture au thread d'écriture.
+
+    Args:
+        write_key (str): Clé de l'écriture (une demande en attente de même clé est remplacée)
+        write_function (callable): Fonction d'écriture, appelée sur le thread d'écriture
+        *write_args: Arguments de write_function, qui ne doivent plus être modifiés par l'appelant
+    """
+    global writer_thread
+
+    with writes_condition:
+        if write_key in pending_writes:
+            del pending_writes[write_key]
+            writer_stats['coalesced'] += 1
+        pending_writes[write_key] = (write_function, write_args)
+        if writer_thread is None:
+            writer_thread = threading.Thread(target=_writer_worker, name="BackgroundWriter", daemon=True)
+            writer_thread.start()
+        writes_condition.notify_all()
+
+def flush_background_writes(timeout=None):
+    """
+    Attend la fin des écritures en attente et en cours.
+
+    Args:
+        timeout (float, optional): Attente maximale en secondes
+
+    Returns:
+        bool: True si toutes les écritures sont terminées
+    """
+    with writes_condition:
+        return writes_condition.wait_for(lambda: not pending_writes and not write_in_progress, timeout)
+
+def get_background_writer_stats():
+    """
+    Retourne les compteurs du thread d'écriture.
+
+    Returns:
+        dict: Compteurs de writer_stats, plus pending (écritures en attente) et
+            mean_time (durée moyenne d'une écriture, secondes)
+    """
+    with writes_condition:
+        stats = dict(writer_stats)
+        stats['pending'] = len(pending_writes) + int(write_in_progress)
+    stats['mean_time'] = stats['total_time'] / stats['written'] if stats['written'] else 0.0
+    return stats
+
+atexit.register(flush_background_writes, EXIT_FLUSH_TIMEOUT)
@@ -0,0 +1,239 @@
+"""
+Module du profil caméra.
+
+Sans profil, chaque démarrage redétecte la charte Macbeth sur la première
+frame, puis la première correction relit le cache de la charte et réajuste
+le modèle. Le profil caméra rassemble dans un seul fichier (.npz, sans
+pickle) tout ce qui décrit l'installation:
+- la géométrie de la charte: coins dans la frame source, matrice de
+  perspective, carrés de l'image redressée et dimensions
+- la dernière correction: modèle, paramètres, table de la LUT et couleurs
+  Lab des patchs lors de la calibration
+- la région active du masque et la ligne de passage
+
+Au démarrage, le profil est restauré s'il correspond à la configuration
+courante et à la première frame (voir check_camera_profile): la première
+frame est alors corrigée sans détection ni ajustement. Sinon, l'appelant
+revient à la détection de la charte. Le profil est réécrit à la fermeture.
+"""
+
+import os
+import time
+
+import numpy as np
+
+from config.color_config import COLOR_CORRECTION_MODEL, COLOR_CORRECTION_LUT_SIZE, COLOR_DRIFT_DELTA_E_THRESHOLD
+from config.display_config import line_start, line_end, output_width, output_height
+from config.paths_config import CAMERA_PROFILE_PATH
+from config.performance_config import CAMERA_PROFILE_ENABLED
+from src.color_correction_models import get_correction_model
+from src.color_drift_monitor import compute_sample_points, sample_patch_colors, compute_patch_signature
+from src.macbeth_color_and_rectangle_detector import (
+    load_chart_geometry,
+    save_chart_geometry,
+    compute_chart_corners,
+    start_chart_tracking
+)
+from src.macbeth_nonlinear_color_correction import get_correction_courante, restaurer_correction, lut_depuis_table
+from src.video_processor import get_processing_region, resize_and_mask_frame
+
+# Version du format: un profil d'une autre version est ignoré
+CAMERA_PROFILE_VERSION = 1
+
+# Écart relatif maximal entre le format (largeur / hauteur) de la vidéo et celui de la géométrie
+ASPECT_RATIO_TOLERANCE = 0.01
+
+def _correction_uses_lut():
+    """Indique si le modèle configuré est appliqué par LUT."""
+    return bool(COLOR_CORRECTION_LUT_SIZE) and get_correction_model(COLOR_CORRECTION_MODEL)['use_lut']
+
+def save_camera_profile(profile_path=CAMERA_PROFILE_PATH):
+    """
+    Enregistre le profil caméra à partir de la correction et de la géométrie courantes.
+
+    Args:
+        profile_path (str): Fichier du profil
+
+    Returns:
+        bool: True si le profil est écrit, False s'il est désactivé ou s'il
+            manque la géométrie de la charte ou une calibration
+
+    Notes:
+        - Le fichier est écrit à côté puis renommé: une interruption ne laisse
+          jamais un profil tronqué
+    """
+    if not CAMERA_PROFILE_ENABLED:
+        return False
+    correction_params, correction_lut, reference = get_correction_courante()
+    chart_geometry = load_chart_geometry()
+    if correction_params is None or reference is None or chart_geometry is None:
+        return False
+
+    profile_arrays = {
+        'version': np.array(CAMERA_PROFILE_VERSION),
+        'correction_model': np.array(COLOR_CORRECTION_MODEL),
+        'correction_params': np.asarray(correction_params, dtype=np.float64),
+        'patch_lab': reference['lab'],
+        'chart_corners': compute_chart_corners(chart_geometry),
+        'perspective_matrix': chart_geometry['perspective_matrix'],
+        'squares': np.array(chart_geometry['squares'], dtype=np.int32),
+        'source_shape': np.array(chart_geometry['source_shape']),
+        'warped_size': np.array(chart_geometry['warped_size']),
+        'output_size': np.array([output_width, output_height]),
+        'line': np.array([line_start, line_end])
+    }
+    if correction_lut is not None:
+        profile_arrays['lut_table'] = correction_lut['table']
+    mask_bbox = get_processing_region()
+    if mask_bbox is not None:
+        profile_arrays['mask_bbox'] = np.array(mask_bbox)
+
+    os.makedirs(os.path.dirname(profile_path), exist_ok=True)
+    temporary_path = profile_path + '.tmp'
+    with open(temporary_path, 'wb') as profile_file:
+        np.savez(profile_file, **profile_arrays)
+    os.replace(temporary_path, profile_path)
+    print(f"Profil caméra enregistré: {profile_path}")
+    return True
+
+def load_camera_profile(profile_path=CAMERA_PROFILE_PATH):
+    """
+    Charge le profil caméra.
+
+    Args:
+        profile_path (str): Fichier du profil
+
+    Returns:
+        dict or None: correction_model, correction_params, lut_table (None pour un
+            modèle sans LUT), patch_lab, chart_geometry (format de load_chart_geometry),
+            chart_corners, mask_bbox (None si le masque n'était pas chargé),
+            output_size et line. None si le fichier est absent, illisible ou
+            d'une autre version.
+    """
+    if not os.path.exists(profile_path):
+        return None
+    try:
+        with np.load(profile_path, allow_pickle=False) as profile_file:
+            profile_arrays = {key: profile_file[key] for key in profile_file.files}
+    except Exception as e:
+        print(f"Profil caméra illisible: {e}")
+        return None
+    if 'version' not in profile_arrays or int(profile_arrays['version']) != CAMERA_PROFILE_VERSION:
+        return None
+
+    return {
+        'correction_model': str(profile_arrays['correction_model']),
+        'correction_params': profile_arrays['correction_params'],
+        'lut_table': profile_arrays.get('lut_table'),
+        'patch_lab': profile_arrays['patch_lab'],
+        'chart_geometry': {
+            'squares': [tuple(int(v) for v in square) for square in profile_arrays['squares']],
+            'perspective_matrix': profile_arrays['perspective_matrix'],
+            'source_shape': tuple(int(v) for v in profile_arrays['source_shape']),
+            'warped_size': tuple(int(v) for v in profile_arrays['warped_size'])
+        },
+        'chart_corners': profile_arrays['chart_corners'],
+        'mask_bbox': tuple(int(v) for v in profile_arrays['mask_bbox']) if 'mask_bbox' in profile_arrays else None,
+        'output_size': tuple(int(v) for v in profile_arrays['output_size']),
+        'line': tuple(tuple(int(v) for v in point) for point in profile_arrays['line'])
+    }
+
+def _source_shape_compatible(source_shape, frame_shape):
+    """
+    Indique si une géométrie détectée sur une frame de dimensions source_shape s'applique à une frame brute.
+
+    La charte a pu être détectée sur la frame brute ou sur la frame
+    redimensionnée aux dimensions de sortie (détection forcée par
+    detect_squares): les mesures ramènent les coordonnées à la frame
+    courante (voir get_frame_perspective_matrix), seul le format compte.
+    """
+    source_height, source_width = source_shape
+    if (source_width, source_height) == (output_width, output_height):
+        return True
+    frame_height, frame_width = frame_shape[:2]
+    source_ratio = source_width / source_height
+    return abs(frame_width / frame_height - source_ratio) <= ASPECT_RATIO_TOLERANCE * source_ratio
+
+def check_camera_profile(camera_profile, frame):
+    """
+    Vérifie qu'un profil correspond à la configuration courante et à une frame.
+
+    Args:
+        camera_profile (dict): Profil retourné par load_camera_profile
+        frame (np.ndarray): Frame BGR brute (en général la première de la vidéo)
+
+    Returns:
+        str or None: Raison du rejet, None si le profil est utilisable
+
+    Notes:
+        - La région du masque n'est comparée que si le masque est chargé
+        - Les patchs de la charte sont échantillonnés comme par le moniteur de
+          dérive, sur la frame redimensionnée et masquée comme lors de la
+          calibration: un ΔE moyen au-delà de COLOR_DRIFT_DELTA_E_THRESHOLD
+          (charte déplacée, masquée ou éclairage changé) rejette le profil
+    """
+    if camera_profile['correction_model'] != COLOR_CORRECTION_MODEL:
+        return f"modèle de correction différent ({camera_profile['correction_model']})"
+    if _correction_uses_lut() and (camera_profile['lut_table'] is None
+                                   or camera_profile['lut_table'].shape[0] != COLOR_CORRECTION_LUT_SIZE):
+        return "taille de LUT différente"
+    if camera_profile['output_size'] != (output_width, output_height):
+        return "dimensions de sortie différentes"
+    if camera_profile['line'] != (tuple(line_start), tuple(line_end)):
+        return "ligne de passage différente"
+    mask_bbox = get_processing_region()
+    if mask_bbox is not None and camera_profile['mask_bbox'] != tuple(mask_bbox):
+        return "masque de détection différent"
+
+    chart_geometry = camera_profile['chart_geometry']
+    if not _source_shape_compatible(chart_geometry['source_shape'], frame.shape):
+        return "format de la vidéo différent"
+    _, patch_lab = compute_patch_signature(sample_patch_colors(
+        resize_and_mask_frame(frame), compute_sample_points(chart_geometry), chart_geometry['source_shape']))
+    delta_e = float(np.mean(np.linalg.norm(patch_lab - camera_profile['patch_lab'], axis=1)))
+    if delta_e >= COLOR_DRIFT_DELTA_E_THRESHOLD:
+        return f"charte modifiée depuis la dernière calibration (ΔE {delta_e:.1f})"
+    return None
+
+def _same_chart_geometry(chart_geometry, other_geometry):
+    """Indique si deux géométries de charte sont identiques."""
+    return (chart_geometry is not None and other_geometry is not None
+            and chart_geometry['squares'] == other_geometry['squares']
+            and tuple(chart_geometry['source_shape']) == tuple(other_geometry['source_shape'])
+            and tuple(chart_geometry['warped_size']) == tuple(other_geometry['warped_size'])
+            and np.allclose(chart_geometry['perspective_matrix'], other_geometry['perspective_matrix']))
+
+def restore_camera_profile(frame, profile_path=CAMERA_PROFILE_PATH):
+    """
+    Restaure la géométrie de la charte et la correction enregistrées dans le profil.
+
+    Args:
+        frame (np.ndarray): Première frame BGR brute de la vidéo
+        profile_path (str): Fichier du profil
+
+    Returns:
+        bool: True si le profil est restauré, False si l'appelant doit détecter
+            la charte (profil désactivé, absent ou rejeté par check_camera_profile)
+
+    Notes:
+        - Le cache de la charte n'est réécrit que si sa géométrie diffère du profil
+    """
+    if not CAMERA_PROFILE_ENABLED:
+        return False
+    restore_start = time.perf_counter()
+    camera_profile = load_camera_profile(profile_path)
+    if camera_profile is None:
+        return False
+    rejection_reason = check_camera_profile(camera_profile, frame)
+    if rejection_reason is not None:
+        print(f"Profil caméra ignoré: {rejection_reason}")
+        return False
+
+    if not _same_chart_geometry(load_chart_geometry(), camera_profile['chart_geometry']):
+        save_chart_geometry(camera_profile['chart_geometry'])
+    start_chart_tracking(frame, camera_profile['chart_geometry'])
+    correction_lut = lut_depuis_table(camera_profile['lut_table']) if _correction_uses_lut() else None
+    # Référence du moniteur de dérive prise, comme à la calibration, sur la frame redimensionnée et masquée
+    restaurer_correction(camera_profile['correction_params'], correction_lut, resize_and_mask_frame(frame))
+    print(f"Profil caméra restauré ({(time.perf_counter() - restore_start) * 1000:.1f} ms)")
+    return True
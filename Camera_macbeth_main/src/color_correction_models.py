@@ -0,0 +1,125 @@
+"""
+Module des modèles de correction des couleurs.
+
+Chaque modèle est un dictionnaire enregistré sous un nom (COLOR_CORRECTION_MODEL):
+    - fit(colors_measured, colors_target, coefficients_init=None, max_nfev=None):
+      paramètres ajustés sur les patchs (couleurs (n,3) BGR normalisées [0,1])
+    - predict(params, colors): couleurs corrigées (n,3) normalisées, non bornées
+    - apply(frame, params): correction directe d'une image uint8, sans LUT
+    - use_lut (bool): si True, le modèle est évalué une fois sur la grille de
+      la LUT 3D et chaque frame est corrigée par la LUT; sinon, par apply
+
+Modèles disponibles:
+    - 'gamma': (a*B + b*G + c*R + d) ** gamma par canal, 15 paramètres
+      (enregistré par macbeth_nonlinear_color_correction)
+    - 'affine': [B, G, R, 1] @ A, matrice (4,3), appliqué par cv2.transform
+    - 'polynomial': polynôme de degré 2 (10 termes par canal)
+    - 'root_polynomial': racines des termes de degré 2 (6 termes par canal),
+      insensible à l'exposition (Finlayson et al., 2015)
+
+Les modèles linéaires en leurs paramètres sont ajustés par moindres carrés,
+en une seule résolution: le départ et le plafond d'itérations sont ignorés.
+Les modèles non linéaires passent par la LUT 3D (coût par frame identique
+quel que soit le modèle). Le modèle affine est appliqué par cv2.transform,
+plus rapide que la lecture de la LUT.
+"""
+
+import cv2
+import numpy as np
+
+# Registre des modèles, par nom
+CORRECTION_MODELS = {}
+
+def register_correction_model(model_name, fit, predict, apply, use_lut=True):
+    """
+    Enregistre un modèle de correction.
+
+    Args:
+        model_name (str): Nom du modèle (valeur de COLOR_CORRECTION_MODEL)
+        fit (callable): Ajustement des paramètres sur les patchs
+        predict (callable): Évaluation du modèle sur des couleurs normalisées
+        apply (callable): Correction directe d'une image uint8
+        use_lut (bool): Si False, les frames sont corrigées par apply plutôt que par la LUT
+    """
+    CORRECTION_MODELS[model_name] = {'name': model_name, 'fit': fit, 'predict': predict, 'apply': apply,
+                                     'use_lut': use_lut}
+
+def get_correction_model(model_name):
+    """
+    Retourne un modèle de correction enregistré.
+
+    Args:
+        model_name (str): Nom du modèle
+
+    Returns:
+        dict: name, fit, predict, apply et use_lut
+
+    Raises:
+        ValueError: Si le modèle est inconnu
+    """
+    if model_name not in CORRECTION_MODELS:
+        raise ValueError(f"Modèle de correction inconnu: {model_name} "
+                         f"(disponibles: {', '.join(sorted(CORRECTION_MODELS))})")
+    return CORRECTION_MODELS[model_name]
+
+def affine_features(colors):
+    """Termes du modèle affine: [B, G, R, 1]."""
+    return np.hstack([colors, np.ones((len(colors), 1), dtype=colors.dtype)])
+
+def polynomial_features(colors):
+    """Termes du polynôme de degré 2: [B, G, R, B², G², R², BG, GR, BR, 1]."""
+    blue, green, red = colors[:, 0:1], colors[:, 1:2], colors[:, 2:3]
+    return np.hstack([colors, colors * colors, blue * green, green * red, blue * red,
+                      np.ones((len(colors), 1), dtype=colors.dtype)])
+
+def root_polynomial_features(colors):
+    """Termes racine de degré 2: [B, G, R, √(BG), √(GR), √(BR)]."""
+    colors = np.maximum(colors, 0)
+    blue, green, red = colors[:, 0:1], colors[:, 1:2], colors[:, 2:3]
+    return np.hstack([colors, np.sqrt(blue * green), np.sqrt(green * red), np.sqrt(blue * red)])
+
+def make_linear_model(features):
+    """
+    Construit les fonctions d'un modèle linéaire en ses paramètres.
+
+    Args:
+        features (callable): Termes du modèle, (n,3) -> (n,k)
+
+    Returns:
+        tuple: (fit, predict, apply), paramètres: matrice (k,3)
+    """
+    def fit(colors_measured, colors_target, coefficients_init=None, max_nfev=None):
+        model_matrix, _, _, _ = np.linalg.lstsq(features(np.asarray(colors_measured, dtype=np.float64)),
+                                                np.asarray(colors_target, dtype=np.float64), rcond=None)
+        return model_matrix
+
+    def predict(model_matrix, colors):
+        return features(np.asarray(colors)) @ model_matrix.astype(np.asarray(colors).dtype)
+
+    def apply(frame, model_matrix):
+        h, w, _ = frame.shape
+        pixels = frame.reshape(-1, 3).astype(np.float32) / np.float32(255.0)
+        pixels_corrected = np.clip(predict(model_matrix, pixels), 0, 1) * np.float32(255.0)
+        return pixels_corrected.reshape(h, w, 3).astype(np.uint8)
+
+    return fit, predict, apply
+
+def apply_affine(frame, model_matrix):
+    """
+    Correction affine d'une image uint8 par cv2.transform.
+
+    Args:
+        frame (np.ndarray): Image (h, w, 3) uint8 en BGR
+        model_matrix (np.ndarray): Matrice (4,3) sur couleurs normalisées
+
+    Returns:
+        np.ndarray: Image corrigée uint8 (saturée dans [0, 255])
+    """
+    # Sur des valeurs [0-255]: sortie = A[:3]ᵀ · pixel + 255 · A[3]
+    transform_matrix = np.hstack([model_matrix[:3].T, 255.0 * model_matrix[3:].T]).astype(np.float32)
+    return cv2.transform(frame, transform_matrix)
+
+_fit_affine, _predict_affine, _ = make_linear_model(affine_features)
+register_correction_model('affine', _fit_affine, _predict_affine, apply_affine, use_lut=False)
+register_correction_model('polynomial', *make_linear_model(polynomial_features))
+register_correction_model('root_polynomial', *make_linear_model(root_polynomial_features))
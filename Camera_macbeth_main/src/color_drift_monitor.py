@@ -0,0 +1,255 @@
+"""
+Module de surveillance de la dérive des couleurs de la charte Macbeth.
+
+Plutôt que de recalibrer toutes les COLOR_CORRECTION_INTERVAL frames, les
+24 patchs de la charte sont échantillonnés régulièrement sur la frame
+courante, à partir de la géométrie enregistrée dans le cache (matrice de
+perspective et carrés de l'image redressée):
+1. Test rapide: variation relative de la luminance moyenne des patchs
+2. Si la luminance a varié: ΔE moyen (CIE76, espace Lab) entre les patchs
+   courants et ceux de la dernière calibration
+
+La recalibration n'est déclenchée que si le ΔE dépasse le seuil, au plus
+une fois toutes les COLOR_DRIFT_MIN_INTERVAL frames, et forcée après
+COLOR_DRIFT_MAX_INTERVAL frames. Sans géométrie dans le cache (cache d'une
+version antérieure), l'intervalle fixe reste appliqué.
+"""
+
+import cv2
+import numpy as np
+
+from config.color_config import (
+    COLOR_CORRECTION_INTERVAL,
+    COLOR_DRIFT_CHECK_INTERVAL,
+    COLOR_DRIFT_LUMINANCE_THRESHOLD,
+    COLOR_DRIFT_DELTA_E_THRESHOLD,
+    COLOR_DRIFT_MIN_INTERVAL,
+    COLOR_DRIFT_MAX_INTERVAL
+)
+from src.macbeth_color_and_rectangle_detector import load_chart_geometry
+
+# Points échantillonnés par patch: grille SAMPLE_GRID_SIZE x SAMPLE_GRID_SIZE à l'intérieur du carré
+SAMPLE_GRID_SIZE = 4
+
+# Conversion sRGB linéaire -> XYZ et blanc de référence D65 (valeurs d'OpenCV)
+RGB_TO_XYZ = np.array([[0.412453, 0.357580, 0.180423],
+                       [0.212671, 0.715160, 0.072169],
+                       [0.019334, 0.119193, 0.950227]])
+D65_WHITE_POINT = np.array([0.950456, 1.0, 1.088754])
+LAB_EPSILON = 0.008856
+LAB_KAPPA = 903.3
+
+def create_drift_monitor():
+    """
+    Crée un dictionnaire contenant l'état initial du moniteur de dérive.
+
+    Returns:
+        dict: État initial contenant:
+            - reference (dict or None): Points échantillonnés dans la frame source,
+              source_shape, luminance et couleurs Lab des patchs à la dernière calibration
+            - last_trigger_frame (int): Frame de la dernière recalibration
+            - last_decision_frame (int or None), last_decision (bool): Décision mémorisée
+              pour la frame courante (la décision peut être demandée deux fois par frame)
+            - last_luminance_change, last_delta_e (float): Dernières mesures
+            - checks, drift_triggers, forced_triggers, interval_triggers, rate_limited (int): Compteurs
+    """
+    return {
+        'reference': None,
+        'last_trigger_frame': 0,
+        'last_decision_frame': None,
+        'last_decision': False,
+        'last_luminance_change': 0.0,
+        'last_delta_e': 0.0,
+        'checks': 0,
+        'drift_triggers': 0,
+        'forced_triggers': 0,
+        'interval_triggers': 0,
+        'rate_limited': 0
+    }
+
+def compute_sample_points(chart_geometry):
+    """
+    Projette une grille de points de chaque carré dans la frame source.
+
+    Args:
+        chart_geometry (dict): Géométrie retournée par load_chart_geometry
+
+    Returns:
+        np.ndarray: Points (24, SAMPLE_GRID_SIZE², 2) en coordonnées (x, y) de la
+            frame source, patchs dans l'ordre de get_average_colors
+    """
+    grid_offsets = (np.arange(SAMPLE_GRID_SIZE) + 0.5) / SAMPLE_GRID_SIZE
+    offset_x, offset_y = np.meshgrid(grid_offsets, grid_offsets)
+    warped_points = np.array([np.stack([x + offset_x.ravel() * w, y + offset_y.ravel() * h], axis=1)
+                              for (x, y, w, h) in reversed(chart_geometry['squares'])], dtype=np.float64)
+    inverse_matrix = np.linalg.inv(chart_geometry['perspective_matrix'])
+    source_points = cv2.perspectiveTransform(warped_points.reshape(-1, 1, 2), inverse_matrix)
+    return source_points.reshape(warped_points.shape)
+
+def sample_patch_colors(frame, sample_points, source_shape):
+    """
+    Mesure les couleurs moyennes des patchs aux points échantillonnés.
+
+    Args:
+        frame (np.ndarray): Frame BGR (source ou redimensionnée)
+        sample_points (np.ndarray): Points (24, k, 2) dans la frame source
+        source_shape (tuple): Dimensions (h, w) de la frame source
+
+    Returns:
+        np.ndarray: Couleurs moyennes (24, 3) en BGR, float32 [0-255]
+    """
+    frame_height, frame_width = frame.shape[:2]
+    points_x = np.clip(np.rint(sample_points[..., 0] * frame_width / source_shape[1]), 0, frame_width - 1)
+    points_y = np.clip(np.rint(sample_points[..., 1] * frame_height / source_shape[0]), 0, frame_height - 1)
+    return frame[points_y.astype(np.intp), points_x.astype(np.intp)].mean(axis=1, dtype=np.float32)
+
+def bgr_to_lab(colors_bgr):
+    """
+    Convertit des couleurs BGR en Lab (sRGB, illuminant D65), comme cv2.COLOR_BGR2Lab.
+
+    Pour 24 couleurs, le calcul numpy évite l'initialisation des tables de
+    conversion d'OpenCV (~130 ms au premier appel, sur la frame de calibration).
+
+    Args:
+        colors_bgr (np.ndarray): Couleurs (n, 3) en BGR [0-255]
+
+    Returns:
+        np.ndarray: Couleurs (n, 3) Lab, L dans [0, 100]
+    """
+    colors_rgb = np.asarray(colors_bgr, dtype=np.float64)[:, ::-1] / 255.0
+    colors_linear = np.where(colors_rgb <= 0.04045, colors_rgb / 12.92, ((colors_rgb + 0.055) / 1.055) ** 2.4)
+    colors_xyz = colors_linear @ RGB_TO_XYZ.T / D65_WHITE_POINT
+    colors_f = np.where(colors_xyz > LAB_EPSILON, np.cbrt(colors_xyz), (LAB_KAPPA * colors_xyz + 16) / 116)
+    return np.stack([116 * colors_f[:, 1] - 16,
+                     500 * (colors_f[:, 0] - colors_f[:, 1]),
+                     200 * (colors_f[:, 1] - colors_f[:, 2])], axis=1).astype(np.float32)
+
+def compute_patch_signature(patch_colors):
+    """
+    Calcule la luminance moyenne et les couleurs Lab des patchs.
+
+    Args:
+        patch_colors (np.ndarray): Couleurs (24, 3) en BGR [0-255]
+
+    Returns:
+        tuple[float, np.ndarray]: (luminance moyenne [0-255], couleurs Lab (24, 3))
+    """
+    luminance = float(np.mean(patch_colors @ np.array([0.114, 0.587, 0.299], dtype=np.float32)))
+    return luminance, bgr_to_lab(patch_colors)
+
+def set_drift_reference(drift_state, frame, frame_index):
+    """
+    Enregistre les patchs de la frame utilisée pour la dernière calibration.
+
+    La géométrie est relue depuis le cache, qu'une détection a pu mettre à jour.
+
+    Args:
+        drift_state (dict): État du moniteur (voir create_drift_monitor)
+        frame (np.ndarray): Frame BGR sur laquelle la calibration a été faite
+        frame_index (int): Numéro de cette frame
+    """
+    drift_state['last_trigger_frame'] = frame_index
+    chart_geometry = load_chart_geometry()
+    if chart_geometry is None:
+        drift_state['reference'] = None
+        return
+
+    sample_points = compute_sample_points(chart_geometry)
+    luminance, patch_lab = compute_patch_signature(
+        sample_patch_colors(frame, sample_points, chart_geometry['source_shape']))
+    # Un seul dictionnaire remplacé d'un bloc: le thread principal n'en voit jamais un état partiel
+    drift_state['reference'] = {
+        'sample_points': sample_points,
+        'source_shape': chart_geometry['source_shape'],
+        'luminance': luminance,
+        'lab': patch_lab
+    }
+
+def measure_color_drift(drift_state, frame, reference):
+    """
+    Mesure la dérive des patchs par rapport à la référence.
+
+    Args:
+        drift_state (dict): État du moniteur (voir create_drift_monitor)
+        frame (np.ndarray): Frame BGR courante
+        reference (dict): Référence enregistrée par set_drift_reference
+
+    Returns:
+        float: ΔE moyen, 0.0 si la luminance n'a pas varié au-delà du seuil
+    """
+    drift_state['checks'] += 1
+    luminance, patch_lab = compute_patch_signature(
+        sample_patch_colors(frame, reference['sample_points'], reference['source_shape']))
+    luminance_change = abs(luminance - reference['luminance']) / max(reference['luminance'], 1.0)
+    drift_state['last_luminance_change'] = luminance_change
+    if luminance_change < COLOR_DRIFT_LUMINANCE_THRESHOLD:
+        return 0.0
+
+    delta_e = float(np.mean(np.linalg.norm(patch_lab - reference['lab'], axis=1)))
+    drift_state['last_delta_e'] = delta_e
+    return delta_e
+
+def should_recalibrate(drift_state, frame, frame_index):
+    """
+    Indique si la correction des couleurs doit être recalibrée sur cette frame.
+
+    Args:
+        drift_state (dict): État du moniteur (voir create_drift_monitor)
+        frame (np.ndarray or None): Frame BGR courante
+        frame_index (int): Numéro de la frame
+
+    Returns:
+        bool: True si la recalibration doit être lancée
+
+    Notes:
+        - La décision est mémorisée: un second appel pour la même frame la retourne
+        - Sans référence, recalibration toutes les COLOR_CORRECTION_INTERVAL frames
+    """
+    if drift_state['last_decision_frame'] == frame_index:
+        return drift_state['last_decision']
+
+    frames_since_trigger = frame_index - drift_state['last_trigger_frame']
+    reference = drift_state['reference']
+    recalibrate = False
+    if reference is None:
+        if frame_index % COLOR_CORRECTION_INTERVAL == 0:
+            drift_state['interval_triggers'] += 1
+            recalibrate = True
+    elif COLOR_DRIFT_MAX_INTERVAL and frames_since_trigger >= COLOR_DRIFT_MAX_INTERVAL:
+        drift_state['forced_triggers'] += 1
+        recalibrate = True
+    elif frame is not None and frame_index % COLOR_DRIFT_CHECK_INTERVAL == 0:
+        if measure_color_drift(drift_state, frame, reference) >= COLOR_DRIFT_DELTA_E_THRESHOLD:
+            if frames_since_trigger < COLOR_DRIFT_MIN_INTERVAL:
+                drift_state['rate_limited'] += 1
+            else:
+                drift_state['drift_triggers'] += 1
+                recalibrate = True
+
+    drift_state['last_decision_frame'] = frame_index
+    drift_state['last_decision'] = recalibrate
+    if recalibrate:
+        drift_state['last_trigger_frame'] = frame_index
+    return recalibrate
+
+def get_drift_monitor_stats(drift_state):
+    """
+    Retourne les compteurs du moniteur de dérive.
+
+    Args:
+        drift_state (dict): État du moniteur (voir create_drift_monitor)
+
+    Returns:
+        dict: checks, drift_triggers, forced_triggers, interval_triggers, rate_limited,
+            last_luminance_change, last_delta_e et has_reference
+    """
+    return {
+        'checks': drift_state['checks'],
+        'drift_triggers': drift_state['drift_triggers'],
+        'forced_triggers': drift_state['forced_triggers'],
+        'interval_triggers': drift_state['interval_triggers'],
+        'rate_limited': drift_state['rate_limited'],
+        'last_luminance_change': drift_state['last_luminance_change'],
+        'last_delta_e': drift_state['last_delta_e'],
+        'has_reference': drift_state['reference'] is not None
+    }
@@ -12,6 +12,7 @@ from config.display_config import (
 
 # Si vous exécutez depuis la racine du projet, gardez cette ligne
 from src.color_detector import get_dominant_color, visualize_color
+from src.stage_profiler import profile_stage
 
 # Si vous exécutez directement le fichier, utilisez plutôt:
 # import sys, os
@@ -41,7 +42,51 @@ def init_display() -> None:
                 output_width, output_height)
         )
 
-def draw_person(frame_display, tracked_person_data):
+def get_person_detection_zone(frame_display, tracked_person_data):
+    """
+    Calcule la zone d'intérêt (ROI) utilisée pour la détection de couleur.
+    
+    La zone couvre le haut du corps: 30% à 70% de la largeur et
+    20% à 40% de la hauteur de la boîte englobante.
+    
+    Args:
+        frame_display (np.array): Image de référence pour les limites
+        tracked_person_data (dict): Informations de la personne
+    
+    Returns:
+        tuple or None: Coordonnées (x1, y1, x2, y2) ou None si la zone sort de l'image
+    """
+    person_bbox_x1, person_bbox_y1, person_bbox_x2, person_bbox_y2 = map(int, tracked_person_data['bbox'])
+    detection_zone_x1 = int(person_bbox_x1 + (person_bbox_x2 - person_bbox_x1) * 0.30)
+    detection_zone_x2 = int(person_bbox_x1 + (person_bbox_x2 - person_bbox_x1) * 0.70)
+    detection_zone_y1 = int(person_bbox_y1 + (person_bbox_y2 - person_bbox_y1) * 0.2)
+    detection_zone_y2 = int(person_bbox_y1 + (person_bbox_y2 - person_bbox_y1) * 0.4)
+    
+    if (detection_zone_x1 >= 0 and detection_zone_y1 >= 0 and 
+        detection_zone_x2 <= frame_display.shape[1] and 
+        detection_zone_y2 <= frame_display.shape[0]):
+        return (detection_zone_x1, detection_zone_y1, 
+                detection_zone_x2, detection_zone_y2)
+    return None
+
+def detect_person_color(frame_display, tracked_person_data):
+    """
+    Détecte la couleur dominante d'une personne et la stocke dans ses données.
+    
+    Args:
+        frame_display (np.array): Image analysée
+        tracked_person_data (dict): Informations de la personne (clé 'value' mise à jour)
+    
+    Returns:
+        tuple or None: Zone de détection utilisée, None si elle sort de l'image
+    """
+    detection_zone_coords = get_person_detection_zone(frame_display, tracked_person_data)
+    if detection_zone_coords is not None:
+        with profile_stage('dominant_color'):
+            tracked_person_data['value'] = get_dominant_color(frame_display, detection_zone_coords)
+    return detection_zone_coords
+
+def draw_person(frame_display, tracked_person_data, detect_color=True):
     """
     Dessine les éléments visuels pour une personne détectée.
     
@@ -55,6 +100,8 @@ def draw_person(frame_display, tracked_person_data):
     Args:
         frame_display (np.array): Image sur laquelle dessiner
         tracked_person_data (dict): Informations de la personne
+        detect_color (bool): Si False, réutilise la couleur déjà détectée
+            (mode pipeline où la détection est faite par l'étape de suivi)
     """
     person_bbox_x1, person_bbox_y1, person_bbox_x2, person_bbox_y2 = map(int, tracked_person_data['bbox'])
     cv2.rectangle(frame_display, 
@@ -64,21 +111,13 @@ def draw_person(frame_display, tracked_person_data):
     
     # ROI et couleur conditionnels
     if SHOW_ROI_AND_COLOR:
-        detection_zone_x1 = int(person_bbox_x1 + (person_bbox_x2 - person_bbox_x1) * 0.30)
-        detection_zone_x2 = int(person_bbox_x1 + (person_bbox_x2 - person_bbox_x1) * 0.70)
-        detection_zone_y1 = int(person_bbox_y1 + (person_bbox_y2 - person_bbox_y1) * 0.2)
-        detection_zone_y2 = int(person_bbox_y1 + (person_bbox_y2 - person_bbox_y1) * 0.4)
+        if detect_color:
+            detection_zone_coords = detect_person_color(frame_display, tracked_person_data)
+        else:
+            detection_zone_coords = get_person_detection_zone(frame_display, tracked_person_data)
         
-        if (detection_zone_x1 >= 0 and detection_zone_y1 >= 0 and 
-            detection_zone_x2 <= frame_display.shape[1] and 
-            detection_zone_y2 <= frame_display.shape[0]):
-            
-            detection_zone_coords = (detection_zone_x1, detection_zone_y1, 
-                                   detection_zone_x2, detection_zone_y2)
-            
-            detected_value = get_dominant_color(frame_display, detection_zone_coords)
-            tracked_person_data['value'] = detected_value
-            visualize_color(frame_display, detection_zone_coords, detected_value)
+        if detection_zone_coords is not None:
+            visualize_color(frame_display, detection_zone_coords, tracked_person_data['value'])
     
     # Éléments visuels optionnels
     if SHOW_LABELS:
@@ -0,0 +1,198 @@
+"""
+Module de lecture anticipée des frames vidéo.
+
+Ce module décode la vidéo sur un thread en arrière-plan afin que le décodage
+H.264 se superpose à la correction des couleurs, à l'inférence YOLO et à
+l'affichage effectués sur le thread principal.
+
+Les frames sont décodées directement dans un tampon circulaire de frames
+préallouées, ce qui évite une allocation par frame.
+"""
+
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class FramePrefetchReader:
+    """
+    Lecteur vidéo qui décode les frames en arrière-plan.
+
+    Expose le même contrat que l'objet retourné par setup_video_capture:
+    read() retourne (ret, frame) et release() libère la vidéo.
+
+    La frame retournée par read() référence un emplacement du tampon circulaire:
+    elle reste valide jusqu'au prochain appel à read().
+
+    Attributes:
+        buffer_size (int): Nombre d'emplacements du tampon circulaire
+        drop_frames (bool): Si True, la plus ancienne frame en attente est écrasée
+            quand le tampon est plein au lieu de bloquer le décodage
+        dropped_frames (int): Nombre de frames écrasées avant d'avoir été lues
+    """
+
+    def __init__(self, video_capture, buffer_size=8, drop_frames=False):
+        """
+        Démarre le décodage en arrière-plan.
+
+        Args:
+            video_capture (cv2.VideoCapture): Capture vidéo déjà ouverte
+            buffer_size (int): Nombre de frames préallouées (au moins 2)
+            drop_frames (bool): Politique quand le tampon est plein
+        """
+        self.buffer_size = max(2, int(buffer_size))
+        self.drop_frames = drop_frames
+        self.dropped_frames = 0
+
+        self._video_capture = video_capture
+        self._frame_slots = []
+        self._free_slots = deque()
+        self._ready_slots = deque()
+        self._held_slot = None
+        self._end_of_stream = False
+        self._stopped = False
+        self._condition = threading.Condition()
+
+        # La première frame fixe les dimensions des emplacements préalloués
+        ret, first_frame = self._video_capture.read()
+        if ret and first_frame is not None:
+            self._frame_slots = [np.empty_like(first_frame) for _ in range(self.buffer_size)]
+            self._frame_slots[0][...] = first_frame
+            self._ready_slots.append(0)
+            self._free_slots.extend(range(1, self.buffer_size))
+        else:
+            self._end_of_stream = True
+
+        self._decode_thread = threading.Thread(target=self._decode_loop,
+                                               name="FramePrefetchReader",
+                                               daemon=True)
+        if not self._end_of_stream:
+            self._decode_thread.start()
+
+    def _acquire_free_slot(self):
+        """
+        Récupère un emplacement libre pour la prochaine frame décodée.
+
+        Returns:
+            int or None: Indice de l'emplacement, None si le lecteur est arrêté
+        """
+        with self._condition:
+            while not self._free_slots and not self._stopped:
+                if self.drop_frames and self._ready_slots:
+                    # Écrase la plus ancienne frame encore non lue
+                    self._free_slots.append(self._ready_slots.popleft())
+                    self.dropped_frames += 1
+                    break
+                self._condition.wait()
+            if self._stopped:
+                return None
+            return self._free_slots.popleft()
+
+    def _decode_loop(self):
+        """Boucle de décodage exécutée sur le thread en arrière-plan."""
+        while True:
+            slot_index = self._acquire_free_slot()
+            if slot_index is None:
+                return
+
+            slot = self._frame_slots[slot_index]
+            ret, decoded_frame = self._video_capture.read(slot)
+            if ret and decoded_frame is not None and decoded_frame is not slot:
+                # Dimensions différentes: OpenCV a réalloué la frame
+                if decoded_frame.shape == slot.shape:
+                    slot[...] = decoded_frame
+                else:
+                    self._frame_slots[slot_index] = decoded_frame
+
+            with self._condition:
+                if not ret or decoded_frame is None:
+                    self._free_slots.append(slot_index)
+                    self._end_of_stream = True
+                    self._condition.notify_all()
+                    return
+                self._ready_slots.append(slot_index)
+                self._condition.notify_all()
+
+    def read(self):
+        """
+        Retourne la prochaine frame décodée.
+
+        Returns:
+            tuple[bool, np.ndarray | None]: (ret, frame) comme cv2.VideoCapture.read()
+        """
+        with self._condition:
+            # L'emplacement lu précédemment peut être réutilisé par le décodeur
+            if self._held_slot is not None:
+                self._free_slots.append(self._held_slot)
+                self._held_slot = None
+                self._condition.notify_all()
+
+            while not self._ready_slots and not self._end_of_stream and not self._stopped:
+                self._condition.wait()
+
+            if not self._ready_slots:
+                return False, None
+
+            self._held_slot = self._ready_slots.popleft()
+            return True, self._frame_slots[self._held_slot]
+
+    def get_buffer_fill(self):
+        """
+        Indique le taux de remplissage du tampon circulaire.
+
+        Returns:
+            float: Proportion des emplacements contenant une frame prête [0-1]
+        """
+        with self._condition:
+            return len(self._ready_slots) / self.buffer_size
+
+    def get_stats(self):
+        """
+        Retourne les statistiques du lecteur.
+
+        Returns:
+            dict: buffered_frames, buffer_size, buffer_fill et dropped_frames
+        """
+        with self._condition:
+            buffered_frames = len(self._ready_slots)
+        return {
+            'buffered_frames': buffered_frames,
+            'buffer_size': self.buffer_size,
+            'buffer_fill': buffered_frames / self.buffer_size,
+            'dropped_frames': self.dropped_frames
+        }
+
+    def isOpened(self):
+        """Indique si la capture vidéo sous-jacente est ouverte."""
+        return self._video_capture.isOpened()
+
+    def get(self, property_id):
+        """Lit une propriété de la capture vidéo sous-jacente."""
+        return self._video_capture.get(property_id)
+
+    def release(self):
+        """Arrête le thread de décodage et libère la capture vidéo."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._decode_thread.is_alive():
+            self._decode_thread.join()
+        self._video_capture.release()
+
+
+def setup_prefetch_reader(video_capture, buffer_size, drop_frames=False):
+    """
+    Encapsule une capture vidéo dans un lecteur à décodage anticipé.
+
+    Args:
+        video_capture (cv2.VideoCapture): Capture vidéo configurée
+        buffer_size (int): Nombre de frames préallouées
+        drop_frames (bool): Si True, écrase les frames non lues quand le tampon est plein
+
+    Returns:
+        FramePrefetchReader: Lecteur exposant le même contrat read()/release()
+    """
+    reader = FramePrefetchReader(video_capture, buffer_size, drop_frames)
+    print(f"Lecture anticipée activée ({reader.buffer_size} frames en tampon)")
+    return reader
@@ -0,0 +1,86 @@
+"""
+Module de prédiction des boîtes englobantes par filtre de Kalman.
+
+Chaque personne suivie porte un filtre de Kalman à vitesse constante sur
+les coordonnées de sa boîte [x1, y1, x2, y2]. Entre deux passages du
+détecteur (mode détection toutes les N frames), la boîte est avancée par
+la seule étape de prédiction. À chaque détection, la boîte mesurée corrige
+l'état et affine l'estimation de la vitesse.
+
+État (8 valeurs): [x1, y1, x2, y2, vx1, vy1, vx2, vy2], vitesses en pixels par frame.
+"""
+
+import numpy as np
+
+# Bruits du modèle (écarts-types en pixels)
+KALMAN_POSITION_NOISE = 1.0      # Bruit de processus sur les positions
+KALMAN_VELOCITY_NOISE = 0.5      # Bruit de processus sur les vitesses (accélérations)
+KALMAN_MEASUREMENT_NOISE = 4.0   # Bruit de mesure des boîtes détectées
+KALMAN_INITIAL_VELOCITY_STD = 10.0  # Incertitude initiale sur les vitesses
+
+# Matrices du modèle à vitesse constante (pas d'une frame)
+_TRANSITION_MATRIX = np.eye(8)
+_TRANSITION_MATRIX[:4, 4:] = np.eye(4)
+_MEASUREMENT_MATRIX = np.eye(4, 8)
+_PROCESS_COVARIANCE = np.diag([KALMAN_POSITION_NOISE ** 2] * 4 + [KALMAN_VELOCITY_NOISE ** 2] * 4)
+_MEASUREMENT_COVARIANCE = np.eye(4) * KALMAN_MEASUREMENT_NOISE ** 2
+
+def create_kalman_filter(person_bbox_coords):
+    """
+    Crée un filtre de Kalman initialisé sur une boîte détectée.
+
+    Args:
+        person_bbox_coords (np.ndarray): Coordonnées [x1, y1, x2, y2]
+
+    Returns:
+        dict: Filtre contenant:
+            - mean (np.ndarray): État (8,), vitesses initiales nulles
+            - covariance (np.ndarray): Covariance de l'état (8, 8)
+    """
+    state_mean = np.zeros(8)
+    state_mean[:4] = person_bbox_coords
+    state_covariance = np.diag([KALMAN_MEASUREMENT_NOISE ** 2] * 4 + [KALMAN_INITIAL_VELOCITY_STD ** 2] * 4)
+    return {'mean': state_mean, 'covariance': state_covariance}
+
+def predict_kalman(kalman_filter):
+    """
+    Avance le filtre d'une frame.
+
+    Args:
+        kalman_filter (dict): Filtre (voir create_kalman_filter), modifié en place
+
+    Returns:
+        np.ndarray: Boîte prédite [x1, y1, x2, y2]
+    """
+    kalman_filter['mean'] = _TRANSITION_MATRIX @ kalman_filter['mean']
+    kalman_filter['covariance'] = (_TRANSITION_MATRIX @ kalman_filter['covariance'] @ _TRANSITION_MATRIX.T
+                                   + _PROCESS_COVARIANCE)
+    return kalman_filter['mean'][:4].astype(np.float32)
+
+def correct_kalman(kalman_filter, person_bbox_coords):
+    """
+    Corrige l'état du filtre avec une boîte mesurée.
+
+    Args:
+        kalman_filter (dict): Filtre (voir create_kalman_filter), modifié en place
+        person_bbox_coords (np.ndarray): Boîte détectée [x1, y1, x2, y2]
+    """
+    state_covariance = kalman_filter['covariance']
+    innovation = np.asarray(person_bbox_coords, dtype=np.float64) - _MEASUREMENT_MATRIX @ kalman_filter['mean']
+    innovation_covariance = _MEASUREMENT_MATRIX @ state_covariance @ _MEASUREMENT_MATRIX.T + _MEASUREMENT_COVARIANCE
+    kalman_gain = np.linalg.solve(innovation_covariance, _MEASUREMENT_MATRIX @ state_covariance).T
+    kalman_filter['mean'] = kalman_filter['mean'] + kalman_gain @ innovation
+    kalman_filter['covariance'] = state_covariance - kalman_gain @ _MEASUREMENT_MATRIX @ state_covariance
+
+def get_bottom_center_velocity(kalman_filter):
+    """
+    Vitesse estimée du point bas central de la boîte.
+
+    Args:
+        kalman_filter (dict): Filtre (voir create_kalman_filter)
+
+    Returns:
+        np.ndarray: Vitesse (vx, vy) en pixels par frame
+    """
+    velocity = kalman_filter['mean'][4:]
+    return np.array([(velocity[0] + velocity[2]) / 2, velocity[3]])
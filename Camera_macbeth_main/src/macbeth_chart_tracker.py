@@ -0,0 +1,234 @@
+"""
+Module de suivi de la charte Macbeth d'une frame à l'autre.
+
+La détection complète (detect_macbeth_in_scene: seuillage HSV, morphologie,
+contours, redressement, Canny et recherche des carrés) est coûteuse. Une fois
+la charte trouvée, la frame de la détection devient l'image clé du suivi:
+1. Points caractéristiques de l'image clé, dans le quadrilatère de la
+   charte, extraits une seule fois
+2. Flux optique pyramidal (Lucas-Kanade) de l'image clé vers la frame
+   courante, dans une fenêtre autour de la charte, initialisé par
+   l'homographie de la frame précédente; validation aller-retour: seuls les
+   points revenant à moins d'un pixel de leur départ sont conservés
+3. Homographie RANSAC image clé -> frame courante, appliquée aux coins
+
+L'homographie étant toujours estimée depuis l'image clé, les erreurs ne
+s'accumulent pas d'une frame à l'autre, et une charte immobile garde
+exactement ses coins. Les carrés, définis dans l'image redressée, ne changent
+pas: seule la matrice de perspective est mise à jour. Le suivi est rejeté
+(et le détecteur complet relancé par l'appelant, ce qui renouvelle l'image
+clé) si les points cohérents avec l'homographie sont trop peu nombreux (charte
+masquée, déplacée hors de la fenêtre, éclairage trop différent de l'image
+clé), si le quadrilatère obtenu est dégénéré, ou après
+CHART_TRACKING_REDETECT_INTERVAL frames suivies.
+"""
+
+import cv2
+import numpy as np
+
+from config.detection_config import (
+    CHART_TRACKING_SEARCH_MARGIN,
+    CHART_TRACKING_MAX_FEATURES,
+    CHART_TRACKING_MIN_INLIERS,
+    CHART_TRACKING_MIN_INLIER_RATIO,
+    CHART_TRACKING_STATIC_THRESHOLD,
+    CHART_TRACKING_REDETECT_INTERVAL
+)
+
+# Paramètres du flux optique et de la validation aller-retour
+OPTICAL_FLOW_PARAMS = dict(winSize=(21, 21), maxLevel=3,
+                           criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01))
+FORWARD_BACKWARD_MAX_ERROR = 1.0  # Écart maximal (pixels) entre un point et son retour
+RANSAC_REPROJECTION_THRESHOLD = 2.0
+MAX_AREA_CHANGE = 2.0  # Rapport maximal d'aire du quadrilatère entre deux frames
+
+def create_chart_tracker():
+    """
+    Crée un dictionnaire contenant l'état initial du suivi de la charte.
+
+    Returns:
+        dict: État initial contenant:
+            - keyframe_gray (np.ndarray or None): Image clé en niveaux de gris (frame de la détection)
+            - keyframe_features (np.ndarray or None): Points (n, 1, 2) suivis, dans l'image clé
+            - keyframe_corners (np.ndarray or None): Coins (4, 2) de la charte dans l'image clé
+            - homography (np.ndarray or None): Homographie image clé -> dernière frame suivie
+            - chart_geometry (dict or None): Géométrie courante (voir load_chart_geometry)
+            - frames_since_detection (int): Frames suivies depuis la dernière détection complète
+            - last_inliers, last_inlier_ratio: Confiance du dernier suivi
+            - tracked_frames, static_frames, rejected_frames, forced_detections (int): Compteurs
+    """
+    return {
+        'keyframe_gray': None,
+        'keyframe_features': None,
+        'keyframe_corners': None,
+        'homography': None,
+        'chart_geometry': None,
+        'frames_since_detection': 0,
+        'last_inliers': 0,
+        'last_inlier_ratio': 0.0,
+        'tracked_frames': 0,
+        'static_frames': 0,
+        'rejected_frames': 0,
+        'forced_detections': 0
+    }
+
+def reset_chart_tracker(tracker_state, frame_raw, chart_geometry, chart_corners):
+    """
+    Prend la frame d'une détection complète comme nouvelle image clé.
+
+    Args:
+        tracker_state (dict): État du suivi (voir create_chart_tracker)
+        frame_raw (np.ndarray): Frame BGR sur laquelle la charte a été détectée
+        chart_geometry (dict or None): Géométrie détectée, None pour arrêter le suivi
+        chart_corners (np.ndarray or None): Coins (4, 2) de la charte dans frame_raw
+
+    Notes:
+        - Le suivi est aussi arrêté si la charte n'offre pas assez de points à suivre
+    """
+    tracker_state['keyframe_gray'] = tracker_state['keyframe_features'] = None
+    tracker_state['chart_geometry'] = None
+    if chart_geometry is None:
+        return
+    keyframe_gray = cv2.cvtColor(frame_raw, cv2.COLOR_BGR2GRAY)
+    keyframe_corners = np.asarray(chart_corners, dtype=np.float32).reshape(4, 2)
+    feature_mask = np.zeros(keyframe_gray.shape, dtype=np.uint8)
+    cv2.fillConvexPoly(feature_mask, np.rint(keyframe_corners).astype(np.int32), 255)
+    keyframe_features = cv2.goodFeaturesToTrack(keyframe_gray, CHART_TRACKING_MAX_FEATURES, 0.01, 8,
+                                                mask=feature_mask)
+    if keyframe_features is None or len(keyframe_features) < CHART_TRACKING_MIN_INLIERS:
+        return
+
+    tracker_state['keyframe_gray'] = keyframe_gray
+    tracker_state['keyframe_features'] = keyframe_features
+    tracker_state['keyframe_corners'] = keyframe_corners
+    tracker_state['homography'] = np.eye(3)
+    tracker_state['chart_geometry'] = chart_geometry
+    tracker_state['frames_since_detection'] = 0
+
+def _search_window(corners, frame_shape):
+    """Fenêtre (x0, y0, x1, y1) englobant les coins, élargie de CHART_TRACKING_SEARCH_MARGIN."""
+    frame_height, frame_width = frame_shape[:2]
+    x0, y0 = np.floor(corners.min(axis=0)).astype(int) - CHART_TRACKING_SEARCH_MARGIN
+    x1, y1 = np.ceil(corners.max(axis=0)).astype(int) + CHART_TRACKING_SEARCH_MARGIN
+    return max(x0, 0), max(y0, 0), min(x1, frame_width), min(y1, frame_height)
+
+def _is_valid_quad(corners, previous_corners):
+    """Quadrilatère convexe, d'aire comparable à celle de la frame précédente."""
+    if not cv2.isContourConvex(corners.reshape(-1, 1, 2)):
+        return False
+    area_ratio = cv2.contourArea(corners) / max(cv2.contourArea(previous_corners), 1.0)
+    return 1.0 / MAX_AREA_CHANGE <= area_ratio <= MAX_AREA_CHANGE
+
+def _estimate_homography(keyframe_crop, current_crop, features, predicted):
+    """
+    Estime l'homographie image clé -> frame courante dans une fenêtre commune.
+
+    Args:
+        keyframe_crop, current_crop (np.ndarray): Fenêtre des deux images en niveaux de gris
+        features (np.ndarray): Points (n, 1, 2) de l'image clé, coordonnées de la fenêtre
+        predicted (np.ndarray): Position prédite des points dans la frame courante
+
+    Returns:
+        tuple: (homographie 3x3 ou None, points cohérents, proportion de points
+            cohérents, écart médian en pixels entre points suivis et prédits)
+    """
+    tracked, status, _ = cv2.calcOpticalFlowPyrLK(keyframe_crop, current_crop, features, predicted.copy(),
+                                                  flags=cv2.OPTFLOW_USE_INITIAL_FLOW, **OPTICAL_FLOW_PARAMS)
+    returned, back_status, _ = cv2.calcOpticalFlowPyrLK(current_crop, keyframe_crop, tracked, features.copy(),
+                                                        flags=cv2.OPTFLOW_USE_INITIAL_FLOW, **OPTICAL_FLOW_PARAMS)
+    forward_backward_error = np.linalg.norm((returned - features).reshape(-1, 2), axis=1)
+    valid = (status.ravel() == 1) & (back_status.ravel() == 1) & (forward_backward_error < FORWARD_BACKWARD_MAX_ERROR)
+    valid_count = int(np.count_nonzero(valid))
+    if valid_count < CHART_TRACKING_MIN_INLIERS:
+        return None, valid_count, valid_count / len(features), 0.0
+
+    homography, inlier_mask = cv2.findHomography(features[valid], tracked[valid], cv2.RANSAC,
+                                                 RANSAC_REPROJECTION_THRESHOLD)
+    if homography is None:
+        return None, 0, 0.0, 0.0
+    inliers = inlier_mask.ravel().astype(bool)
+    prediction_errors = np.linalg.norm((tracked[valid] - predicted[valid]).reshape(-1, 2)[inliers], axis=1)
+    return (homography, int(np.count_nonzero(inliers)), np.count_nonzero(inliers) / len(features),
+            float(np.median(prediction_errors)) if len(prediction_errors) else 0.0)
+
+def track_chart(tracker_state, frame_raw):
+    """
+    Suit la charte de l'image clé à frame_raw.
+
+    Args:
+        tracker_state (dict): État du suivi (voir create_chart_tracker)
+        frame_raw (np.ndarray): Frame BGR courante
+
+    Returns:
+        dict or None: Géométrie de la charte dans frame_raw (carrés et dimensions
+            inchangés, nouvelle matrice de perspective), None si le détecteur
+            complet doit être relancé (pas d'image clé, dimensions de frame
+            différentes, confiance insuffisante ou détection forcée)
+    """
+    keyframe_gray = tracker_state['keyframe_gray']
+    if keyframe_gray is None or keyframe_gray.shape != frame_raw.shape[:2]:
+        return None
+    if CHART_TRACKING_REDETECT_INTERVAL and tracker_state['frames_since_detection'] >= CHART_TRACKING_REDETECT_INTERVAL:
+        tracker_state['forced_detections'] += 1
+        return None
+
+    # Fenêtre commune: charte dans l'image clé et à sa dernière position suivie
+    keyframe_corners = tracker_state['keyframe_corners']
+    previous_homography = tracker_state['homography']
+    previous_corners = cv2.perspectiveTransform(keyframe_corners.reshape(-1, 1, 2).astype(np.float64),
+                                                previous_homography).reshape(4, 2).astype(np.float32)
+    x0, y0, x1, y1 = _search_window(np.vstack([keyframe_corners, previous_corners]), frame_raw.shape)
+    window_offset = np.array([x0, y0], dtype=np.float32)
+    frame_crop = cv2.cvtColor(frame_raw[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+    features = tracker_state['keyframe_features']
+    predicted = cv2.perspectiveTransform(features.astype(np.float64), previous_homography).astype(np.float32)
+
+    homography, inlier_count, inlier_ratio, prediction_error = _estimate_homography(
+        keyframe_gray[y0:y1, x0:x1], frame_crop, features - window_offset, predicted - window_offset)
+    tracker_state['last_inliers'] = inlier_count
+    tracker_state['last_inlier_ratio'] = inlier_ratio
+    if homography is None or inlier_count < CHART_TRACKING_MIN_INLIERS or inlier_ratio < CHART_TRACKING_MIN_INLIER_RATIO:
+        tracker_state['rejected_frames'] += 1
+        return None
+
+    if prediction_error < CHART_TRACKING_STATIC_THRESHOLD:
+        # Charte immobile depuis la frame précédente: le bruit du flux ne fait pas trembler les coins
+        tracker_state['static_frames'] += 1
+    else:
+        # Homographie estimée dans la fenêtre, ramenée aux coordonnées de la frame
+        to_window = np.array([[1, 0, -x0], [0, 1, -y0], [0, 0, 1]], dtype=np.float64)
+        frame_homography = np.linalg.inv(to_window) @ homography @ to_window
+        new_corners = cv2.perspectiveTransform(keyframe_corners.reshape(-1, 1, 2).astype(np.float64),
+                                               frame_homography).reshape(4, 2).astype(np.float32)
+        if not _is_valid_quad(new_corners, previous_corners):
+            tracker_state['rejected_frames'] += 1
+            return None
+        tracker_state['homography'] = frame_homography
+        chart_geometry = tracker_state['chart_geometry']
+        warped_width, warped_height = chart_geometry['warped_size']
+        perspective_points_dest = np.array([[0, 0], [warped_width - 1, 0],
+                                            [warped_width - 1, warped_height - 1], [0, warped_height - 1]],
+                                           dtype=np.float32)
+        tracker_state['chart_geometry'] = dict(
+            chart_geometry,
+            perspective_matrix=cv2.getPerspectiveTransform(new_corners, perspective_points_dest),
+            source_shape=tuple(frame_raw.shape[:2]))
+
+    tracker_state['frames_since_detection'] += 1
+    tracker_state['tracked_frames'] += 1
+    return tracker_state['chart_geometry']
+
+def get_chart_tracker_stats(tracker_state):
+    """
+    Retourne les compteurs du suivi de la charte.
+
+    Args:
+        tracker_state (dict): État du suivi (voir create_chart_tracker)
+
+    Returns:
+        dict: tracked_frames, static_frames, rejected_frames, forced_detections,
+            last_inliers et last_inlier_ratio
+    """
+    return {stat_name: tracker_state[stat_name] for stat_name in
+            ('tracked_frames', 'static_frames', 'rejected_frames', 'forced_detections',
+             'last_inliers', 'last_inlier_ratio')}
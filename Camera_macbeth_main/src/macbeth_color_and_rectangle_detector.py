@@ -8,13 +8,47 @@ Ce module permet de :
 4. Calculer les couleurs moyennes de chaque carré
 
 La détection utilise le cadre noir de la charte comme repère principal.
+Une fois la charte détectée, ses coins sont suivis d'une frame à l'autre
+(voir macbeth_chart_tracker): la détection complète n'est relancée que si
+la confiance du suivi chute.
+
+La géométrie de la charte est conservée en mémoire, qui fait référence: le
+cache JSON n'est lu qu'une fois, au premier accès, et n'est réécrit que par
+le thread d'écriture en arrière-plan (voir background_writer), comme les
+images de débogage de la détection.
 """
 
 import cv2
 import numpy as np
 import json
 import os
+import threading
 from config.paths_config import CACHE_FILE_PATH
+from config.detection_config import (
+    CHART_TRACKING_ENABLED,
+    CHART_DETECTION_PYRAMID_SCALE,
+    CHART_DETECTION_PYRAMID_MIN_WIDTH,
+    CHART_CORNER_REFINE_WINDOW
+)
+from config.performance_config import CHART_CACHE_PERSIST_ENABLED, CHART_DEBUG_IMAGES_ENABLED
+from src.background_writer import submit_background_write
+from src.macbeth_chart_tracker import create_chart_tracker, reset_chart_tracker, track_chart, get_chart_tracker_stats
+
+# Géométrie de la charte en mémoire (chargée du cache JSON au premier accès)
+chart_geometry_cache = None
+chart_geometry_loaded = False
+chart_geometry_lock = threading.Lock()
+
+# Suivi de la charte entre deux détections complètes
+chart_tracker = create_chart_tracker()
+
+# Grille des carrés de la charte (lignes x colonnes de l'image redressée)
+MACBETH_GRID_ROWS = 4
+MACBETH_GRID_COLUMNS = 6
+
+# Précision des sommets des carrés projetés (virgule fixe de cv2.fillConvexPoly)
+PATCH_POLYGON_SHIFT = 4
+PATCH_POLYGON_SCALE = 1 << PATCH_POLYGON_SHIFT
 
 def order_points(pts: np.ndarray) -> np.ndarray:
     """
@@ -35,58 +69,283 @@ def order_points(pts: np.ndarray) -> np.ndarray:
     rect[3] = pts[np.argmax(diff)]  # bas-gauche
     return rect
 
-def detect_macbeth_in_scene(frame_raw: np.ndarray) -> tuple[np.ndarray, list[tuple[int, int, int, int]]]:
+def _chart_pyramid_scale(frame_width):
     """
-    Détecte et analyse la charte Macbeth dans une image.
+    Facteur de réduction de la recherche du cadre noir pour une largeur de frame.
     
-    Le processus comprend :
-    1. Détection du cadre noir par seuillage HSV
-    2. Correction de la perspective
-    3. Détection des 24 carrés internes
-    4. Sauvegarde des résultats dans le cache
+    Args:
+        frame_width (int): Largeur de la frame source (en pixels)
+    
+    Returns:
+        int: Plus grande puissance de 2 au plus égale à CHART_DETECTION_PYRAMID_SCALE
+            qui garde la frame réduite au moins aussi large que
+            CHART_DETECTION_PYRAMID_MIN_WIDTH (1 = pleine résolution)
+    """
+    pyramid_scale = 1
+    while pyramid_scale * 2 <= CHART_DETECTION_PYRAMID_SCALE and frame_width // (pyramid_scale * 2) >= CHART_DETECTION_PYRAMID_MIN_WIDTH:
+        pyramid_scale *= 2
+    return pyramid_scale
+
+def _fit_quad_corners(contour, quad):
+    """
+    Place les coins d'un quadrilatère à l'intersection des droites ajustées sur ses côtés.
+    
+    Les sommets de cv2.approxPolyDP sont des points du contour, qui peuvent
+    s'écarter de plusieurs pixels du vrai coin d'un cadre tourné. Chaque côté
+    est ajusté (cv2.fitLine) sur les points du contour entre deux sommets,
+    sans leurs extrémités.
+    
+    Args:
+        contour (np.ndarray): Contour complet (n, 1, 2) (cv2.CHAIN_APPROX_NONE)
+        quad (np.ndarray): Sommets (4, 1, 2) retournés par cv2.approxPolyDP sur ce contour
+    
+    Returns:
+        np.ndarray: Coins (4, 2) float32, dans l'ordre du contour (sommets de quad
+            si un côté est trop court ou deux côtés parallèles)
+    """
+    contour_points = contour.reshape(-1, 2).astype(np.float32)
+    vertex_indices = sorted(int(np.argmin(np.abs(contour_points - vertex).sum(axis=1))) for vertex in quad.reshape(4, 2))
+    side_lines = []
+    for side_index in range(4):
+        start_index, end_index = vertex_indices[side_index], vertex_indices[(side_index + 1) % 4]
+        side_points = np.roll(contour_points, -start_index, axis=0)[:(end_index - start_index) % len(contour_points)]
+        side_trim = len(side_points) // 10
+        side_points = side_points[side_trim:len(side_points) - side_trim]
+        if len(side_points) < 4:
+            return contour_points[vertex_indices]
+        side_lines.append(cv2.fitLine(side_points, cv2.DIST_HUBER, 0, 0.01, 0.01).ravel())
+
+    corners = np.empty((4, 2), dtype=np.float32)
+    for corner_index in range(4):
+        # Intersection du côté précédent et du côté suivant le sommet
+        direction_a, point_a = side_lines[corner_index - 1][:2], side_lines[corner_index - 1][2:]
+        direction_b, point_b = side_lines[corner_index][:2], side_lines[corner_index][2:]
+        determinant = direction_a[0] * direction_b[1] - direction_a[1] * direction_b[0]
+        if abs(determinant) < 1e-3:
+            return contour_points[vertex_indices]
+        offset = point_b - point_a
+        corners[corner_index] = point_a + direction_a * (offset[0] * direction_b[1] - offset[1] * direction_b[0]) / determinant
+    return corners
+
+def find_black_frame_corners(frame_raw: np.ndarray) -> np.ndarray | None:
+    """
+    Cherche le quadrilatère du cadre noir de la charte.
+    
+    Sur une grande frame, la recherche (seuillage HSV, morphologie, contours)
+    se fait sur la frame réduite d'un facteur _chart_pyramid_scale, avec un
+    noyau et une aire minimale réduits d'autant. Les coins trouvés sont
+    ensuite affinés à pleine résolution par cv2.cornerSubPix, dans une fenêtre
+    de CHART_CORNER_REFINE_WINDOW pixels autour de chacun.
     
     Args:
         frame_raw (np.ndarray): Image source en BGR
     
     Returns:
-        tuple[np.ndarray, list[tuple[int, int, int, int]]]: (image_redressée, liste_des_carrés)
-        
-    Raises:
-        ValueError: Si l'image est invalide ou si la charte n'est pas détectée
+        np.ndarray or None: Coins (4, 2) float32 dans la frame source (ordre du
+            contour), None si aucun grand quadrilatère noir n'est trouvé
     """
-    if frame_raw is None:
-        raise ValueError("Image invalide")  
+    pyramid_scale = _chart_pyramid_scale(frame_raw.shape[1])
+    if pyramid_scale > 1:
+        frame_search = cv2.resize(frame_raw, (frame_raw.shape[1] // pyramid_scale, frame_raw.shape[0] // pyramid_scale),
+                                  interpolation=cv2.INTER_LINEAR)
+        kernel_size = max(3, (7 // pyramid_scale) | 1)
+    else:
+        frame_search = frame_raw
+        kernel_size = 7
+    min_contour_area = 1000 / (pyramid_scale * pyramid_scale)
 
     # Détection du cadre noir
-    frame_hsv = cv2.cvtColor(frame_raw, cv2.COLOR_BGR2HSV)
+    frame_hsv = cv2.cvtColor(frame_search, cv2.COLOR_BGR2HSV)
     # Conversion des tuples en np.array pour les seuils
     lower_black = np.array([0, 0, 0], dtype=np.uint8)
     upper_black = np.array([180, 100, 30], dtype=np.uint8)
     frame_black_mask = cv2.inRange(frame_hsv, lower_black, upper_black)
 
     # Nettoyage du masque
-    morphology_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (7, 7))
+    morphology_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (kernel_size, kernel_size))
     frame_black_mask = cv2.morphologyEx(frame_black_mask, cv2.MORPH_CLOSE, morphology_kernel, iterations=1)
     frame_black_mask = cv2.morphologyEx(frame_black_mask, cv2.MORPH_OPEN, morphology_kernel, iterations=1)
 
     # Recherche du contour du cadre noir
-    contours_black, _ = cv2.findContours(frame_black_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    contour_method = cv2.CHAIN_APPROX_NONE if pyramid_scale > 1 else cv2.CHAIN_APPROX_SIMPLE
+    contours_black, _ = cv2.findContours(frame_black_mask, cv2.RETR_EXTERNAL, contour_method)
     frame_border_contour = None
     border_area_max = 0
     
     for contour in contours_black:
         contour_area = cv2.contourArea(contour)
-        if contour_area > 1000:
+        if contour_area > min_contour_area:
             contour_perimeter = cv2.arcLength(contour, True)
             contour_approx = cv2.approxPolyDP(contour, 0.02 * contour_perimeter, True)
             if len(contour_approx) == 4 and contour_area > border_area_max:
                 border_area_max = contour_area
                 frame_border_contour = contour_approx
+                border_contour = contour
 
     if frame_border_contour is None:
+        return None
+    if pyramid_scale == 1:
+        return frame_border_contour.reshape(4, 2).astype(np.float32)
+
+    # Coins grossiers: intersections des côtés, plus précises qu'un sommet du contour réduit
+    corner_points = _fit_quad_corners(border_contour, frame_border_contour)
+    # Un pixel réduit couvre pyramid_scale pixels source: son centre est décalé de (pyramid_scale - 1) / 2
+    corner_points = corner_points * pyramid_scale + (pyramid_scale - 1) / 2
+    frame_height, frame_width = frame_raw.shape[:2]
+    crop_radius = 2 * CHART_CORNER_REFINE_WINDOW
+    for corner_index, (corner_x, corner_y) in enumerate(corner_points):
+        # Niveaux de gris limités au voisinage du coin
+        x0, y0 = max(int(corner_x) - crop_radius, 0), max(int(corner_y) - crop_radius, 0)
+        x1, y1 = min(int(corner_x) + crop_radius + 1, frame_width), min(int(corner_y) + crop_radius + 1, frame_height)
+        corner_gray = cv2.cvtColor(frame_raw[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+        corner_local = np.array([[[corner_x - x0, corner_y - y0]]], dtype=np.float32)
+        window_size = min(CHART_CORNER_REFINE_WINDOW, (min(corner_gray.shape) - 5) // 2)
+        if window_size < 2:
+            continue
+        corner_refined = cv2.cornerSubPix(corner_gray, corner_local, (window_size, window_size), (-1, -1),
+                                          (cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 30, 0.01))[0, 0]
+        # Un coin qui sort de sa fenêtre (cadre flou ou masqué) garde sa position grossière
+        if np.abs(corner_refined - corner_local[0, 0]).max() <= window_size:
+            corner_points[corner_index] = corner_refined + (x0, y0)
+    return corner_points
+
+def _grid_pitch(offsets, same_line, min_offset, default_pitch):
+    """
+    Estime le pas de la grille selon un axe à partir des carrés détectés.
+    
+    Args:
+        offsets (np.ndarray): Écarts (n, n) selon l'axe entre centres de carrés
+        same_line (np.ndarray): Masque (n, n) des paires sur la même ligne (ou colonne)
+        min_offset (float): Écart minimal entre deux carrés voisins (taille d'un carré / 2)
+        default_pitch (float): Pas retenu si aucune paire n'est utilisable
+    
+    Returns:
+        float: Pas moyen; les écarts au plus proche voisin qui sautent des carrés
+            manquants comptent pour plusieurs pas
+    """
+    neighbor_offsets = np.where(same_line & (offsets > min_offset), offsets, np.inf).min(axis=1)
+    neighbor_offsets = neighbor_offsets[np.isfinite(neighbor_offsets)]
+    if len(neighbor_offsets) == 0:
+        return default_pitch
+    pitch_steps = np.maximum(np.rint(neighbor_offsets / neighbor_offsets.min()), 1)
+    return float(neighbor_offsets.sum() / pitch_steps.sum())
+
+def _grid_start(first_center, index_span, pitch, line_count, image_size):
+    """Indice du premier carré détecté, qui centre la grille dans l'image redressée."""
+    grid_start = np.rint((line_count - 1) / 2 - (image_size / 2 - first_center) / pitch)
+    return int(np.clip(grid_start, 0, line_count - 1 - index_span))
+
+def fit_patch_grid(detected_squares, warped_size):
+    """
+    Ajuste la grille 4x6 de la charte sur les carrés détectés et retourne les 24 carrés.
+    
+    1. Les carrés de taille aberrante (contours parasites) sont écartés
+    2. Le pas de la grille vient des écarts entre voisins de même ligne (ou
+       colonne), chaque carré reçoit sa ligne et sa colonne, et la grille est
+       placée au centre de l'image redressée si des colonnes (lignes)
+       extrêmes manquent
+    3. Un modèle affine centre = f(colonne, ligne) est ajusté par moindres
+       carrés (translation et pas seuls si les carrés sont alignés), puis
+       réajusté sans les carrés à plus d'un quart de pas du modèle
+    
+    Args:
+        detected_squares (list): Carrés (x, y, w, h) trouvés dans l'image redressée
+        warped_size (tuple): Dimensions (w, h) de l'image redressée
+    
+    Returns:
+        list[tuple[int, int, int, int]]: 24 carrés, ligne du bas en premier et de
+            droite à gauche (ordre inverse de lecture, voir get_average_colors)
+    
+    Raises:
+        ValueError: Si aucun carré n'est détecté ou si la grille ne peut pas être placée
+    
+    Notes:
+        - Une case occupée par un seul carré cohérent avec le modèle garde le
+          rectangle détecté; les autres reçoivent le carré du modèle, à la
+          taille médiane des carrés détectés
+    """
+    if not detected_squares:
+        raise ValueError("Aucun carré de couleur détecté dans la charte")
+    squares = np.array(detected_squares, dtype=np.float64).reshape(-1, 4)
+    median_size = np.median(squares[:, 2:], axis=0)
+    squares = squares[np.all((squares[:, 2:] > median_size / 2) & (squares[:, 2:] < median_size * 2), axis=1)]
+    median_size = np.median(squares[:, 2:], axis=0)
+    centers = squares[:, :2] + squares[:, 2:] / 2
+    warped_width, warped_height = warped_size
+
+    # Pas de la grille et indices (colonne, ligne) de chaque carré
+    offsets = centers[None, :, :] - centers[:, None, :]
+    pitch_x = _grid_pitch(offsets[..., 0], np.abs(offsets[..., 1]) < median_size[1] / 2,
+                          median_size[0] / 2, warped_width / MACBETH_GRID_COLUMNS)
+    pitch_y = _grid_pitch(offsets[..., 1], np.abs(offsets[..., 0]) < median_size[0] / 2,
+                          median_size[1] / 2, warped_height / MACBETH_GRID_ROWS)
+    first_center = centers.min(axis=0)
+    grid_indices = np.rint((centers - first_center) / (pitch_x, pitch_y)).astype(int)
+    column_span, row_span = grid_indices.max(axis=0)
+    if column_span >= MACBETH_GRID_COLUMNS or row_span >= MACBETH_GRID_ROWS:
+        raise ValueError("Carrés détectés incompatibles avec une grille 4x6")
+    grid_indices += (_grid_start(first_center[0], column_span, pitch_x, MACBETH_GRID_COLUMNS, warped_width),
+                     _grid_start(first_center[1], row_span, pitch_y, MACBETH_GRID_ROWS, warped_height))
+
+    # Modèle affine [colonne, ligne, 1] -> centre, réajusté sans les carrés incohérents
+    design = np.hstack([grid_indices, np.ones((len(grid_indices), 1))])
+    inliers = np.ones(len(design), dtype=bool)
+    for _ in range(2):
+        if np.linalg.matrix_rank(design[inliers]) == 3:
+            grid_model, _, _, _ = np.linalg.lstsq(design[inliers], centers[inliers], rcond=None)
+        else:
+            grid_origin = np.mean(centers[inliers] - grid_indices[inliers] * (pitch_x, pitch_y), axis=0)
+            grid_model = np.array([[pitch_x, 0.0], [0.0, pitch_y], grid_origin])
+        residuals = np.linalg.norm(design @ grid_model - centers, axis=1)
+        inliers = residuals <= min(pitch_x, pitch_y) / 4
+        if not inliers.any():
+            raise ValueError("Carrés détectés incompatibles avec une grille 4x6")
+
+    # 24 cases, ligne du bas en premier et de droite à gauche
+    grid_rows, grid_columns = np.indices((MACBETH_GRID_ROWS, MACBETH_GRID_COLUMNS))
+    grid_cells = np.stack([grid_columns.ravel(), grid_rows.ravel()], axis=1)[::-1]
+    cell_centers = np.hstack([grid_cells, np.ones((len(grid_cells), 1))]) @ grid_model
+    square_width, square_height = np.rint(median_size).astype(int)
+    square_x = np.clip(np.rint(cell_centers[:, 0] - square_width / 2), 0, max(warped_width - square_width, 0))
+    square_y = np.clip(np.rint(cell_centers[:, 1] - square_height / 2), 0, max(warped_height - square_height, 0))
+    grid_squares = [(int(x), int(y), int(square_width), int(square_height)) for x, y in zip(square_x, square_y)]
+
+    # Cases occupées par un seul carré détecté cohérent: rectangle détecté conservé
+    cell_numbers = grid_indices[:, 1] * MACBETH_GRID_COLUMNS + grid_indices[:, 0]
+    cell_counts = np.bincount(cell_numbers[inliers], minlength=MACBETH_GRID_ROWS * MACBETH_GRID_COLUMNS)
+    for square, cell_number, is_inlier in zip(squares.astype(int).tolist(), cell_numbers, inliers):
+        if is_inlier and cell_counts[cell_number] == 1:
+            grid_squares[MACBETH_GRID_ROWS * MACBETH_GRID_COLUMNS - 1 - cell_number] = tuple(square)
+    return grid_squares
+
+def detect_macbeth_in_scene(frame_raw: np.ndarray) -> tuple[np.ndarray, list[tuple[int, int, int, int]]]:
+    """
+    Détecte et analyse la charte Macbeth dans une image.
+    
+    Le processus comprend :
+    1. Détection du cadre noir par seuillage HSV
+    2. Correction de la perspective
+    3. Détection des 24 carrés internes
+    4. Enregistrement de la géométrie (voir save_chart_geometry)
+    
+    Args:
+        frame_raw (np.ndarray): Image source en BGR
+    
+    Returns:
+        tuple[np.ndarray, list[tuple[int, int, int, int]]]: (image_redressée, liste_des_carrés)
+        
+    Raises:
+        ValueError: Si l'image est invalide, si la charte n'est pas détectée ou
+            si aucun carré ne permet de placer la grille
+    """
+    if frame_raw is None:
+        raise ValueError("Image invalide")  
+
+    # Détection du cadre noir (recherche réduite et affinage des coins sur une grande frame)
+    corner_points_approx = find_black_frame_corners(frame_raw)
+    if corner_points_approx is None:
         raise ValueError("Aucun grand rectangle noir détecté. Ajustez les seuils ou rapprochez la charte.")
 
-    corner_points_approx = frame_border_contour.reshape(4, 2).astype("float32")
     corner_points_ordered = order_points(corner_points_approx)
     (corner_top_left, corner_top_right, corner_bottom_right, corner_bottom_left) = corner_points_ordered
 
@@ -113,11 +372,6 @@ def detect_macbeth_in_scene(frame_raw: np.ndarray) -> tuple[np.ndarray, list[tup
     )
     frame_warped = cv2.warpPerspective(frame_raw, perspective_matrix, (target_width, target_height))
 
-    # Chemins des fichiers de sortie
-    warped_image_path = CACHE_FILE_PATH.replace('.json', '_warped.png')
-    annotated_image_path = CACHE_FILE_PATH.replace('.json', '_warped_with_squares.png')
-    cv2.imwrite(warped_image_path, frame_warped)
-
     # Détection des carrés de couleur
     frame_warped_gray = cv2.cvtColor(frame_warped, cv2.COLOR_BGR2GRAY)
     frame_warped_edges = cv2.Canny(frame_warped_gray, 50, 200)
@@ -125,7 +379,6 @@ def detect_macbeth_in_scene(frame_raw: np.ndarray) -> tuple[np.ndarray, list[tup
     
     # Détection initiale des carrés
     detected_squares: list[tuple[int, int, int, int]] = []
-    squares: list[tuple[int, int, int, int]] = []
     
     for c in color_squares_contours:
         peri = cv2.arcLength(c, True)
@@ -140,79 +393,262 @@ def detect_macbeth_in_scene(frame_raw: np.ndarray) -> tuple[np.ndarray, list[tup
                 h -= 40
                 detected_squares.append((x, y, w, h))
 
-    # Si on a déjà les 24 carrés, pas besoin de chercher les manquants
-    if len(detected_squares) == 24:
-        squares = detected_squares
-    else:
-        # Trier les carrés par position (d'abord y puis x)
-        detected_squares.sort(key=lambda s: (s[1], s[0]))
-        
-        # Regrouper les carrés par ligne (même coordonnée y à 20 pixels près)
-        rows = []
-        current_row = []
-        last_y = None
-        
-        for square in detected_squares:
-            if last_y is None or abs(square[1] - last_y) < 20:
-                current_row.append(square)
-            else:
-                if current_row:
-                    rows.append(sorted(current_row, key=lambda s: s[0]))
-                    current_row = [square]
-            last_y = square[1]
-        if current_row:
-            rows.append(sorted(current_row, key=lambda s: s[0]))
-        
-        # Pour chaque ligne, vérifier s'il manque des carrés (la ligne doit comporter 6 carrés)
-        for row in rows:
-            if len(row) < 6:
-                # Calcul de la largeur et hauteur moyennes des carrés de la ligne
-                avg_width = sum(s[2] for s in row) / len(row)
-                avg_height = sum(s[3] for s in row) / len(row)
-                
-                # Calcul de l'espacement en x : la distance entre le premier et le dernier carré
-                # est divisée en 5 intervalles (pour 6 positions)
-                spacing = (row[-1][0] - row[0][0]) / 5
-                
-                # Générer la liste des positions x attendues pour une ligne complète de 6 carrés
-                expected_x = [row[0][0] + i * spacing for i in range(6)]
-                
-                # Récupérer les positions x existantes
-                existing_x = [s[0] for s in row]
-                
-                # Pour chaque position attendue, vérifier si un carré existe déjà
-                for pos in expected_x:
-                    if not any(abs(pos - ex) < avg_width/2 for ex in existing_x):
-                        # Ajouter le carré manquant avec les dimensions moyennes
-                        missing_square = (int(pos), row[0][1], int(avg_width), int(avg_height))
-                        row.append(missing_square)
-                
-                # Retrier la ligne après l'ajout des carrés manquants
-                row.sort(key=lambda s: s[0])
-            
-            squares.extend(row)
-
-    # Création de l'image annotée
-    frame_warped_annotated = frame_warped.copy()
-    
-    for (square_x, square_y, square_width, square_height) in squares:
-        cv2.rectangle(frame_warped_annotated, 
-                     (square_x, square_y), 
-                     (square_x + square_width, square_y + square_height), 
-                     (0, 255, 0), 2)
-    
-    cv2.imwrite(annotated_image_path, frame_warped_annotated)
-    
-    # Sauvegarde des informations dans le cache (JSON)
+    # Grille complète des 24 carrés, y compris ceux que Canny n'a pas trouvés
+    squares = fit_patch_grid(detected_squares, (target_width, target_height))
+
+    # Images de débogage, écrites en arrière-plan
+    warped_image_path = annotated_image_path = None
+    if CHART_DEBUG_IMAGES_ENABLED:
+        warped_image_path = CACHE_FILE_PATH.replace('.json', '_warped.png')
+        annotated_image_path = CACHE_FILE_PATH.replace('.json', '_warped_with_squares.png')
+        frame_warped_annotated = frame_warped.copy()
+        for (square_x, square_y, square_width, square_height) in squares:
+            cv2.rectangle(frame_warped_annotated, 
+                         (square_x, square_y), 
+                         (square_x + square_width, square_y + square_height), 
+                         (0, 255, 0), 2)
+        submit_background_write(warped_image_path, cv2.imwrite, warped_image_path, frame_warped.copy())
+        submit_background_write(annotated_image_path, cv2.imwrite, annotated_image_path, frame_warped_annotated)
+    
+    save_chart_geometry({
+        "squares": squares,
+        "perspective_matrix": perspective_matrix,
+        "source_shape": frame_raw.shape[:2],
+        "warped_size": (target_width, target_height)
+    }, warped_image_path, annotated_image_path)
+
+    return frame_warped, squares
+
+def _write_json_file(file_path, data):
+    """Écrit un fichier JSON à côté puis le renomme: une interruption ne laisse jamais un fichier tronqué."""
+    temporary_path = file_path + ".tmp"
+    with open(temporary_path, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary_path, file_path)
+
+def save_chart_geometry(chart_geometry, warped_image_path=None, annotated_image_path=None):
+    """
+    Enregistre la géométrie de la charte en mémoire et, en arrière-plan, dans le cache.
+    
+    Args:
+        chart_geometry (dict): squares, perspective_matrix, source_shape et warped_size
+            (voir load_chart_geometry)
+        warped_image_path (str, optional): Image redressée enregistrée lors de la détection
+        annotated_image_path (str, optional): Image redressée annotée des carrés
+    
+    Notes:
+        - La mémoire est à jour au retour; le fichier JSON est écrit par le
+          thread d'écriture si CHART_CACHE_PERSIST_ENABLED, seule la dernière
+          géométrie en attente étant écrite
+    """
+    global chart_geometry_cache, chart_geometry_loaded
+    
+    chart_geometry = {
+        "squares": [tuple(int(v) for v in s) for s in chart_geometry["squares"]],
+        "perspective_matrix": np.array(chart_geometry["perspective_matrix"], dtype=np.float64),
+        "source_shape": tuple(int(v) for v in chart_geometry["source_shape"]),
+        "warped_size": tuple(int(v) for v in chart_geometry["warped_size"])
+    }
+    with chart_geometry_lock:
+        chart_geometry_cache = chart_geometry
+        chart_geometry_loaded = True
+    if not CHART_CACHE_PERSIST_ENABLED:
+        return
     data = {
-        "squares": [list(s) for s in squares],
+        "squares": [list(s) for s in chart_geometry["squares"]],
         "warped_image_path": warped_image_path,
-        "warped_with_squares_path": annotated_image_path
+        "warped_with_squares_path": annotated_image_path,
+        "perspective_matrix": chart_geometry["perspective_matrix"].tolist(),
+        "source_shape": list(chart_geometry["source_shape"]),
+        "warped_size": list(chart_geometry["warped_size"])
     }
-    with open(CACHE_FILE_PATH, "w") as f:
-        json.dump(data, f)
+    submit_background_write(CACHE_FILE_PATH, _write_json_file, CACHE_FILE_PATH, data)
 
-    return frame_warped, squares
+def load_chart_geometry():
+    """
+    Retourne la géométrie courante de la charte.
+    
+    Returns:
+        dict or None: squares (carrés dans l'image redressée), perspective_matrix
+            (3x3, frame source -> image redressée), source_shape (h, w) et
+            warped_size (w, h). None si aucune géométrie n'a été enregistrée et
+            que le cache n'existe pas ou date d'une version sans matrice de
+            perspective.
+    
+    Notes:
+        - Le cache JSON n'est lu qu'au premier appel; ensuite, la géométrie
+          vient de la mémoire (dernier save_chart_geometry)
+        - Le dictionnaire retourné est partagé: il ne doit pas être modifié
+    """
+    global chart_geometry_cache, chart_geometry_loaded
+    
+    with chart_geometry_lock:
+        if not chart_geometry_loaded:
+            chart_geometry_loaded = True
+            if os.path.exists(CACHE_FILE_PATH):
+                with open(CACHE_FILE_PATH, "r") as f:
+                    data = json.load(f)
+                if "perspective_matrix" in data:
+                    chart_geometry_cache = {
+                        "squares": [tuple(item) for item in data["squares"]],
+                        "perspective_matrix": np.array(data["perspective_matrix"], dtype=np.float64),
+                        "source_shape": tuple(data["source_shape"]),
+                        "warped_size": tuple(data["warped_size"])
+                    }
+        return chart_geometry_cache
+
+def compute_chart_corners(chart_geometry):
+    """
+    Calcule les coins de la charte dans la frame source.
+    
+    Args:
+        chart_geometry (dict): Géométrie retournée par load_chart_geometry
+    
+    Returns:
+        np.ndarray: Coins (4, 2) [haut-gauche, haut-droit, bas-droit, bas-gauche]
+    """
+    warped_width, warped_height = chart_geometry["warped_size"]
+    warped_corners = np.array([[0, 0], [warped_width - 1, 0],
+                               [warped_width - 1, warped_height - 1], [0, warped_height - 1]], dtype=np.float64)
+    source_corners = cv2.perspectiveTransform(warped_corners.reshape(-1, 1, 2),
+                                              np.linalg.inv(chart_geometry["perspective_matrix"]))
+    return source_corners.reshape(4, 2)
+
+def locate_macbeth(frame_raw: np.ndarray) -> dict:
+    """
+    Localise la charte par suivi depuis l'image clé, ou par détection complète.
+    
+    Args:
+        frame_raw (np.ndarray): Image source en BGR
+    
+    Returns:
+        dict: Géométrie de la charte dans frame_raw (voir load_chart_geometry)
+    
+    Raises:
+        ValueError: Si le suivi échoue et que la détection complète ne trouve pas la charte
+    
+    Notes:
+        - La géométrie suivie est enregistrée dans le cache, comme celle d'une détection
+    """
+    if CHART_TRACKING_ENABLED and frame_raw is not None:
+        chart_geometry = track_chart(chart_tracker, frame_raw)
+        if chart_geometry is not None:
+            save_chart_geometry(chart_geometry)
+            return chart_geometry
+    
+    try:
+        detect_macbeth_in_scene(frame_raw)
+    except ValueError:
+        start_chart_tracking(frame_raw, None)
+        raise
+    chart_geometry = load_chart_geometry()
+    start_chart_tracking(frame_raw, chart_geometry)
+    return chart_geometry
+
+def start_chart_tracking(frame_raw, chart_geometry):
+    """
+    Démarre le suivi de la charte à partir d'une géométrie connue.
+    
+    Args:
+        frame_raw (np.ndarray): Frame BGR correspondant à la géométrie
+        chart_geometry (dict or None): Géométrie (détection ou profil caméra), None pour arrêter le suivi
+    """
+    if not CHART_TRACKING_ENABLED:
+        return
+    chart_corners = compute_chart_corners(chart_geometry) if chart_geometry is not None else None
+    reset_chart_tracker(chart_tracker, frame_raw, chart_geometry, chart_corners)
+
+def get_chart_tracking_stats():
+    """
+    Retourne les compteurs du suivi de la charte.
+    
+    Returns:
+        dict: Voir get_chart_tracker_stats
+    """
+    return get_chart_tracker_stats(chart_tracker)
+
+def get_frame_perspective_matrix(chart_geometry, frame_shape):
+    """
+    Adapte la matrice de perspective aux dimensions d'une frame.
+    
+    La charte a été détectée sur une frame de dimensions source_shape: pour
+    une frame redimensionnée, les coordonnées sont ramenées à la frame source
+    avant la transformation.
+    
+    Args:
+        chart_geometry (dict): Géométrie retournée par load_chart_geometry
+        frame_shape (tuple): Dimensions (h, w, ...) de la frame
+    
+    Returns:
+        np.ndarray: Matrice 3x3, frame -> image redressée
+    """
+    source_height, source_width = chart_geometry["source_shape"]
+    frame_to_source = np.diag([source_width / frame_shape[1], source_height / frame_shape[0], 1.0])
+    return chart_geometry["perspective_matrix"] @ frame_to_source
+
+def compute_patch_polygons(chart_geometry, frame_shape):
+    """
+    Projette les carrés de l'image redressée dans une frame.
+    
+    Args:
+        chart_geometry (dict): Géométrie retournée par load_chart_geometry
+        frame_shape (tuple): Dimensions (h, w, ...) de la frame
+    
+    Returns:
+        np.ndarray: Quadrilatères (n, 4, 2) en coordonnées (x, y) de la frame,
+            dans l'ordre des carrés du cache
+    
+    Notes:
+        - Un carré (x, y, w, h) couvre les pixels x..x+w-1 de l'image redressée:
+          ses bords sont placés à ±0.5 pixel des centres extrêmes
+    """
+    squares = np.array(chart_geometry["squares"], dtype=np.float64).reshape(-1, 4)
+    left, top = squares[:, 0] - 0.5, squares[:, 1] - 0.5
+    right, bottom = left + squares[:, 2], top + squares[:, 3]
+    warped_polygons = np.stack([np.stack([left, top], axis=1), np.stack([right, top], axis=1),
+                                np.stack([right, bottom], axis=1), np.stack([left, bottom], axis=1)], axis=1)
+    inverse_matrix = np.linalg.inv(get_frame_perspective_matrix(chart_geometry, frame_shape))
+    frame_polygons = cv2.perspectiveTransform(warped_polygons.reshape(-1, 1, 2), inverse_matrix)
+    return frame_polygons.reshape(warped_polygons.shape)
+
+def measure_patch_colors(frame_raw, chart_geometry):
+    """
+    Calcule les couleurs moyennes des carrés directement sur la frame, sans la redresser.
+    
+    Chaque carré est projeté dans la frame (compute_patch_polygons) et sa
+    moyenne est prise sous un masque du quadrilatère, limité à sa boîte
+    englobante.
+    
+    Args:
+        frame_raw (np.ndarray): Image source en BGR (dimensions quelconques)
+        chart_geometry (dict): Géométrie retournée par load_chart_geometry
+    
+    Returns:
+        list: Couleurs moyennes (B,G,R) des carrés, dans l'ordre du cache
+    
+    Raises:
+        ValueError: Si un carré est hors de la frame
+    """
+    frame_height, frame_width = frame_raw.shape[:2]
+    colors_average = []
+    for polygon in compute_patch_polygons(chart_geometry, frame_raw.shape):
+        x0, y0 = np.maximum(np.floor(polygon.min(axis=0)).astype(int), 0)
+        x1 = min(int(np.ceil(polygon[:, 0].max())) + 1, frame_width)
+        y1 = min(int(np.ceil(polygon[:, 1].max())) + 1, frame_height)
+        if x1 <= x0 or y1 <= y0:
+            raise ValueError("Carré de la charte hors de la frame")
+        patch_mask = np.zeros((y1 - y0, x1 - x0), dtype=np.uint8)
+        # Sommets en virgule fixe (4 bits): le masque suit le bord à 1/16 de pixel près
+        cv2.fillConvexPoly(patch_mask, np.rint((polygon - (x0, y0)) * PATCH_POLYGON_SCALE).astype(np.int32),
+                           255, lineType=cv2.LINE_8, shift=PATCH_POLYGON_SHIFT)
+        if not patch_mask.any():
+            # Carré plus petit qu'un pixel: pixel du centre
+            center_x, center_y = np.clip(np.rint(polygon.mean(axis=0) - (x0, y0)).astype(int), 0,
+                                         (x1 - x0 - 1, y1 - y0 - 1))
+            patch_mask[center_y, center_x] = 255
+        mean_bgr = cv2.mean(frame_raw[y0:y1, x0:x1], mask=patch_mask)[:3]
+        colors_average.append((int(mean_bgr[0]), int(mean_bgr[1]), int(mean_bgr[2])))
+    return colors_average
 
 def get_average_colors(frame_raw: np.ndarray, detect_squares: bool) -> list[tuple[int, int, int]]:
     """
@@ -220,38 +656,40 @@ def get_average_colors(frame_raw: np.ndarray, detect_squares: bool) -> list[tupl
     
     Args:
         frame_raw (np.ndarray): Image source en BGR
-        detect_squares (bool): Si True, détecte les carrés, sinon utilise le cache
+        detect_squares (bool): Si True, localise la charte (suivi ou détection), sinon utilise le cache
     
     Returns:
         list: Liste de 24 tuples (B,G,R) représentant les couleurs moyennes
     
     Raises:
         ValueError: Si le cache est invalide ou si la détection échoue
+    
+    Notes:
+        - Les carrés sont mesurés sur la frame courante, à travers la matrice de
+          perspective (measure_patch_colors): la frame n'est pas redressée.
+          Seul un cache sans matrice (ancienne version) réutilise l'image
+          redressée enregistrée lors de la détection.
     """
-    if not detect_squares:
-        if os.path.exists(CACHE_FILE_PATH):
-            with open(CACHE_FILE_PATH, "r") as f:
-                data = json.load(f)
-            squares = [tuple(item) for item in data["squares"]]
-            warped_path = data.get("warped_image_path")
-            if warped_path and os.path.exists(warped_path):
-                frame_warped = cv2.imread(warped_path)
-            else:
-                raise ValueError("Image transformée non trouvée dans le cache")
-        else:
-            raise ValueError("Fichier cache non trouvé")
+    if detect_squares:
+        chart_geometry = locate_macbeth(frame_raw)
     else:
-        frame_warped, squares = detect_macbeth_in_scene(frame_raw)
+        chart_geometry = load_chart_geometry()
 
-    if frame_warped is None:
-        raise ValueError("Impossible d'obtenir l'image transformée")
+    if chart_geometry is not None and frame_raw is not None:
+        colors_average = measure_patch_colors(frame_raw, chart_geometry)
+    elif os.path.exists(CACHE_FILE_PATH):
+        with open(CACHE_FILE_PATH, "r") as f:
+            data = json.load(f)
+        warped_path = data.get("warped_image_path")
+        frame_warped = cv2.imread(warped_path) if warped_path and os.path.exists(warped_path) else None
+        if frame_warped is None:
+            raise ValueError("Image transformée non trouvée dans le cache")
+        colors_average = []
+        for (x, y, w, h) in data["squares"]:
+            mean_bgr = cv2.mean(frame_warped[y:y+h, x:x+w])[:3]
+            colors_average.append((int(mean_bgr[0]), int(mean_bgr[1]), int(mean_bgr[2])))
+    else:
+        raise ValueError("Fichier cache non trouvé")
 
-    # Calcul des couleurs moyennes
-    colors_average = []
-    for (x, y, w, h) in squares:
-        roi = frame_warped[y:y+h, x:x+w]
-        mean_bgr = cv2.mean(roi)[:3]
-        colors_average.append((int(mean_bgr[0]), int(mean_bgr[1]), int(mean_bgr[2])))
-    
     colors_average.reverse()  # Inversion pour correspondre à l'ordre standard
     return colors_average
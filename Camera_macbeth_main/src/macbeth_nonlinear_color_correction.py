@@ -10,19 +10,127 @@ Principe de la correction :
 
     Les 15 paramètres sont optimisés pour minimiser l'erreur entre les couleurs
     mesurées et les couleurs cibles de la charte Macbeth.
+
+    Ce modèle, 'gamma', est le modèle par défaut: COLOR_CORRECTION_MODEL permet
+    d'en choisir un autre (affine, polynomial, root_polynomial, voir
+    color_correction_models).
+
+Application par table de correspondance (LUT) :
+    Les paramètres ne changeant qu'à chaque recalibration, le modèle est évalué
+    une seule fois sur une grille BGR 3D (COLOR_CORRECTION_LUT_SIZE³). Chaque
+    frame est ensuite corrigée par interpolation tétraédrique dans cette table,
+    directement de uint8 vers uint8. Une taille de 256 donne une table complète
+    sans interpolation.
+
+Recalibration asynchrone :
+    La recalibration périodique (sur dérive des couleurs de la charte, voir
+    color_drift_monitor, ou toutes les COLOR_CORRECTION_INTERVAL frames)
+    est exécutée sur un thread en arrière-plan: la frame qui la déclenche et
+    les suivantes sont corrigées avec les paramètres précédents, jusqu'à ce
+    que les nouveaux paramètres et leur LUT soient échangés sous verrou.
+    La première calibration et les calibrations forcées par detect_squares
+    restent synchrones. Le thread de recalibration partage le GIL avec la
+    boucle des frames: l'ajustement (least_squares) et la construction de la
+    LUT (boucle Python sur les plans de la grille, predict puis numpy) le
+    tiennent hors des appels aux noyaux. Les noyaux de correction des frames
+    sont compilés avec nogil=True: pendant qu'ils s'exécutent, la
+    recalibration peut avancer. Les deux threads pouvant lancer des noyaux
+    parallèles en même temps, la couche de threads numba doit le supporter
+    (NUMBA_THREADING_LAYER, imposée au chargement du module).
+
+Lissage temporel (désactivé par défaut, COLOR_CORRECTION_SMOOTHING = 1) :
+    Avec un poids inférieur à 1, une recalibration périodique ne remplace pas
+    brutalement la correction: elle devient la cible vers laquelle la
+    correction appliquée avance à chaque frame par moyenne exponentielle
+    (poids COLOR_CORRECTION_SMOOTHING), jusqu'à l'atteindre. Avec des
+    recalibrations rapprochées et des mesures bruitées, la correction est
+    alors presque toujours en transition et les couleurs détectées changent
+    plus souvent de classe (voir tests/benchmark_correction_smoothing.py). La table de la LUT est mélangée dans une copie
+    (cv2.addWeighted, ~0,3 ms en 65³), sans réévaluer le modèle; les LUT
+    mémorisées dans le cache ne sont jamais modifiées. La première
+    calibration, la détection forcée, la restauration du profil et la table
+    complète (256³) restent des échanges immédiats.
 """
 
 
+import threading
+import time
+
+import cv2
+import numba
 import numpy as np
-from scipy.optimize import least_squares
 from numba import njit, prange
 from src.macbeth_color_and_rectangle_detector import get_average_colors
-from config.color_config import COLOR_CORRECTION_INTERVAL, MACBETH_REFERENCE_COLORS
+from config.color_config import (
+    COLOR_CORRECTION_INTERVAL,
+    COLOR_CORRECTION_LUT_SIZE,
+    COLOR_CALIBRATION_MAX_NFEV,
+    COLOR_DRIFT_MONITOR_ENABLED,
+    COLOR_CORRECTION_CACHE_SIZE,
+    COLOR_CORRECTION_CACHE_DELTA_E,
+    COLOR_CORRECTION_MODEL,
+    COLOR_CORRECTION_SMOOTHING,
+    MACBETH_REFERENCE_COLORS
+)
+from config.performance_config import ASYNC_RECALIBRATION_ENABLED, NUMBA_THREADING_LAYER
+from src.color_correction_models import register_correction_model, get_correction_model
+from src.color_drift_monitor import (
+    bgr_to_lab,
+    create_drift_monitor,
+    set_drift_reference,
+    should_recalibrate,
+    get_drift_monitor_stats
+)
+
+# La couche 'workqueue' arrête le processus si deux threads lancent des noyaux parallèles en même temps.
+# Doit être choisie avant le premier lancement d'un noyau parallèle.
+if ASYNC_RECALIBRATION_ENABLED and numba.config.THREADING_LAYER in ('default', 'workqueue'):
+    numba.config.THREADING_LAYER = NUMBA_THREADING_LAYER
+
 # Variables globales pour la mise en cache des coefficients
 last_correction_params = None
+last_correction_lut = None
 frame_count = 0
 
-@njit(parallel=True)
+# Recalibration en arrière-plan: les paramètres et la LUT sont échangés ensemble sous verrou
+correction_lock = threading.Lock()
+recalibration_thread = None
+calibration_generation = 0  # Incrémenté à chaque échange, pour ignorer un résultat périmé
+recalibration_stats = {
+    'count': 0,           # Recalibrations appliquées
+    'async_count': 0,     # Dont recalibrations en arrière-plan
+    'failed': 0,          # Recalibrations en arrière-plan en échec
+    'skipped': 0,         # Recalibrations non lancées car la précédente était en cours
+    'stale': 0,           # Résultats ignorés car une calibration synchrone est arrivée entre-temps
+    'smoothed_frames': 0, # Frames corrigées pendant une transition vers une nouvelle calibration
+    'total_time': 0.0,    # Durée cumulée (secondes)
+    'max_time': 0.0,
+    'last_time': 0.0
+}
+
+# Lissage: correction cible (dernière calibration) et poids restant de la correction de départ
+target_correction_params = None
+target_correction_lut = None
+smoothing_weight_remaining = 0.0
+smoothing_table = None  # Table de travail de la LUT lissée, propre au lissage
+
+# Poids restant en deçà duquel la correction cible est adoptée telle quelle
+SMOOTHING_SNAP_WEIGHT = 0.01
+
+# Paramètres et LUT déjà calculés, par état d'éclairage (le plus récemment utilisé en dernier):
+# {'lab': couleurs Lab des 24 patchs mesurés, 'params': paramètres, 'lut': LUT}
+correction_cache = []
+correction_cache_lock = threading.Lock()
+correction_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+# Moniteur de dérive des couleurs: décide des recalibrations périodiques si COLOR_DRIFT_MONITOR_ENABLED.
+# Sa référence (patchs de la dernière calibration) est toujours tenue à jour pour le profil caméra.
+drift_monitor = create_drift_monitor()
+
+# Taille de la table complète (une entrée par valeur uint8, sans interpolation)
+FULL_LUT_SIZE = 256
+
+@njit(parallel=True, cache=True, nogil=True)
 def _apply_color_correction(pixels_raw, correction_coefficients):
     """
     Version optimisée avec Numba de la correction des couleurs
@@ -49,6 +157,187 @@ def _apply_color_correction(pixels_raw, correction_coefficients):
     
     return result
 
+@njit(cache=True)
+def _interpolate_lut_pixel(flat_lut, lut_size, lut_indices, lut_weights, b, g, r, frame_corrected, y, x):
+    """
+    Corrige un pixel uint8 par interpolation tétraédrique dans une LUT 3D.
+    
+    Le cube de la grille contenant le pixel est découpé en 6 tétraèdres:
+    seuls 4 nœuds sont lus au lieu des 8 de l'interpolation trilinéaire.
+    
+    Args:
+        flat_lut (np.ndarray): Table (n³, 3) indexée [(B * n + G) * n + R], valeurs [0, 255]
+        lut_size (int): Nombre de nœuds par axe
+        lut_indices (np.ndarray): Indice du nœud inférieur pour chaque valeur uint8 (256,)
+        lut_weights (np.ndarray): Poids du nœud supérieur pour chaque valeur uint8 (256,)
+        b, g, r (int): Valeurs uint8 du pixel
+        frame_corrected (np.ndarray): Image de sortie (h, w, 3) uint8
+        y, x (int): Position du pixel dans l'image de sortie
+    """
+    one = np.float32(1.0)
+    stride_b = lut_size * lut_size
+    stride_g = lut_size
+    wb, wg, wr = lut_weights[b], lut_weights[g], lut_weights[r]
+    base = lut_indices[b] * stride_b + lut_indices[g] * stride_g + lut_indices[r]
+    
+    # Sélection du tétraèdre: parcours des axes par poids décroissant
+    if wb >= wg:
+        if wg >= wr:
+            first, second = base + stride_b, base + stride_b + stride_g
+            w0, w1, w2, w3 = one - wb, wb - wg, wg - wr, wr
+        elif wb >= wr:
+            first, second = base + stride_b, base + stride_b + 1
+            w0, w1, w2, w3 = one - wb, wb - wr, wr - wg, wg
+        else:
+            first, second = base + 1, base + stride_b + 1
+            w0, w1, w2, w3 = one - wr, wr - wb, wb - wg, wg
+    else:
+        if wb >= wr:
+            first, second = base + stride_g, base + stride_b + stride_g
+            w0, w1, w2, w3 = one - wg, wg - wb, wb - wr, wr
+        elif wg >= wr:
+            first, second = base + stride_g, base + stride_g + 1
+            w0, w1, w2, w3 = one - wg, wg - wr, wr - wb, wb
+        else:
+            first, second = base + 1, base + stride_g + 1
+            w0, w1, w2, w3 = one - wr, wr - wg, wg - wb, wb
+    last = base + stride_b + stride_g + 1
+    
+    for c in range(3):
+        value = (w0 * flat_lut[base, c] + w1 * flat_lut[first, c] +
+                 w2 * flat_lut[second, c] + w3 * flat_lut[last, c])
+        frame_corrected[y, x, c] = np.uint8(min(max(value, np.float32(0.0)), np.float32(255.0)))
+
+@njit(parallel=True, cache=True, nogil=True)
+def _apply_lut_tetrahedral(frame_masked, correction_lut, lut_indices, lut_weights, frame_corrected):
+    """
+    Correction uint8 -> uint8 par interpolation tétraédrique dans une LUT 3D.
+    
+    Args:
+        frame_masked (np.ndarray): Image (h, w, 3) uint8 en BGR
+        correction_lut (np.ndarray): Table (n, n, n, 3) float32 indexée [B, G, R], valeurs [0, 255]
+        lut_indices (np.ndarray): Indice du nœud inférieur pour chaque valeur uint8 (256,)
+        lut_weights (np.ndarray): Poids du nœud supérieur pour chaque valeur uint8 (256,)
+        frame_corrected (np.ndarray): Image de sortie (h, w, 3) uint8
+    """
+    h, w, _ = frame_masked.shape
+    lut_size = correction_lut.shape[0]
+    flat_lut = correction_lut.reshape(-1, 3)
+    for y in prange(h):
+        for x in range(w):
+            _interpolate_lut_pixel(flat_lut, lut_size, lut_indices, lut_weights,
+                                   frame_masked[y, x, 0], frame_masked[y, x, 1], frame_masked[y, x, 2],
+                                   frame_corrected, y, x)
+
+@njit(parallel=True, cache=True, nogil=True)
+def _apply_lut_full(frame_masked, correction_lut, frame_corrected):
+    """
+    Correction uint8 -> uint8 par lecture directe dans une table complète 256³.
+    
+    Args:
+        frame_masked (np.ndarray): Image (h, w, 3) uint8 en BGR
+        correction_lut (np.ndarray): Table (256, 256, 256, 3) uint8 indexée [B, G, R]
+        frame_corrected (np.ndarray): Image de sortie (h, w, 3) uint8
+    """
+    h, w, _ = frame_masked.shape
+    for y in prange(h):
+        for x in range(w):
+            entry = correction_lut[frame_masked[y, x, 0], frame_masked[y, x, 1], frame_masked[y, x, 2]]
+            frame_corrected[y, x, 0] = entry[0]
+            frame_corrected[y, x, 1] = entry[1]
+            frame_corrected[y, x, 2] = entry[2]
+
+def _compute_lut_interpolation(lut_size):
+    """
+    Pré-calcule, pour chaque valeur uint8, le nœud inférieur et le poids d'interpolation.
+    
+    Args:
+        lut_size (int): Nombre de nœuds par axe de la LUT
+    
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (indices int64 (256,), poids float32 (256,))
+    """
+    positions = np.arange(256, dtype=np.float64) * (lut_size - 1) / 255.0
+    lut_indices = np.minimum(np.floor(positions).astype(np.int64), lut_size - 2)
+    lut_weights = (positions - lut_indices).astype(np.float32)
+    return lut_indices, lut_weights
+
+def construire_lut_correction(correction_coefficients, lut_size=COLOR_CORRECTION_LUT_SIZE, correction_model=None):
+    """
+    Évalue le modèle de correction sur une grille BGR pour construire une LUT 3D.
+    
+    Args:
+        correction_coefficients (np.array): Paramètres du modèle (15 paramètres pour 'gamma')
+        lut_size (int): Nombre de nœuds par axe (ex: 33, 65, ou 256 pour une table complète)
+        correction_model (dict, optional): Modèle (voir color_correction_models),
+            par défaut le modèle non linéaire 'gamma'
+    
+    Returns:
+        dict: LUT prête à l'emploi contenant:
+            - size (int): Nombre de nœuds par axe
+            - table (np.ndarray): Table (n, n, n, 3) indexée [B, G, R],
+              float32 dans [0, 255] ou uint8 pour une table complète
+            - indices, weights (np.ndarray): Tables d'interpolation par valeur uint8
+    
+    Notes:
+        La table complète (256³ uint8, ~50 Mo) est construite plan par plan
+        pour limiter la mémoire temporaire.
+    """
+    correction_coefficients = np.asarray(correction_coefficients, dtype=np.float64)
+    predict = modele_non_lineaire if correction_model is None else correction_model['predict']
+    grid_values = np.linspace(0.0, 1.0, lut_size, dtype=np.float32)
+    green_grid, red_grid = np.meshgrid(grid_values, grid_values, indexing="ij")
+    plane_pixels = np.empty((lut_size * lut_size, 3), dtype=np.float32)
+    plane_pixels[:, 1] = green_grid.ravel()
+    plane_pixels[:, 2] = red_grid.ravel()
+    
+    full_table = lut_size == FULL_LUT_SIZE
+    table = np.empty((lut_size, lut_size, lut_size, 3), dtype=np.uint8 if full_table else np.float32)
+    for blue_index in range(lut_size):
+        plane_pixels[:, 0] = grid_values[blue_index]
+        plane_corrected = np.clip(predict(correction_coefficients, plane_pixels), 0, 1) * 255
+        if full_table:
+            plane_corrected = plane_corrected.astype(np.uint8)
+        table[blue_index] = plane_corrected.reshape(lut_size, lut_size, 3)
+    
+    lut_indices, lut_weights = _compute_lut_interpolation(lut_size)
+    return {'size': lut_size, 'table': table, 'indices': lut_indices, 'weights': lut_weights}
+
+def lut_depuis_table(table):
+    """
+    Reconstruit une LUT à partir de sa seule table (ex: LUT enregistrée sur disque).
+    
+    Args:
+        table (np.ndarray): Table (n, n, n, 3) construite par construire_lut_correction
+    
+    Returns:
+        dict: LUT au format de construire_lut_correction
+    """
+    lut_indices, lut_weights = _compute_lut_interpolation(table.shape[0])
+    return {'size': table.shape[0], 'table': table, 'indices': lut_indices, 'weights': lut_weights}
+
+def appliquer_lut_correction(frame_masked, correction_lut, frame_corrected=None):
+    """
+    Applique une LUT de correction à une image uint8, sans conversion flottante.
+    
+    Args:
+        frame_masked (np.ndarray): Image (h, w, 3) uint8 en BGR
+        correction_lut (dict): LUT construite par construire_lut_correction
+        frame_corrected (np.ndarray, optional): Tampon de sortie réutilisable (h, w, 3) uint8
+    
+    Returns:
+        np.ndarray: Image corrigée (h, w, 3) uint8
+    """
+    if frame_corrected is None:
+        frame_corrected = np.empty_like(frame_masked)
+    if correction_lut['size'] == FULL_LUT_SIZE:
+        _apply_lut_full(frame_masked, correction_lut['table'], frame_corrected)
+    else:
+        _apply_lut_tetrahedral(frame_masked, correction_lut['table'],
+                             correction_lut['indices'], correction_lut['weights'],
+                             frame_corrected)
+    return frame_corrected
+
 def modele_non_lineaire(correction_coefficients, colors_input):
     """
     Applique le modèle non linéaire de correction des couleurs.
@@ -71,7 +360,45 @@ def modele_non_lineaire(correction_coefficients, colors_input):
     """
     return _apply_color_correction(colors_input, correction_coefficients)
 
-def calibrer_transformation_non_lineaire(colors_measured, colors_target):
+def jacobien_non_lineaire(correction_coefficients, colors_input):
+    """
+    Calcule la jacobienne analytique du modèle non linéaire.
+
+    Pour chaque canal j, avec L_j = a_j * B + b_j * G + c_j * R + d_j :
+        d f_j / d(a_j, b_j, c_j, d_j) = gamma_j * L_j ** (gamma_j - 1) * (B, G, R, 1)
+        d f_j / d gamma_j = L_j ** gamma_j * ln(L_j)
+
+    Args:
+        correction_coefficients (np.array): Vecteur des 15 paramètres de correction
+        colors_input (np.array): Matrice (n,3) des couleurs d'entrée en BGR
+
+    Returns:
+        np.array: Jacobienne (3n, 15), lignes dans l'ordre de (prédiction - cible).ravel()
+
+    Notes:
+        - Sous le seuil de 1e-6 (comme modele_non_lineaire), L_j est constant:
+          sa dérivée par rapport à a_j, b_j, c_j et d_j est nulle
+        - Chaque ligne ne dépend que des 5 paramètres de son canal
+    """
+    channel_coefficients = np.asarray(correction_coefficients, dtype=np.float64).reshape(3, 5)
+    colors_input = np.asarray(colors_input, dtype=np.float64)
+    gammas = channel_coefficients[:, 4]
+    
+    colors_linear = colors_input @ channel_coefficients[:, :3].T + channel_coefficients[:, 3]
+    colors_clipped = colors_linear <= 1e-6
+    colors_linear = np.maximum(colors_linear, 1e-6)
+    colors_powered = colors_linear ** gammas
+    linear_derivatives = np.where(colors_clipped, 0.0, gammas * colors_powered / colors_linear)
+    
+    jacobian = np.zeros((len(colors_input), 3, 15))
+    for channel in range(3):
+        first_column = 5 * channel
+        jacobian[:, channel, first_column:first_column + 3] = linear_derivatives[:, channel, None] * colors_input
+        jacobian[:, channel, first_column + 3] = linear_derivatives[:, channel]
+        jacobian[:, channel, first_column + 4] = colors_powered[:, channel] * np.log(colors_linear[:, channel])
+    return jacobian.reshape(-1, 15)
+
+def calibrer_transformation_non_lineaire(colors_measured, colors_target, coefficients_init=None, max_nfev=None):
     """
     Optimise les paramètres de la transformation non linéaire.
 
@@ -81,41 +408,86 @@ def calibrer_transformation_non_lineaire(colors_measured, colors_target):
     Args:
         colors_measured (np.array): Couleurs mesurées (n,3) en BGR, normalisées [0,1]
         colors_target (np.array): Couleurs cibles (n,3) en BGR, normalisées [0,1]
+        coefficients_init (np.array, optional): Paramètres de départ, typiquement ceux
+            de la calibration précédente. Par défaut, la transformation identitaire
+        max_nfev (int, optional): Nombre maximal d'évaluations des résidus
+            (None: critère d'arrêt par défaut de least_squares)
 
     Returns:
         np.array: Vecteur des 15 paramètres optimaux
 
     Notes:
-        - Initialisation avec une transformation identitaire
-        - Les paramètres gamma sont contraints entre 0.1 et 5
+        - Les paramètres gamma sont contraints entre 0.1 et 5 (un départ hors
+          bornes y est ramené)
+        - La jacobienne est analytique (jacobien_non_lineaire)
+        - scipy.optimize n'est importé qu'à la première calibration
     """
+    from scipy.optimize import least_squares
+    
+    colors_measured = np.asarray(colors_measured, dtype=np.float64)
+    colors_target = np.asarray(colors_target, dtype=np.float64)
+    
     def residuals(correction_coefficients):
         pred = modele_non_lineaire(correction_coefficients, colors_measured)
         return (pred - colors_target).ravel()
     
-    # Initialisation : transformation identitaire pour chaque canal
-    coefficients_init = np.array([1, 0, 0, 0, 1,
-                                   0, 1, 0, 0, 1,
-                                   0, 0, 1, 0, 1], dtype=np.float32)
+    def jacobian(correction_coefficients):
+        return jacobien_non_lineaire(correction_coefficients, colors_measured)
     
     # Bornes sur les paramètres gamma pour éviter des valeurs non physiques
-    bounds_lower = [-np.inf] * 15
-    bounds_upper = [np.inf] * 15
-    bounds_lower[4] = 0.1; bounds_lower[9] = 0.1; bounds_lower[14] = 0.1  # gamma >= 0.1
-    bounds_upper[4] = 5;   bounds_upper[9] = 5;   bounds_upper[14] = 5    # gamma <= 5
-    
-    optimization_result = least_squares(residuals, coefficients_init, 
-                                          bounds=(bounds_lower, bounds_upper), 
-                                          method="trf")
+    bounds_lower = np.full(15, -np.inf)
+    bounds_upper = np.full(15, np.inf)
+    bounds_lower[4::5] = 0.1  # gamma >= 0.1
+    bounds_upper[4::5] = 5    # gamma <= 5
+    
+    if coefficients_init is None:
+        # Initialisation : transformation identitaire pour chaque canal
+        coefficients_init = np.array([1, 0, 0, 0, 1,
+                                      0, 1, 0, 0, 1,
+                                      0, 0, 1, 0, 1], dtype=np.float64)
+    else:
+        coefficients_init = np.array(coefficients_init, dtype=np.float64)
+        coefficients_init[4::5] = np.clip(coefficients_init[4::5], 0.1 + 1e-9, 5 - 1e-9)
+    
+    optimization_result = least_squares(residuals, coefficients_init, jac=jacobian,
+                                          bounds=(bounds_lower, bounds_upper),
+                                          method="trf", max_nfev=max_nfev)
     return optimization_result.x
 
-def appliquer_correction_non_lineaire(frame_masked, correction_coefficients):
+def appliquer_modele_non_lineaire(frame_masked, correction_coefficients):
+    """
+    Applique directement le modèle non linéaire à une image, pixel par pixel.
+    
+    Args:
+        frame_masked (np.array): Image d'entrée en BGR (uint8)
+        correction_coefficients (np.array): Vecteur des 15 paramètres de correction
+    
+    Returns:
+        np.array: Image corrigée en BGR (uint8)
+    """
+    h, w, _ = frame_masked.shape
+    frame_normalized = frame_masked.astype(np.float32) / 255.0
+    pixels_raw = frame_normalized.reshape(-1, 3)
+    pixels_corrected = _apply_color_correction(pixels_raw, correction_coefficients)
+    pixels_corrected = np.clip(pixels_corrected, 0, 1)
+    return (pixels_corrected.reshape(h, w, 3) * 255).astype(np.uint8)
+
+register_correction_model('gamma', calibrer_transformation_non_lineaire, modele_non_lineaire,
+                          appliquer_modele_non_lineaire)
+active_correction_model = get_correction_model(COLOR_CORRECTION_MODEL)
+
+def appliquer_correction_non_lineaire(frame_masked, correction_coefficients, correction_lut=None,
+                                      correction_model=None):
     """
     Applique la correction non linéaire à une image complète.
 
     Args:
         frame_masked (np.array): Image d'entrée en BGR avec masque appliqué (uint8)
-        correction_coefficients (np.array): Vecteur des 15 paramètres de correction
+        correction_coefficients (np.array): Paramètres du modèle de correction
+        correction_lut (dict, optional): LUT construite à partir de ces paramètres.
+            Si fournie, la correction est une lecture de table uint8 -> uint8.
+        correction_model (dict, optional): Modèle appliqué sans LUT (voir
+            color_correction_models), par défaut le modèle non linéaire 'gamma'
 
     Returns:
         np.array: Image corrigée en BGR (uint8)
@@ -123,48 +495,432 @@ def appliquer_correction_non_lineaire(frame_masked, correction_coefficients):
     Notes:
         Les valeurs sont automatiquement clippées dans [0,255]
     """
-    h, w, _ = frame_masked.shape
-    frame_normalized = frame_masked.astype(np.float32) / 255.0
-    pixels_raw = frame_normalized.reshape(-1, 3)
-    
     try:
-        pixels_corrected = _apply_color_correction(pixels_raw, correction_coefficients)
-        pixels_corrected = np.clip(pixels_corrected, 0, 1)
-        frame_corrected = (pixels_corrected.reshape(h, w, 3) * 255).astype(np.uint8)
-        return frame_corrected
+        if correction_lut is not None:
+            if frame_masked.dtype != np.uint8:
+                frame_masked = frame_masked.astype(np.uint8)
+            return appliquer_lut_correction(np.ascontiguousarray(frame_masked), correction_lut)
+        
+        if correction_model is None:
+            return appliquer_modele_non_lineaire(frame_masked, correction_coefficients)
+        return correction_model['apply'](frame_masked, correction_coefficients)
     except Exception as e:
         print(f"Erreur lors de la correction des couleurs: {str(e)}")
         return frame_masked
 
+def signature_patchs(colors_measured):
+    """
+    Calcule la signature d'une mesure des 24 patchs pour le cache.
+    
+    Args:
+        colors_measured (np.array): Couleurs mesurées (24,3) en BGR [0-255]
+    
+    Returns:
+        np.ndarray: Couleurs Lab (24, 3) des patchs, comparées en ΔE (CIE76)
+    """
+    return bgr_to_lab(colors_measured)
+
+def rechercher_correction_en_cache(patch_lab, max_delta_e=COLOR_CORRECTION_CACHE_DELTA_E):
+    """
+    Cherche l'état d'éclairage mémorisé le plus proche d'une mesure.
+    
+    Args:
+        patch_lab (np.ndarray): Signature retournée par signature_patchs
+        max_delta_e (float): ΔE moyen maximal entre la mesure et l'état mémorisé
+    
+    Returns:
+        tuple or None: (paramètres, LUT) de l'état le plus proche, None si aucun
+            n'est à moins de max_delta_e
+    
+    Notes:
+        Deux mesures d'un même éclairage ne diffèrent que par le bruit du
+        capteur: la recherche se fait à la distance, pas à l'égalité. La
+        tolérance doit rester inférieure à COLOR_DRIFT_DELTA_E_THRESHOLD, sans
+        quoi l'état réutilisé pourrait être plus éloigné de l'éclairage courant
+        qu'une dérive déclenchant la recalibration.
+    """
+    with correction_cache_lock:
+        if correction_cache:
+            cached_lab = np.stack([cache_entry['lab'] for cache_entry in correction_cache])
+            delta_e = np.linalg.norm(cached_lab - patch_lab, axis=2).mean(axis=1)
+            nearest_index = int(np.argmin(delta_e))
+            if delta_e[nearest_index] <= max_delta_e:
+                cache_entry = correction_cache.pop(nearest_index)
+                correction_cache.append(cache_entry)
+                correction_cache_stats['hits'] += 1
+                return cache_entry['params'], cache_entry['lut']
+        correction_cache_stats['misses'] += 1
+        return None
+
+def memoriser_correction(patch_lab, correction_params, correction_lut):
+    """
+    Mémorise des paramètres et leur LUT, en évinçant l'état utilisé le moins récemment si le cache est plein.
+    
+    Args:
+        patch_lab (np.ndarray): Signature retournée par signature_patchs
+        correction_params (np.array): Vecteur des 15 paramètres de correction
+        correction_lut (dict or None): LUT construite à partir de ces paramètres
+    """
+    with correction_cache_lock:
+        correction_cache.append({'lab': patch_lab, 'params': correction_params, 'lut': correction_lut})
+        while len(correction_cache) > COLOR_CORRECTION_CACHE_SIZE:
+            correction_cache.pop(0)
+            correction_cache_stats['evictions'] += 1
+
+def get_correction_cache_stats():
+    """
+    Retourne les statistiques du cache des paramètres de correction.
+    
+    Returns:
+        dict: size, capacity, hits, misses, evictions et hit_rate
+    """
+    with correction_cache_lock:
+        cache_stats = dict(correction_cache_stats, size=len(correction_cache),
+                           capacity=COLOR_CORRECTION_CACHE_SIZE)
+    lookups = cache_stats['hits'] + cache_stats['misses']
+    cache_stats['hit_rate'] = cache_stats['hits'] / lookups if lookups else 0.0
+    return cache_stats
+
+def calculer_correction(frame_masked, detect_squares):
+    """
+    Mesure les patchs de la charte, ajuste le modèle COLOR_CORRECTION_MODEL et construit la LUT.
+    
+    Args:
+        frame_masked (np.array): Image en BGR avec masque appliqué (uint8)
+        detect_squares (bool): Si True, détecte les carrés, sinon utilise le cache
+    
+    Returns:
+        tuple: (paramètres du modèle, LUT ou None si COLOR_CORRECTION_LUT_SIZE vaut 0
+            ou si le modèle est appliqué sans LUT)
+    
+    Raises:
+        ValueError: Si le nombre de patchs mesurés n'est pas 24
+    
+    Notes:
+        - Si l'éclairage revient à un état déjà calibré (patchs à moins de
+          COLOR_CORRECTION_CACHE_DELTA_E en ΔE moyen), les paramètres et la LUT
+          mémorisés sont réutilisés sans nouvel ajustement
+    """
+    colors_measured = np.array(get_average_colors(frame_masked, detect_squares))
+    colors_target = np.array(MACBETH_REFERENCE_COLORS)
+    
+    if colors_measured.shape[0] != colors_target.shape[0]:
+        raise ValueError("Erreur : Le nombre de patchs mesurés ne correspond pas au nombre de couleurs cibles (24).")
+    
+    patch_lab = None
+    if COLOR_CORRECTION_CACHE_SIZE > 0:
+        patch_lab = signature_patchs(colors_measured)
+        cached_correction = rechercher_correction_en_cache(patch_lab)
+        if cached_correction is not None:
+            return cached_correction
+    
+    # Normalisation des couleurs dans l'intervalle [0,1]
+    colors_measured_norm = colors_measured / 255.0
+    colors_target_norm = colors_target / 255.0
+    
+    # Ajustement du modèle choisi, à partir de la dernière calibration s'il y en a
+    with correction_lock:
+        coefficients_init = target_correction_params if target_correction_params is not None else last_correction_params
+    correction_params = active_correction_model['fit'](colors_measured_norm, colors_target_norm,
+                                                       coefficients_init, COLOR_CALIBRATION_MAX_NFEV)
+    correction_lut = None
+    if COLOR_CORRECTION_LUT_SIZE and active_correction_model['use_lut']:
+        correction_lut = construire_lut_correction(correction_params, COLOR_CORRECTION_LUT_SIZE,
+                                                   active_correction_model)
+    if patch_lab is not None:
+        memoriser_correction(patch_lab, correction_params, correction_lut)
+    return correction_params, correction_lut
+
+def _lissage_possible(correction_params, correction_lut):
+    """Indique si la correction courante peut rejoindre progressivement une nouvelle calibration."""
+    if not 0 < COLOR_CORRECTION_SMOOTHING < 1 or last_correction_params is None:
+        return False
+    if np.shape(correction_params) != np.shape(last_correction_params):
+        return False
+    if correction_lut is None or last_correction_lut is None:
+        return correction_lut is None and last_correction_lut is None
+    return correction_lut['size'] == last_correction_lut['size'] != FULL_LUT_SIZE
+
+def _swap_correction(correction_params, correction_lut, recalibration_time, asynchronous, smoothed=False):
+    """
+    Remplace les paramètres et la LUT courants et compte la recalibration.
+    
+    Args:
+        correction_params (np.array): Paramètres de la nouvelle calibration
+        correction_lut (dict or None): LUT correspondante
+        recalibration_time (float): Durée de la recalibration (secondes)
+        asynchronous (bool): Recalibration faite en arrière-plan
+        smoothed (bool): Si True, la nouvelle calibration devient la cible du lissage
+            (voir _avancer_lissage) au lieu de remplacer immédiatement la correction
+    
+    Notes:
+        - Doit être appelée avec correction_lock acquis
+    """
+    global last_correction_params, last_correction_lut, calibration_generation
+    global target_correction_params, target_correction_lut, smoothing_weight_remaining
+    if smoothed and _lissage_possible(correction_params, correction_lut):
+        target_correction_params, target_correction_lut = correction_params, correction_lut
+        smoothing_weight_remaining = 1.0
+    else:
+        last_correction_params, last_correction_lut = correction_params, correction_lut
+        target_correction_params = target_correction_lut = None
+        smoothing_weight_remaining = 0.0
+    calibration_generation += 1
+    recalibration_stats['count'] += 1
+    recalibration_stats['async_count'] += int(asynchronous)
+    recalibration_stats['total_time'] += recalibration_time
+    recalibration_stats['max_time'] = max(recalibration_stats['max_time'], recalibration_time)
+    recalibration_stats['last_time'] = recalibration_time
+
+def _avancer_lissage():
+    """
+    Rapproche d'une frame la correction appliquée de la dernière calibration.
+    
+    Paramètres et table de la LUT avancent de COLOR_CORRECTION_SMOOTHING vers
+    la cible; la cible est adoptée telle quelle quand le poids restant de la
+    correction de départ passe sous SMOOTHING_SNAP_WEIGHT.
+    
+    Notes:
+        - Doit être appelée avec correction_lock acquis, une fois par frame, par
+          le thread qui corrige les frames: la table de travail est modifiée en
+          place et n'est lue que par ce thread
+    """
+    global last_correction_params, last_correction_lut, smoothing_table
+    global target_correction_params, target_correction_lut, smoothing_weight_remaining
+    if target_correction_params is None:
+        return
+    recalibration_stats['smoothed_frames'] += 1
+    smoothing_weight_remaining *= 1.0 - COLOR_CORRECTION_SMOOTHING
+    if smoothing_weight_remaining < SMOOTHING_SNAP_WEIGHT:
+        last_correction_params, last_correction_lut = target_correction_params, target_correction_lut
+        target_correction_params = target_correction_lut = None
+        return
+    
+    last_correction_params = last_correction_params + COLOR_CORRECTION_SMOOTHING * (
+        target_correction_params - last_correction_params)
+    if target_correction_lut is not None:
+        if last_correction_lut['table'] is not smoothing_table:
+            # Première étape depuis une LUT partagée (cache, profil): copie dans la table de travail
+            if smoothing_table is None or smoothing_table.shape != last_correction_lut['table'].shape:
+                smoothing_table = last_correction_lut['table'].copy()
+            else:
+                np.copyto(smoothing_table, last_correction_lut['table'])
+        table_rows = smoothing_table.reshape(-1, 3)
+        cv2.addWeighted(table_rows, 1.0 - COLOR_CORRECTION_SMOOTHING,
+                        target_correction_lut['table'].reshape(-1, 3), COLOR_CORRECTION_SMOOTHING, 0.0,
+                        dst=table_rows)
+        last_correction_lut = dict(target_correction_lut, table=smoothing_table)
+
+def recalibration_requise(frame, frame_index):
+    """
+    Indique si la recalibration périodique est due sur cette frame.
+    
+    Args:
+        frame (np.array or None): Frame BGR (brute ou masquée) sur laquelle mesurer la dérive
+        frame_index (int): Numéro de la frame
+    
+    Returns:
+        bool: True si la recalibration doit être lancée
+    """
+    if not COLOR_DRIFT_MONITOR_ENABLED:
+        return frame_index % COLOR_CORRECTION_INTERVAL == 0
+    return should_recalibrate(drift_monitor, frame, frame_index)
+
+def _update_drift_reference(frame_masked, frame_index):
+    """Enregistre la frame de la calibration comme référence du moniteur de dérive."""
+    set_drift_reference(drift_monitor, frame_masked, frame_index)
+
+def _recalibration_worker(frame_masked, preparer_frame, trigger_frame, start_generation):
+    """
+    Recalibre en arrière-plan puis échange les paramètres.
+    
+    Args:
+        frame_masked (np.array): Copie de la frame ayant déclenché la recalibration
+        preparer_frame (callable or None): Préparation de la frame avant la mesure des patchs
+        trigger_frame (int): Numéro de cette frame
+        start_generation (int): calibration_generation au lancement
+    """
+    recalibration_start = time.perf_counter()
+    try:
+        if preparer_frame is not None:
+            frame_masked = preparer_frame(frame_masked)
+        correction_params, correction_lut = calculer_correction(frame_masked, False)
+    except Exception as e:
+        print(f"Erreur lors de la recalibration en arrière-plan: {str(e)}")
+        with correction_lock:
+            recalibration_stats['failed'] += 1
+        return
+    recalibration_time = time.perf_counter() - recalibration_start
+    
+    with correction_lock:
+        if calibration_generation != start_generation:
+            recalibration_stats['stale'] += 1
+            return
+        _swap_correction(correction_params, correction_lut, recalibration_time, True, smoothed=True)
+    _update_drift_reference(frame_masked, trigger_frame)
+    print(f"Recalcul des paramètres de correction en arrière-plan "
+          f"(frame {trigger_frame}, {recalibration_time * 1000:.0f} ms)")
+
+def lancer_recalibration_asynchrone(frame_masked, preparer_frame=None):
+    """
+    Lance une recalibration sur un thread en arrière-plan.
+    
+    Args:
+        frame_masked (np.array): Image en BGR, copiée avant le lancement
+        preparer_frame (callable, optional): Fonction appliquée à la copie sur le thread
+            de recalibration (ex: redimensionnement et masque d'une frame brute)
+    
+    Returns:
+        bool: True si la recalibration est lancée, False si la précédente est encore en cours
+    """
+    global recalibration_thread
+    
+    if recalibration_thread is not None and recalibration_thread.is_alive():
+        with correction_lock:
+            recalibration_stats['skipped'] += 1
+        return False
+    with correction_lock:
+        start_generation = calibration_generation
+    recalibration_thread = threading.Thread(target=_recalibration_worker,
+                                            args=(frame_masked.copy(), preparer_frame, frame_count, start_generation),
+                                            name="MacbethRecalibration",
+                                            daemon=True)
+    recalibration_thread.start()
+    return True
+
+def attendre_recalibration(timeout=None):
+    """
+    Attend la fin de la recalibration en cours, s'il y en a une.
+    
+    Args:
+        timeout (float, optional): Attente maximale en secondes
+    """
+    if recalibration_thread is not None and recalibration_thread.is_alive():
+        recalibration_thread.join(timeout)
+
+def get_recalibration_stats():
+    """
+    Retourne les compteurs et durées des recalibrations.
+    
+    Returns:
+        dict: Compteurs de recalibration_stats, plus mean_time (secondes), drift
+            (compteurs du moniteur de dérive, None s'il est désactivé) et cache
+            (voir get_correction_cache_stats)
+    """
+    with correction_lock:
+        stats = dict(recalibration_stats)
+    stats['mean_time'] = stats['total_time'] / stats['count'] if stats['count'] else 0.0
+    stats['drift'] = get_drift_monitor_stats(drift_monitor) if COLOR_DRIFT_MONITOR_ENABLED else None
+    stats['cache'] = get_correction_cache_stats()
+    return stats
+
+def get_correction_courante():
+    """
+    Retourne la dernière calibration et les patchs de la frame correspondante.
+    
+    Returns:
+        tuple: (paramètres, LUT, référence) où référence est le dictionnaire de
+            set_drift_reference (couleurs Lab des patchs), None si inconnue.
+            Pendant un lissage, ce sont la cible et non la correction appliquée.
+            Paramètres et LUT valent None avant la première calibration.
+    """
+    with correction_lock:
+        if target_correction_params is not None:
+            return target_correction_params, target_correction_lut, drift_monitor['reference']
+        return last_correction_params, last_correction_lut, drift_monitor['reference']
+
+def restaurer_correction(correction_params, correction_lut, frame):
+    """
+    Installe une correction enregistrée, sans mesure des patchs ni ajustement.
+    
+    Args:
+        correction_params (np.array): Paramètres du modèle COLOR_CORRECTION_MODEL
+        correction_lut (dict or None): LUT correspondante (voir lut_depuis_table)
+        frame (np.array): Frame BGR courante, référence du moniteur de dérive
+    
+    Notes:
+        - Le compteur de frames n'est pas avancé: la frame suivante est la frame 1,
+          corrigée directement avec ces paramètres
+    """
+    global last_correction_params, last_correction_lut, calibration_generation
+    global target_correction_params, target_correction_lut
+    with correction_lock:
+        last_correction_params, last_correction_lut = correction_params, correction_lut
+        target_correction_params = target_correction_lut = None
+        calibration_generation += 1
+    _update_drift_reference(frame, frame_count)
+
+def preparer_correction_frame(detect_squares, frame_raw=None, preparer_frame=None):
+    """
+    Prépare la correction d'une frame pour un noyau fusionné.
+    
+    Si la frame ne nécessite pas de recalibration, le compteur de frames est
+    avancé et la LUT courante est retournée: l'appelant applique lui-même la
+    correction (voir video_processor.process_frame). Sinon, l'appelant doit
+    passer par corriger_image, qui recalibre et compte la frame.
+    
+    Avec ASYNC_RECALIBRATION_ENABLED, la recalibration périodique est lancée
+    en arrière-plan à partir de frame_raw et la LUT courante est retournée.
+    
+    Args:
+        detect_squares (bool): Si True, la détection des carrés force la recalibration
+        frame_raw (np.array, optional): Frame brute, nécessaire à la recalibration en arrière-plan
+        preparer_frame (callable, optional): Redimensionnement et masque de frame_raw,
+            exécutés sur le thread de recalibration
+    
+    Returns:
+        dict or None: LUT à appliquer, None si corriger_image doit être utilisé
+    """
+    global frame_count
+    
+    if not COLOR_CORRECTION_LUT_SIZE or last_correction_lut is None or detect_squares:
+        return None
+    recalibration_due = recalibration_requise(frame_raw, frame_count + 1)
+    if recalibration_due and (not ASYNC_RECALIBRATION_ENABLED or frame_raw is None):
+        return None
+    frame_count += 1
+    if recalibration_due:
+        lancer_recalibration_asynchrone(frame_raw, preparer_frame)
+    with correction_lock:
+        _avancer_lissage()
+        return last_correction_lut
+
 def corriger_image(frame_masked, cache_file, detect_squares):
     """
     Corrige les couleurs d'une image via la charte Macbeth.
+    
+    Notes:
+        - Avec ASYNC_RECALIBRATION_ENABLED, la recalibration périodique est
+          lancée en arrière-plan et la frame est corrigée avec les paramètres courants
     """
-    global last_correction_params, frame_count
+    global frame_count
     
     try:
         # Incrémenter le compteur avant la vérification
         frame_count += 1
         
         # Vérifier si on doit recalculer les paramètres
-        if frame_count % COLOR_CORRECTION_INTERVAL == 0 or last_correction_params is None or detect_squares:
+        recalibration_due = (last_correction_params is not None and not detect_squares
+                             and recalibration_requise(frame_masked, frame_count))
+        if last_correction_params is None or detect_squares or (recalibration_due and not ASYNC_RECALIBRATION_ENABLED):
             # Si detect_squares est True, force le recalcul
-            colors_measured = np.array(get_average_colors(frame_masked, detect_squares))
-            colors_target = np.array(MACBETH_REFERENCE_COLORS)
-            
-            if colors_measured.shape[0] != colors_target.shape[0]:
-                raise ValueError("Erreur : Le nombre de patchs mesurés ne correspond pas au nombre de couleurs cibles (24).")
-            
-            # Normalisation des couleurs dans l'intervalle [0,1]
-            colors_measured_norm = colors_measured / 255.0
-            colors_target_norm = colors_target / 255.0
-            
-            # Calibration non linéaire pour obtenir les paramètres optimaux
-            last_correction_params = calibrer_transformation_non_lineaire(colors_measured_norm, colors_target_norm)
+            recalibration_start = time.perf_counter()
+            correction_params, correction_lut = calculer_correction(frame_masked, detect_squares)
+            with correction_lock:
+                _swap_correction(correction_params, correction_lut,
+                                 time.perf_counter() - recalibration_start, False,
+                                 smoothed=recalibration_due)
+            _update_drift_reference(frame_masked, frame_count)
             print(f"Recalcul des paramètres de correction (frame {frame_count}, detect_squares={detect_squares})")
+        elif recalibration_due:
+            lancer_recalibration_asynchrone(frame_masked)
         
         # Application de la correction à l'image complète avec les derniers paramètres
-        frame_corrected = appliquer_correction_non_lineaire(frame_masked, last_correction_params)
+        with correction_lock:
+            _avancer_lissage()
+            correction_params, correction_lut = last_correction_params, last_correction_lut
+        frame_corrected = appliquer_correction_non_lineaire(frame_masked, correction_params, correction_lut,
+                                                            active_correction_model)
         
         return frame_corrected
         
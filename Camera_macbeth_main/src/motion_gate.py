@@ -0,0 +1,168 @@
+"""
+Module de filtrage des frames sans mouvement.
+
+Pendant une course, la zone d'arrivée reste vide une grande partie du temps.
+Ce module compare chaque frame masquée, réduite et convertie en niveaux de
+gris à la précédente (ou à un modèle de fond MOG2) afin de sauter
+l'inférence YOLO quand rien ne bouge dans la zone de détection.
+
+Une détection est tout de même forcée régulièrement (MOTION_GATE_MAX_SKIP)
+pour que le tracker ne perde pas une personne immobile, et maintenue
+quelques frames après la fin du mouvement (MOTION_GATE_HOLD_FRAMES).
+"""
+
+import cv2
+
+from config.performance_config import (
+    MOTION_GATE_METHOD,
+    MOTION_GATE_DOWNSCALE,
+    MOTION_GATE_PIXEL_THRESHOLD,
+    MOTION_GATE_MIN_AREA_RATIO,
+    MOTION_GATE_HOLD_FRAMES,
+    MOTION_GATE_MAX_SKIP
+)
+
+def create_motion_gate(method=MOTION_GATE_METHOD, downscale=MOTION_GATE_DOWNSCALE):
+    """
+    Crée un dictionnaire contenant l'état initial du filtre de mouvement.
+
+    Args:
+        method (str): 'diff' (différence de frames) ou 'mog2' (soustraction de fond)
+        downscale (int): Facteur de réduction de la frame avant comparaison
+
+    Returns:
+        dict: État initial contenant:
+            - method (str): Méthode de détection du mouvement
+            - downscale (int): Facteur de réduction
+            - previous_frame (np.ndarray or None): Dernière frame réduite (méthode 'diff')
+            - background_subtractor (cv2.BackgroundSubtractorMOG2 or None): Modèle de fond
+            - frames_since_detection (int): Frames sautées depuis la dernière détection
+            - hold_frames_left (int): Frames restant à détecter après la fin du mouvement
+            - last_motion_ratio (float): Proportion de pixels en mouvement de la dernière frame
+            - processed_frames, skipped_frames, motion_frames, forced_frames (int): Compteurs
+    """
+    background_subtractor = None
+    if method == 'mog2':
+        background_subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+    return {
+        'method': method,
+        'downscale': max(1, int(downscale)),
+        'previous_frame': None,
+        'background_subtractor': background_subtractor,
+        'frames_since_detection': 0,
+        'hold_frames_left': 0,
+        'last_motion_ratio': 0.0,
+        'processed_frames': 0,
+        'skipped_frames': 0,
+        'motion_frames': 0,
+        'forced_frames': 0
+    }
+
+def prepare_motion_frame(frame, region, downscale):
+    """
+    Réduit la zone de détection en une petite image en niveaux de gris.
+
+    Args:
+        frame (np.ndarray): Frame BGR masquée
+        region (tuple or None): Région (x1, y1, x2, y2), None pour la frame complète
+        downscale (int): Facteur de réduction
+
+    Returns:
+        np.ndarray: Image en niveaux de gris réduite et lissée
+    """
+    if region is not None:
+        region_x1, region_y1, region_x2, region_y2 = region
+        frame = frame[region_y1:region_y2, region_x1:region_x2]
+    frame_height, frame_width = frame.shape[:2]
+    small_frame = cv2.resize(frame, (max(1, frame_width // downscale), max(1, frame_height // downscale)),
+                             interpolation=cv2.INTER_AREA)
+    gray_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2GRAY)
+    return cv2.GaussianBlur(gray_frame, (5, 5), 0)
+
+def measure_motion(gate_state, frame, region=None):
+    """
+    Mesure la proportion de pixels en mouvement dans la zone de détection.
+
+    Args:
+        gate_state (dict): État du filtre (voir create_motion_gate)
+        frame (np.ndarray): Frame BGR masquée
+        region (tuple, optional): Région (x1, y1, x2, y2) analysée
+
+    Returns:
+        float: Proportion de pixels en mouvement [0-1], 1.0 sans frame de référence
+    """
+    gray_frame = prepare_motion_frame(frame, region, gate_state['downscale'])
+
+    if gate_state['background_subtractor'] is not None:
+        foreground_mask = gate_state['background_subtractor'].apply(gray_frame)
+        return cv2.countNonZero(foreground_mask) / foreground_mask.size
+
+    previous_frame = gate_state['previous_frame']
+    gate_state['previous_frame'] = gray_frame
+    if previous_frame is None or previous_frame.shape != gray_frame.shape:
+        return 1.0
+
+    frame_difference = cv2.absdiff(gray_frame, previous_frame)
+    _, motion_mask = cv2.threshold(frame_difference, MOTION_GATE_PIXEL_THRESHOLD, 255, cv2.THRESH_BINARY)
+    return cv2.countNonZero(motion_mask) / motion_mask.size
+
+def should_run_detection(gate_state, frame, region=None):
+    """
+    Indique si l'inférence doit être lancée sur cette frame.
+
+    Args:
+        gate_state (dict): État du filtre (voir create_motion_gate)
+        frame (np.ndarray): Frame BGR masquée
+        region (tuple, optional): Région (x1, y1, x2, y2) envoyée au détecteur
+
+    Returns:
+        bool: True si la détection doit être lancée
+
+    Notes:
+        - La détection est maintenue MOTION_GATE_HOLD_FRAMES frames après le mouvement
+        - Elle est forcée après MOTION_GATE_MAX_SKIP frames sautées consécutives
+    """
+    motion_ratio = measure_motion(gate_state, frame, region)
+    gate_state['last_motion_ratio'] = motion_ratio
+    gate_state['processed_frames'] += 1
+
+    if motion_ratio >= MOTION_GATE_MIN_AREA_RATIO:
+        gate_state['motion_frames'] += 1
+        gate_state['hold_frames_left'] = MOTION_GATE_HOLD_FRAMES
+        run_detection = True
+    elif gate_state['hold_frames_left'] > 0:
+        gate_state['hold_frames_left'] -= 1
+        run_detection = True
+    elif gate_state['frames_since_detection'] >= MOTION_GATE_MAX_SKIP:
+        gate_state['forced_frames'] += 1
+        run_detection = True
+    else:
+        run_detection = False
+
+    if run_detection:
+        gate_state['frames_since_detection'] = 0
+    else:
+        gate_state['frames_since_detection'] += 1
+        gate_state['skipped_frames'] += 1
+    return run_detection
+
+def get_motion_gate_stats(gate_state):
+    """
+    Retourne les compteurs du filtre de mouvement.
+
+    Args:
+        gate_state (dict): État du filtre (voir create_motion_gate)
+
+    Returns:
+        dict: processed_frames, skipped_frames, skip_rate, motion_frames,
+            forced_frames et last_motion_ratio
+    """
+    processed_frames = gate_state['processed_frames']
+    return {
+        'processed_frames': processed_frames,
+        'skipped_frames': gate_state['skipped_frames'],
+        'skip_rate': gate_state['skipped_frames'] / processed_frames if processed_frames else 0.0,
+        'motion_frames': gate_state['motion_frames'],
+        'forced_frames': gate_state['forced_frames'],
+        'last_motion_ratio': gate_state['last_motion_ratio']
+    }
@@ -0,0 +1,427 @@
+"""
+Module d'exécution en pipeline multi-processus.
+
+Chaque étape du traitement tourne dans son propre processus afin que le GIL
+ne sérialise plus les étapes entre elles:
+1. Décodage de la vidéo
+2. Prétraitement (process_frame: redimensionnement, masque, correction)
+3. Suivi (update_tracker, couleurs, franchissements, enregistrement)
+4. Rendu (dessin et show_frame)
+
+Les frames transitent par des emplacements en mémoire partagée
+(multiprocessing.shared_memory): seuls les indices d'emplacements et les
+métadonnées des personnes passent par les files. Le nombre limité
+d'emplacements libres applique la contre-pression, et chaque étape étant
+un processus unique lisant une file FIFO, l'ordre des frames est conservé.
+Le débit du pipeline est ainsi celui de son étape la plus lente.
+"""
+
+import multiprocessing as mp
+import queue
+import signal
+import time
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from config.detection_config import DETECT_SQUARES
+from config.display_config import (
+    line_start, line_end, output_width, output_height, SHOW_ROI_AND_COLOR
+)
+from src.stage_profiler import get_profiling_settings
+
+# Délai d'attente sur les files pour pouvoir vérifier l'arrêt
+_QUEUE_POLL_TIMEOUT = 0.1
+
+
+class SharedFramePool:
+    """
+    Ensemble d'emplacements de frames en mémoire partagée.
+
+    Attributes:
+        name (str): Nom du segment de mémoire partagée
+        slot_count (int): Nombre d'emplacements
+        frame_shape (tuple): Dimensions (h, w, 3) d'une frame
+    """
+
+    def __init__(self, slot_count, frame_shape, name=None):
+        """
+        Crée (name=None) ou attache (name donné) un segment de mémoire partagée.
+
+        Args:
+            slot_count (int): Nombre d'emplacements
+            frame_shape (tuple): Dimensions (h, w, 3) d'une frame uint8
+            name (str, optional): Nom d'un segment existant à attacher
+        """
+        self.slot_count = slot_count
+        self.frame_shape = tuple(frame_shape)
+        slot_bytes = int(np.prod(self.frame_shape))
+        if name is None:
+            self._shared_memory = shared_memory.SharedMemory(create=True, size=slot_count * slot_bytes)
+        else:
+            self._shared_memory = shared_memory.SharedMemory(name=name)
+        self.name = self._shared_memory.name
+        self._slots = np.ndarray((slot_count,) + self.frame_shape, dtype=np.uint8,
+                                 buffer=self._shared_memory.buf)
+
+    def slot(self, slot_index):
+        """Retourne une vue numpy sur l'emplacement demandé."""
+        return self._slots[slot_index]
+
+    def descriptor(self):
+        """Retourne les informations nécessaires pour attacher le segment dans un autre processus."""
+        return (self.slot_count, self.frame_shape, self.name)
+
+    def close(self, unlink=False):
+        """
+        Détache le segment (et le supprime si unlink=True).
+
+        Args:
+            unlink (bool): True uniquement dans le processus propriétaire
+        """
+        self._slots = None
+        try:
+            self._shared_memory.close()
+        except BufferError:
+            # Des vues locales référencent encore le segment: libéré à la fin du processus
+            pass
+        if unlink:
+            self._shared_memory.unlink()
+
+
+def _queue_get(source_queue, stop_event):
+    """
+    Lit un élément d'une file en surveillant la demande d'arrêt.
+
+    Returns:
+        object: Élément lu, None si l'arrêt est demandé et la file est vide
+    """
+    while True:
+        try:
+            return source_queue.get(timeout=_QUEUE_POLL_TIMEOUT)
+        except queue.Empty:
+            if stop_event.is_set():
+                return None
+
+
+def _init_stage_process(profiling_settings):
+    """
+    Prépare un processus d'étape.
+
+    Les signaux d'arrêt sont gérés par le processus principal. Le processus
+    étant lancé par "spawn", le chronométrage activé par --profile dans le
+    processus principal doit y être réactivé.
+
+    Args:
+        profiling_settings (tuple): (chronométrage activé, fichier Chrome trace), voir get_profiling_settings
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    profiling_enabled, trace_path = profiling_settings
+    if profiling_enabled:
+        from src.stage_profiler import enable_profiling
+        enable_profiling(trace_path)
+
+
+def _decode_stage(profiling_settings, video_path, raw_pool_descriptor, raw_free_queue, output_queue, stop_event):
+    """
+    Étape 1: décode la vidéo dans les emplacements de frames brutes.
+    """
+    _init_stage_process(profiling_settings)
+    from src.video_processor import setup_video_capture
+    from src.stage_profiler import profile_stage, finish_profiling
+
+    raw_pool = SharedFramePool(*raw_pool_descriptor)
+    video_capture = setup_video_capture(video_path)
+    frame_index = 0
+    try:
+        while not stop_event.is_set():
+            slot_index = _queue_get(raw_free_queue, stop_event)
+            if slot_index is None:
+                break
+            slot = raw_pool.slot(slot_index)
+            with profile_stage('decode'):
+                ret, decoded_frame = video_capture.read(slot)
+            if not ret or decoded_frame is None:
+                break
+            if decoded_frame is not slot:
+                slot[...] = decoded_frame
+            output_queue.put((frame_index, slot_index))
+            frame_index += 1
+    finally:
+        output_queue.put(None)
+        video_capture.release()
+        raw_pool.close()
+        finish_profiling('decode')
+
+
+def _preprocess_stage(profiling_settings, chart_geometry, raw_pool_descriptor, processed_pool_descriptor,
+                      raw_free_queue, processed_free_queue, input_queue, output_queue, stop_event):
+    """
+    Étape 2: redimensionnement, masque et correction des couleurs.
+
+    La géométrie de la charte trouvée par le processus principal est transmise
+    en argument: elle n'est en mémoire que dans ce processus, et n'est pas
+    écrite sur disque si CHART_CACHE_PERSIST_ENABLED vaut False.
+    """
+    _init_stage_process(profiling_settings)
+    from src.video_processor import load_mask, process_frame
+    from src.run_support import print_recalibration_stats
+    from src.camera_profile import restore_camera_profile, save_camera_profile
+    from src.macbeth_color_and_rectangle_detector import save_chart_geometry
+    from src.stage_profiler import finish_profiling
+
+    if chart_geometry is not None:
+        save_chart_geometry(chart_geometry)
+    raw_pool = SharedFramePool(*raw_pool_descriptor)
+    processed_pool = SharedFramePool(*processed_pool_descriptor)
+    load_mask()
+    profile_checked = False
+    try:
+        while True:
+            item = _queue_get(input_queue, stop_event)
+            if item is None:
+                break
+            frame_index, raw_slot_index = item
+            if not profile_checked:
+                restore_camera_profile(raw_pool.slot(raw_slot_index))
+                profile_checked = True
+            processed_slot_index = _queue_get(processed_free_queue, stop_event)
+            if processed_slot_index is None:
+                break
+
+            # Le noyau fusionné écrit directement dans l'emplacement partagé
+            processed_slot = processed_pool.slot(processed_slot_index)
+            processed_frame = process_frame(raw_pool.slot(raw_slot_index), DETECT_SQUARES, processed_slot)
+            if processed_frame is not processed_slot:
+                if processed_frame.shape == processed_slot.shape:
+                    processed_slot[...] = processed_frame
+                else:
+                    cv2.resize(processed_frame, (output_width, output_height), dst=processed_slot)
+            raw_free_queue.put(raw_slot_index)
+            output_queue.put((frame_index, processed_slot_index))
+    finally:
+        output_queue.put(None)
+        raw_pool.close()
+        processed_pool.close()
+        print_recalibration_stats()
+        save_camera_profile()
+        finish_profiling('preprocess')
+
+
+def _snapshot_person(tracked_person):
+    """Copie légère des données d'une personne pour l'étape de rendu."""
+    return {
+        'bbox': [float(coord) for coord in tracked_person['bbox']],
+        'id': int(tracked_person['id']),
+        'value': tracked_person['value'],
+        'movement_trajectory': list(tracked_person['movement_trajectory'])
+    }
+
+
+def _track_stage(profiling_settings, processed_pool_descriptor, input_queue, output_queue, stop_event):
+    """
+    Étape 3: suivi des personnes, couleurs et enregistrement des passages.
+    """
+    _init_stage_process(profiling_settings)
+    from src.video_processor import initialize_color_masks, load_mask, get_processing_region
+    from src.display_manager import detect_person_color
+    from src.tracker import (
+        create_tracker, update_tracker, check_line_crossing, setup_compute_device, get_detection_region
+    )
+    from src.detection_history import init_detection_history, update_detection_value, cleanup
+    from src.run_support import handle_line_crossings, print_motion_gate_stats
+    from src.stage_profiler import finish_profiling
+
+    processed_pool = SharedFramePool(*processed_pool_descriptor)
+    initialize_color_masks()
+    load_mask()
+    detection_region = get_detection_region(get_processing_region(), (output_height, output_width))
+    init_detection_history()
+    tracker_state = create_tracker()
+    tracker_state['person_detection_model'] = tracker_state['person_detection_model'].to(setup_compute_device())
+    try:
+        while True:
+            item = _queue_get(input_queue, stop_event)
+            if item is None:
+                break
+            frame_index, processed_slot_index = item
+            processed_frame = processed_pool.slot(processed_slot_index)
+
+            tracked_persons = update_tracker(tracker_state, processed_frame, detection_region)
+            persons_to_process = []
+            for tracked_person in tracked_persons:
+                if tracked_person['value'] is not None:
+                    update_detection_value(tracked_person['id'], tracked_person['value'])
+                if check_line_crossing(tracked_person, line_start, line_end):
+                    persons_to_process.append(tracked_person['id'])
+
+            # Détection des couleurs, faite par draw_person en mode séquentiel
+            if SHOW_ROI_AND_COLOR:
+                for tracked_person in tracked_persons:
+                    detect_person_color(processed_frame, tracked_person)
+
+            persons_snapshot = [_snapshot_person(tracked_person) for tracked_person in tracked_persons]
+            formatted_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            handle_line_crossings(tracker_state, persons_to_process, formatted_time)
+
+            output_queue.put((frame_index, processed_slot_index, persons_snapshot,
+                              dict(tracker_state['line_crossing_counter'])))
+    finally:
+        output_queue.put(None)
+        cleanup()
+        processed_pool.close()
+        if tracker_state['motion_gate'] is not None:
+            print_motion_gate_stats(tracker_state['motion_gate'])
+        finish_profiling('track')
+
+
+def _render_stage(profiling_settings, processed_pool_descriptor, processed_free_queue, input_queue, stop_event,
+                  stats_queue):
+    """
+    Étape 4: dessin des annotations et affichage ou enregistrement.
+    """
+    _init_stage_process(profiling_settings)
+    from src.display_manager import (
+        init_display, draw_person, draw_crossing_line, draw_counters, show_frame, release_display
+    )
+    from src.stage_profiler import profile_stage, finish_profiling
+
+    processed_pool = SharedFramePool(*processed_pool_descriptor)
+    init_display()
+    rendered_frames = 0
+    start_time = time.perf_counter()
+    try:
+        while True:
+            item = _queue_get(input_queue, stop_event)
+            if item is None:
+                break
+            frame_index, processed_slot_index, persons_snapshot, counters = item
+
+            # Après une demande d'arrêt, les frames restantes sont seulement libérées
+            if not stop_event.is_set():
+                frame_display = processed_pool.slot(processed_slot_index)
+                with profile_stage('drawing'):
+                    for tracked_person in persons_snapshot:
+                        draw_person(frame_display, tracked_person, detect_color=False)
+                    draw_crossing_line(frame_display, line_start, line_end)
+                    draw_counters(frame_display, counters)
+                with profile_stage('show_frame'):
+                    should_exit, _, _ = show_frame(frame_display)
+                rendered_frames += 1
+                if should_exit:
+                    stop_event.set()
+
+            processed_free_queue.put(processed_slot_index)
+    finally:
+        stats_queue.put({'rendered_frames': rendered_frames,
+                         'elapsed_time': time.perf_counter() - start_time})
+        release_display()
+        processed_pool.close()
+        finish_profiling('render')
+
+
+class StagePipeline:
+    """
+    Pipeline de traitement où chaque étape tourne dans son propre processus.
+
+    Attributes:
+        video_path (str): Vidéo à traiter
+        slot_count (int): Nombre d'emplacements par pool de mémoire partagée
+        chart_geometry (dict or None): Géométrie de la charte transmise au prétraitement
+    """
+
+    def __init__(self, video_path, raw_frame_shape, slot_count=4, chart_geometry=None):
+        """
+        Prépare les pools de mémoire partagée et les files entre étapes.
+
+        Args:
+            video_path (str): Vidéo à traiter
+            raw_frame_shape (tuple): Dimensions (h, w, 3) des frames décodées
+            slot_count (int): Nombre d'emplacements par pool (au moins 2)
+            chart_geometry (dict, optional): Géométrie de la charte (format de
+                load_chart_geometry) trouvée par le processus principal
+        """
+        self.video_path = video_path
+        self.slot_count = max(2, int(slot_count))
+        self.chart_geometry = chart_geometry
+        self._context = mp.get_context("spawn")
+        self._stop_event = self._context.Event()
+        self._raw_pool = SharedFramePool(self.slot_count, raw_frame_shape)
+        self._processed_pool = SharedFramePool(self.slot_count, (output_height, output_width, 3))
+        self._processes = []
+        self._stats_queue = self._context.Queue()
+
+    def run(self):
+        """
+        Exécute le pipeline jusqu'à la fin de la vidéo ou une demande d'arrêt.
+
+        Returns:
+            dict: Statistiques (rendered_frames, elapsed_time, fps)
+        """
+        context = self._context
+        raw_free_queue = context.Queue()
+        processed_free_queue = context.Queue()
+        for slot_index in range(self.slot_count):
+            raw_free_queue.put(slot_index)
+            processed_free_queue.put(slot_index)
+
+        # Files non bornées: la contre-pression vient des emplacements libres
+        decoded_queue = context.Queue()
+        preprocessed_queue = context.Queue()
+        tracked_queue = context.Queue()
+
+        profiling_settings = get_profiling_settings()
+        raw_descriptor = self._raw_pool.descriptor()
+        processed_descriptor = self._processed_pool.descriptor()
+        stage_definitions = [
+            ("decode", _decode_stage,
+             (profiling_settings, self.video_path, raw_descriptor, raw_free_queue, decoded_queue, self._stop_event)),
+            ("preprocess", _preprocess_stage,
+             (profiling_settings, self.chart_geometry, raw_descriptor, processed_descriptor, raw_free_queue,
+              processed_free_queue, decoded_queue, preprocessed_queue, self._stop_event)),
+            ("track", _track_stage,
+             (profiling_settings, processed_descriptor, preprocessed_queue, tracked_queue, self._stop_event)),
+            ("render", _render_stage,
+             (profiling_settings, processed_descriptor, processed_free_queue, tracked_queue, self._stop_event,
+              self._stats_queue)),
+        ]
+        for stage_name, stage_function, stage_args in stage_definitions:
+            process = context.Process(target=stage_function, args=stage_args,
+                                      name=f"pipeline-{stage_name}", daemon=True)
+            process.start()
+            self._processes.append(process)
+        print(f"Pipeline démarré: {len(self._processes)} processus, {self.slot_count} emplacements par étape")
+
+        # Le rendu est la dernière étape: sa fin marque la fin du pipeline
+        self._processes[-1].join()
+        self.stop()
+
+        try:
+            stats = self._stats_queue.get(timeout=1.0)
+        except queue.Empty:
+            stats = {'rendered_frames': 0, 'elapsed_time': 0.0}
+        elapsed_time = stats['elapsed_time']
+        stats['fps'] = stats['rendered_frames'] / elapsed_time if elapsed_time > 0 else 0.0
+        print(f"Pipeline terminé: {stats['rendered_frames']} frames, {stats['fps']:.1f} FPS")
+        return stats
+
+    def stop(self, timeout=5.0):
+        """
+        Demande l'arrêt des étapes, attend leur fin et libère la mémoire partagée.
+
+        Args:
+            timeout (float): Délai d'attente par processus avant de le forcer
+        """
+        self._stop_event.set()
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._raw_pool is not None:
+            self._raw_pool.close(unlink=True)
+            self._processed_pool.close(unlink=True)
+            self._raw_pool = None
+            self._processed_pool = None
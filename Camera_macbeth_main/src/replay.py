@@ -0,0 +1,218 @@
+"""
+Module de relecture sans affichage d'une vidéo enregistrée.
+
+Ce mode sert à recalculer les passages d'une course après coup: la vidéo
+est lue aussi vite que possible, sans fenêtre ni dessin des superpositions,
+et seuls les enregistrements de passage sont écrits (CSV ou SQLite).
+
+L'heure enregistrée pour chaque passage est celle de la vidéo (heure de
+début + position de la frame), et non l'heure système de la relecture.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import cv2
+
+from config.detection_config import DETECT_SQUARES
+from config.display_config import line_start, line_end, desired_fps, SHOW_ROI_AND_COLOR
+from config.performance_config import FRAME_PREFETCH_ENABLED, FRAME_PREFETCH_BUFFER_SIZE
+
+from src.video_processor import (
+    load_mask,
+    setup_video_capture,
+    process_frame_to_buffer,
+    initialize_color_masks,
+    get_processing_region
+)
+from src.frame_reader import setup_prefetch_reader
+from src.display_manager import detect_person_color
+from src.tracker import (
+    create_tracker,
+    update_tracker,
+    update_tracker_batch,
+    check_line_crossing,
+    setup_compute_device,
+    get_detection_region
+)
+from src.detection_history import cleanup, init_detection_history, update_detection_value
+from src.macbeth_color_and_rectangle_detector import get_average_colors
+from src.camera_profile import restore_camera_profile
+from src.run_support import (
+    handle_line_crossings,
+    print_motion_gate_stats,
+    print_recalibration_stats,
+    report_first_frame
+)
+from src.startup_metrics import mark_startup_event
+from src.stage_profiler import finish_profiling
+
+# Étapes chronométrées, dans l'ordre d'exécution
+REPLAY_STAGES = ('decode', 'preprocess', 'detection', 'crossings')
+
+def get_video_start_time(video_path, video_capture):
+    """
+    Estime l'heure de début de l'enregistrement.
+
+    L'heure de modification du fichier correspond à la fin de l'enregistrement:
+    la durée de la vidéo en est retranchée.
+
+    Args:
+        video_path (str): Chemin de la vidéo
+        video_capture: Capture vidéo ouverte
+
+    Returns:
+        datetime: Heure de début estimée
+    """
+    video_fps = video_capture.get(cv2.CAP_PROP_FPS) or desired_fps
+    video_duration = video_capture.get(cv2.CAP_PROP_FRAME_COUNT) / video_fps
+    return datetime.fromtimestamp(os.path.getmtime(video_path)) - timedelta(seconds=video_duration)
+
+def format_video_time(video_start_time, frame_index, video_fps):
+    """
+    Formate l'heure d'une frame de la vidéo.
+
+    Args:
+        video_start_time (datetime): Heure de la première frame
+        frame_index (int): Indice de la frame
+        video_fps (float): Images par seconde de la vidéo
+
+    Returns:
+        str: Heure formatée "%Y-%m-%d %H:%M:%S", comme show_frame
+    """
+    return (video_start_time + timedelta(seconds=frame_index / video_fps)).strftime("%Y-%m-%d %H:%M:%S")
+
+def run_replay(video_path, batch_size=1, video_start_time=None):
+    """
+    Relit une vidéo sans affichage et enregistre les passages.
+
+    Args:
+        video_path (str): Chemin de la vidéo enregistrée
+        batch_size (int): Frames par lot d'inférence (1: frame par frame, avec
+            filtre de mouvement et détection espacée si activés)
+        video_start_time (datetime, optional): Heure de la première frame.
+            Par défaut, estimée d'après le fichier (voir get_video_start_time)
+
+    Returns:
+        dict: Statistiques (frames, wall_time, fps, crossings, stage_times)
+    """
+    wall_start = time.perf_counter()
+    stage_times = dict.fromkeys(REPLAY_STAGES, 0.0)
+    frame_index = 0
+    crossing_count = 0
+    tracker_state = None
+    video_capture = None
+
+    try:
+        init_detection_history()
+        initialize_color_masks()
+        load_mask()
+
+        video_capture = setup_video_capture(video_path)
+        video_fps = video_capture.get(cv2.CAP_PROP_FPS) or desired_fps
+        if video_start_time is None:
+            video_start_time = get_video_start_time(video_path, video_capture)
+        print(f"Heure de début de la vidéo: {video_start_time:%Y-%m-%d %H:%M:%S}")
+        if FRAME_PREFETCH_ENABLED:
+            # Relecture: aucune frame ne doit être perdue
+            video_capture = setup_prefetch_reader(video_capture, FRAME_PREFETCH_BUFFER_SIZE, drop_frames=False)
+
+        tracker_state = create_tracker()
+        tracker_state['person_detection_model'] = tracker_state['person_detection_model'].to(setup_compute_device())
+        mark_startup_event('model_loaded')
+
+        frame_buffers = []
+        calibrated = False
+        end_of_video = False
+        while not end_of_video:
+            processed_frames = []
+            while len(processed_frames) < batch_size:
+                stage_start = time.perf_counter()
+                ret, current_frame = video_capture.read()
+                stage_times['decode'] += time.perf_counter() - stage_start
+                if not ret:
+                    end_of_video = True
+                    break
+
+                stage_start = time.perf_counter()
+                if not calibrated:
+                    # Le profil n'est pas réécrit en relecture: la vidéo peut venir d'une autre installation
+                    if not restore_camera_profile(current_frame):
+                        try:
+                            get_average_colors(current_frame, True)
+                        except Exception as e:
+                            print(f"Erreur lors de la détection des couleurs Macbeth: {e}")
+                    calibrated = True
+                processed_frames.append(process_frame_to_buffer(current_frame, DETECT_SQUARES,
+                                                                frame_buffers, len(processed_frames)))
+                stage_times['preprocess'] += time.perf_counter() - stage_start
+
+            if not processed_frames:
+                break
+
+            stage_start = time.perf_counter()
+            detection_region = get_detection_region(get_processing_region(), processed_frames[0].shape)
+            if batch_size > 1:
+                tracked_batch = update_tracker_batch(tracker_state, processed_frames, detection_region)
+            else:
+                tracked_batch = [update_tracker(tracker_state, processed_frames[0], detection_region)]
+
+            for processed_frame, tracked_persons in zip(processed_frames, tracked_batch):
+                crossings_start = time.perf_counter()
+                stage_times['detection'] += crossings_start - stage_start
+
+                persons_to_process = []
+                for tracked_person in tracked_persons:
+                    if tracked_person['value'] is not None:
+                        update_detection_value(tracked_person['id'], tracked_person['value'])
+                    if check_line_crossing(tracked_person, line_start, line_end):
+                        persons_to_process.append(tracked_person['id'])
+
+                # Détection des couleurs, faite par draw_person en mode affiché
+                if SHOW_ROI_AND_COLOR:
+                    for tracked_person in tracked_persons:
+                        detect_person_color(processed_frame, tracked_person)
+
+                handle_line_crossings(tracker_state, persons_to_process,
+                                      format_video_time(video_start_time, frame_index, video_fps))
+                crossing_count += len(persons_to_process)
+                frame_index += 1
+                report_first_frame()
+
+                stage_start = time.perf_counter()
+                stage_times['crossings'] += stage_start - crossings_start
+
+    except KeyboardInterrupt:
+        print("\nRelecture interrompue")
+
+    finally:
+        cleanup()
+        if video_capture is not None:
+            video_capture.release()
+        if tracker_state is not None and tracker_state.get('motion_gate') is not None:
+            print_motion_gate_stats(tracker_state['motion_gate'])
+        print_recalibration_stats()
+        finish_profiling()
+
+    wall_time = time.perf_counter() - wall_start
+    return {
+        'frames': frame_index,
+        'wall_time': wall_time,
+        'fps': frame_index / wall_time if wall_time > 0 else 0.0,
+        'crossings': crossing_count,
+        'stage_times': stage_times
+    }
+
+def print_replay_stats(replay_stats):
+    """
+    Affiche le bilan de la relecture.
+
+    Args:
+        replay_stats (dict): Statistiques retournées par run_replay
+    """
+    frame_total = max(replay_stats['frames'], 1)
+    print(f"Relecture terminée: {replay_stats['frames']} frames en {replay_stats['wall_time']:.1f} s "
+          f"({replay_stats['fps']:.1f} frames/s), {replay_stats['crossings']} passage(s)")
+    for stage_name, stage_time in replay_stats['stage_times'].items():
+        print(f"  {stage_name:<12} {stage_time:8.2f} s  {stage_time * 1000 / frame_total:7.2f} ms/frame")
@@ -0,0 +1,112 @@
+"""
+Module des fonctions communes aux modes d'exécution.
+
+Le mode interactif (Application), le traitement en différé (replay) et les
+étapes du pipeline multi-processus partagent:
+- l'enregistrement des passages de ligne
+- l'affichage des compteurs en fin de traitement (filtre de mouvement,
+  recalibrations, suivi de la charte, écritures en arrière-plan)
+- le rapport de démarrage à la première frame
+
+Ce module n'importe ni l'affichage ni la classe Application.
+"""
+
+from src.background_writer import flush_background_writes, get_background_writer_stats, EXIT_FLUSH_TIMEOUT
+from src.macbeth_nonlinear_color_correction import attendre_recalibration, get_recalibration_stats
+from src.motion_gate import get_motion_gate_stats
+from src.stage_profiler import profile_stage
+from src.startup_metrics import mark_startup_event, print_startup_report, startup_events
+from src.tracker import mark_person_as_crossed
+from src.detection_history import update_detection_value, get_dominant_detection, record_crossing
+from src.macbeth_color_and_rectangle_detector import get_chart_tracking_stats
+
+def handle_line_crossings(tracker_state, person_ids, formatted_time):
+    """
+    Enregistre les passages des personnes ayant traversé la ligne.
+    
+    Args:
+        tracker_state (dict): État du tracker (voir create_tracker)
+        person_ids (list): IDs internes des personnes ayant traversé dans cette frame
+        formatted_time (str): Heure formatée utilisée pour l'enregistrement
+    
+    Notes:
+        - Met à jour le compteur de la valeur dominante
+        - Retire les personnes du suivi actif
+    """
+    for person_id in person_ids:
+        if person_id in tracker_state['active_tracked_persons']:
+            print(f"!!! Ligne traversée par ID={person_id} !!!")
+            
+            detected_value = get_dominant_detection(person_id)
+            update_detection_value(person_id, detected_value)
+            
+            # Utilisation de l'heure formatée pour l'enregistrement
+            with profile_stage('record_crossing'):
+                record_crossing(person_id, formatted_time)
+            
+            dominant_value = get_dominant_detection(person_id)
+            if dominant_value:
+                tracker_state['line_crossing_counter'][dominant_value] += 1
+            mark_person_as_crossed(tracker_state, person_id)
+
+def print_motion_gate_stats(gate_state):
+    """
+    Affiche les compteurs du filtre de mouvement.
+    
+    Args:
+        gate_state (dict): État du filtre (voir create_motion_gate)
+    """
+    gate_stats = get_motion_gate_stats(gate_state)
+    print(f"Filtre de mouvement: {gate_stats['skipped_frames']}/{gate_stats['processed_frames']} "
+          f"frames sautées ({gate_stats['skip_rate']:.1%}), "
+          f"{gate_stats['forced_frames']} détections forcées")
+
+def print_recalibration_stats():
+    """
+    Attend la recalibration en cours et les écritures en arrière-plan, puis
+    affiche le nombre et la durée des recalibrations, du suivi de la charte et
+    des écritures.
+    """
+    attendre_recalibration()
+    recalibration_stats = get_recalibration_stats()
+    if recalibration_stats['count']:
+        print(f"Recalibrations des couleurs: {recalibration_stats['count']} "
+              f"(dont {recalibration_stats['async_count']} en arrière-plan, "
+              f"{recalibration_stats['smoothed_frames']} frames de transition), "
+              f"moyenne {recalibration_stats['mean_time'] * 1000:.0f} ms, "
+              f"max {recalibration_stats['max_time'] * 1000:.0f} ms, "
+              f"{recalibration_stats['skipped']} sautée(s), {recalibration_stats['failed']} échec(s)")
+    cache_stats = recalibration_stats['cache']
+    if cache_stats['hits'] + cache_stats['misses']:
+        print(f"Cache des corrections: {cache_stats['hits']} réutilisations, {cache_stats['misses']} ajustements "
+              f"({cache_stats['hit_rate']:.0%}), {cache_stats['size']}/{cache_stats['capacity']} états, "
+              f"{cache_stats['evictions']} évincé(s)")
+    drift_stats = recalibration_stats['drift']
+    if drift_stats is not None:
+        print(f"Dérive des couleurs: {drift_stats['checks']} mesures, "
+              f"{drift_stats['drift_triggers']} recalibrations sur dérive, "
+              f"{drift_stats['forced_triggers']} forcées, {drift_stats['interval_triggers']} à intervalle fixe, "
+              f"{drift_stats['rate_limited']} limitées, dernier ΔE {drift_stats['last_delta_e']:.1f}")
+    tracking_stats = get_chart_tracking_stats()
+    if tracking_stats['tracked_frames'] + tracking_stats['rejected_frames'] + tracking_stats['forced_detections']:
+        print(f"Suivi de la charte: {tracking_stats['tracked_frames']} frames suivies "
+              f"(dont {tracking_stats['static_frames']} immobiles), {tracking_stats['rejected_frames']} rejetées, "
+              f"{tracking_stats['forced_detections']} détections forcées")
+    flush_background_writes(EXIT_FLUSH_TIMEOUT)
+    writer_stats = get_background_writer_stats()
+    if writer_stats['written'] + writer_stats['failed']:
+        print(f"Écritures en arrière-plan: {writer_stats['written']} "
+              f"({writer_stats['coalesced']} remplacées avant écriture), "
+              f"moyenne {writer_stats['mean_time'] * 1000:.1f} ms, max {writer_stats['max_time'] * 1000:.1f} ms, "
+              f"{writer_stats['failed']} échec(s), {writer_stats['pending']} en attente")
+
+def report_first_frame():
+    """
+    Marque la première frame traitée et affiche le détail du démarrage.
+    
+    Notes:
+        - Sans effet après la première frame
+    """
+    if 'first_frame' not in startup_events:
+        mark_startup_event('first_frame')
+        print_startup_report()
@@ -0,0 +1,240 @@
+"""
+Module de chronométrage des étapes du traitement.
+
+Chaque étape instrumentée est encadrée par profile_stage:
+
+    with profile_stage('yolo_track'):
+        ...
+
+Les durées sont accumulées dans un histogramme logarithmique par étape
+(résolution d'environ 9%), ce qui donne les percentiles p50/p95/p99 en
+mémoire constante quelle que soit la durée de la course. Les intervalles
+peuvent aussi être conservés pour un export au format Chrome trace
+(chrome://tracing ou https://ui.perfetto.dev).
+
+Désactivé, profile_stage retourne un contexte vide partagé: le coût se
+limite à un appel de fonction et à un test de variable globale.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+
+from config.performance_config import (
+    PROFILING_ENABLED,
+    PROFILING_TRACE_PATH,
+    PROFILING_TRACE_MAX_EVENTS
+)
+
+# Histogramme: BUCKETS_PER_OCTAVE intervalles par doublement de durée, à partir de 1 µs
+BUCKETS_PER_OCTAVE = 8
+BUCKET_COUNT = BUCKETS_PER_OCTAVE * 32  # Jusqu'à ~70 minutes
+
+# Variables globales
+profiling_enabled = PROFILING_ENABLED
+trace_path = PROFILING_TRACE_PATH
+stage_histograms = {}
+trace_events = []
+profiling_lock = threading.Lock()
+
+class _NullStage:
+    """Contexte vide utilisé quand le chronométrage est désactivé."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class _StageTimer:
+    """Contexte chronométrant une étape et enregistrant sa durée."""
+
+    __slots__ = ('stage_name', 'start_time')
+
+    def __init__(self, stage_name):
+        self.stage_name = stage_name
+        self.start_time = 0
+
+    def __enter__(self):
+        self.start_time = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record_stage_duration(self.stage_name, self.start_time, time.perf_counter_ns())
+        return False
+
+def profile_stage(stage_name):
+    """
+    Retourne un contexte chronométrant une étape.
+
+    Args:
+        stage_name (str): Nom de l'étape
+
+    Returns:
+        Contexte à utiliser avec "with", sans effet si le chronométrage est désactivé
+    """
+    if not profiling_enabled:
+        return _NULL_STAGE
+    return _StageTimer(stage_name)
+
+def enable_profiling(chrome_trace_path=None):
+    """
+    Active le chronométrage et réinitialise les mesures.
+
+    Args:
+        chrome_trace_path (str, optional): Fichier Chrome trace écrit par finish_profiling
+    """
+    global profiling_enabled, trace_path
+    with profiling_lock:
+        stage_histograms.clear()
+        trace_events.clear()
+    trace_path = chrome_trace_path
+    profiling_enabled = True
+
+def get_profiling_settings():
+    """
+    Retourne l'état du chronométrage, à transmettre aux processus du pipeline.
+
+    Returns:
+        tuple: (chronométrage activé, fichier Chrome trace ou None)
+    """
+    return profiling_enabled, trace_path
+
+def create_stage_histogram():
+    """
+    Crée l'histogramme d'une étape.
+
+    Returns:
+        dict: count, total_ns, min_ns, max_ns et buckets (comptes par intervalle)
+    """
+    return {'count': 0, 'total_ns': 0, 'min_ns': None, 'max_ns': 0, 'buckets': [0] * BUCKET_COUNT}
+
+def get_bucket_index(duration_ns):
+    """Indice de l'intervalle logarithmique d'une durée."""
+    if duration_ns < 1000:
+        return 0
+    return min(int(math.log2(duration_ns / 1000) * BUCKETS_PER_OCTAVE), BUCKET_COUNT - 1)
+
+def record_stage_duration(stage_name, start_ns, end_ns):
+    """
+    Enregistre la durée d'une étape.
+
+    Args:
+        stage_name (str): Nom de l'étape
+        start_ns (int): Début (time.perf_counter_ns)
+        end_ns (int): Fin (time.perf_counter_ns)
+    """
+    duration_ns = end_ns - start_ns
+    with profiling_lock:
+        stage_histogram = stage_histograms.get(stage_name)
+        if stage_histogram is None:
+            stage_histogram = stage_histograms[stage_name] = create_stage_histogram()
+        stage_histogram['count'] += 1
+        stage_histogram['total_ns'] += duration_ns
+        if stage_histogram['min_ns'] is None or duration_ns < stage_histogram['min_ns']:
+            stage_histogram['min_ns'] = duration_ns
+        stage_histogram['max_ns'] = max(stage_histogram['max_ns'], duration_ns)
+        stage_histogram['buckets'][get_bucket_index(duration_ns)] += 1
+
+        if trace_path and len(trace_events) < PROFILING_TRACE_MAX_EVENTS:
+            trace_events.append((stage_name, start_ns, duration_ns, threading.get_ident()))
+
+def get_percentile_ms(stage_histogram, percentile):
+    """
+    Estime un percentile d'après l'histogramme.
+
+    Args:
+        stage_histogram (dict): Histogramme (voir create_stage_histogram)
+        percentile (float): Percentile [0-100]
+
+    Returns:
+        float: Durée en millisecondes (centre géométrique de l'intervalle), bornée par min et max
+    """
+    target_count = stage_histogram['count'] * percentile / 100
+    cumulative_count = 0
+    for bucket_index, bucket_count in enumerate(stage_histogram['buckets']):
+        cumulative_count += bucket_count
+        if bucket_count and cumulative_count >= target_count:
+            bucket_center_ns = 1000 * 2 ** ((bucket_index + 0.5) / BUCKETS_PER_OCTAVE)
+            bucket_center_ns = min(max(bucket_center_ns, stage_histogram['min_ns']), stage_histogram['max_ns'])
+            return bucket_center_ns / 1e6
+    return stage_histogram['max_ns'] / 1e6
+
+def get_profile_stats():
+    """
+    Retourne les statistiques de chaque étape.
+
+    Returns:
+        dict: {étape: {count, total_ms, mean_ms, p50_ms, p95_ms, p99_ms, max_ms}}
+    """
+    with profiling_lock:
+        histograms = {stage_name: dict(stage_histogram, buckets=list(stage_histogram['buckets']))
+                      for stage_name, stage_histogram in stage_histograms.items()}
+    profile_stats = {}
+    for stage_name, stage_histogram in histograms.items():
+        profile_stats[stage_name] = {
+            'count': stage_histogram['count'],
+            'total_ms': stage_histogram['total_ns'] / 1e6,
+            'mean_ms': stage_histogram['total_ns'] / 1e6 / stage_histogram['count'],
+            'p50_ms': get_percentile_ms(stage_histogram, 50),
+            'p95_ms': get_percentile_ms(stage_histogram, 95),
+            'p99_ms': get_percentile_ms(stage_histogram, 99),
+            'max_ms': stage_histogram['max_ns'] / 1e6
+        }
+    return profile_stats
+
+def print_profile_report():
+    """Affiche le tableau des durées par étape, triées par temps total."""
+    profile_stats = get_profile_stats()
+    if not profile_stats:
+        return
+    print(f"{'Étape':<22}{'appels':>8}{'total s':>10}{'moy ms':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}")
+    for stage_name, stage_stats in sorted(profile_stats.items(), key=lambda item: -item[1]['total_ms']):
+        print(f"{stage_name:<22}{stage_stats['count']:>8}{stage_stats['total_ms'] / 1000:>10.2f}"
+              f"{stage_stats['mean_ms']:>9.2f}{stage_stats['p50_ms']:>8.2f}{stage_stats['p95_ms']:>8.2f}"
+              f"{stage_stats['p99_ms']:>8.2f}{stage_stats['max_ms']:>9.2f}")
+
+def export_chrome_trace(output_path):
+    """
+    Écrit les intervalles enregistrés au format Chrome trace (JSON).
+
+    Args:
+        output_path (str): Fichier de sortie
+
+    Returns:
+        int: Nombre d'intervalles écrits
+    """
+    with profiling_lock:
+        recorded_events = list(trace_events)
+    process_id = os.getpid()
+    chrome_events = [{'name': stage_name, 'ph': 'X', 'ts': start_ns / 1000, 'dur': duration_ns / 1000,
+                      'pid': process_id, 'tid': thread_id}
+                     for stage_name, start_ns, duration_ns, thread_id in recorded_events]
+    with open(output_path, 'w') as f:
+        json.dump({'traceEvents': chrome_events, 'displayTimeUnit': 'ms'}, f)
+    return len(chrome_events)
+
+def finish_profiling(label=None):
+    """
+    Affiche le rapport et exporte la trace si elle est demandée.
+
+    Args:
+        label (str, optional): Suffixe du fichier de trace (une trace par processus du pipeline)
+    """
+    if not profiling_enabled:
+        return
+    print_profile_report()
+    if trace_path:
+        output_path = trace_path
+        if label:
+            base_path, extension = os.path.splitext(trace_path)
+            output_path = f"{base_path}.{label}{extension}"
+        try:
+            event_count = export_chrome_trace(output_path)
+            print(f"Trace Chrome écrite: {output_path} ({event_count} intervalles)")
+        except OSError as e:
+            print(f"Erreur lors de l'écriture de la trace: {e}")
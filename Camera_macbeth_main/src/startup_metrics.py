@@ -0,0 +1,64 @@
+"""
+Module de mesure du temps de démarrage.
+
+Le temps de référence est pris à l'import de ce module, importé en premier
+par __main__.py avant les modules lourds (torch, ultralytics, numba).
+
+Deux types de mesures sont enregistrés:
+- les étapes (startup_step), avec leur début, leur durée et leur thread,
+  ce qui montre le recouvrement des étapes exécutées en parallèle
+- les jalons (mark_startup_event), dont le dernier, 'first_frame', donne
+  le délai jusqu'à la première frame traitée
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Variables globales
+startup_time = time.perf_counter()
+startup_events = {}
+startup_steps = {}
+
+def mark_startup_event(event_name):
+    """
+    Enregistre le délai écoulé depuis le démarrage pour un jalon.
+
+    Args:
+        event_name (str): Nom du jalon (seule la première occurrence est conservée)
+
+    Returns:
+        float: Délai en secondes depuis le démarrage
+    """
+    if event_name not in startup_events:
+        startup_events[event_name] = time.perf_counter() - startup_time
+    return startup_events[event_name]
+
+@contextmanager
+def startup_step(step_name):
+    """
+    Chronomètre une étape du démarrage.
+
+    Args:
+        step_name (str): Nom de l'étape
+
+    Notes:
+        - La durée est enregistrée même si l'étape lève une exception
+    """
+    step_start = time.perf_counter() - startup_time
+    try:
+        yield
+    finally:
+        startup_steps[step_name] = (step_start, time.perf_counter() - startup_time,
+                                    threading.current_thread().name)
+
+def print_startup_report():
+    """Affiche les étapes (début, durée, thread) et les jalons du démarrage, dans l'ordre chronologique."""
+    report_lines = [(step_end, f"  {step_name:<22} {step_start:6.2f} -> {step_end:6.2f} s  "
+                               f"({step_end - step_start:5.2f} s, {thread_name})")
+                    for step_name, (step_start, step_end, thread_name) in startup_steps.items()]
+    report_lines += [(elapsed, f"  {event_name:<22} {elapsed:6.2f} s")
+                     for event_name, elapsed in startup_events.items()]
+    print("Démarrage:")
+    for _, report_line in sorted(report_lines, key=lambda line: line[0]):
+        print(report_line)
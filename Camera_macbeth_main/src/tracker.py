@@ -3,13 +3,32 @@ from collections import defaultdict
 from config.detection_config import (
     MAX_DISAPPEAR_FRAMES,
     MIN_CONFIDENCE,
-    IOU_THRESHOLD
+    IOU_THRESHOLD,
+    LINE_BAND_ENABLED,
+    LINE_BAND_MARGIN_ABOVE,
+    LINE_BAND_MARGIN_BELOW,
+    LINE_BAND_MARGIN_SIDE,
+    LINE_BAND_IMGSZ
+)
+from config.display_config import line_start, line_end
+from config.performance_config import (
+    MOTION_GATE_ENABLED,
+    DETECTION_INTERVAL_ENABLED,
+    DETECTION_INTERVAL_MAX,
+    DETECTION_NEAR_LINE_DISTANCE
 )
 from config.paths_config import MODEL_PATH, BYTETRACK_PATH, BOTSORT_PATH
 
-from ultralytics import YOLO
+from src.motion_gate import create_motion_gate, should_run_detection
+from src.stage_profiler import profile_stage
+from src.kalman_predictor import (
+    create_kalman_filter,
+    predict_kalman,
+    correct_kalman,
+    get_bottom_center_velocity
+)
 
-def create_tracked_person(person_bbox_coords, person_id, person_confidence):
+def create_tracked_person(person_bbox_coords, person_id, person_confidence, use_kalman=True):
     """
     Crée un dictionnaire représentant une personne suivie.
     
@@ -17,6 +36,7 @@ def create_tracked_person(person_bbox_coords, person_id, person_confidence):
         person_bbox_coords (np.ndarray): Coordonnées de la boîte englobante [x1, y1, x2, y2]
         person_id (int): Identifiant unique de la personne
         person_confidence (float): Score de confiance de la détection [0-1]
+        use_kalman (bool): Si False, aucun filtre de Kalman n'est créé (détection à chaque frame)
     
     Returns:
         dict: Dictionnaire contenant:
@@ -27,6 +47,8 @@ def create_tracked_person(person_bbox_coords, person_id, person_confidence):
             - frames_disappeared (int): Nombre de frames depuis la dernière détection
             - movement_trajectory (list): Liste des positions [(x,y), ...]
             - has_crossed_line (bool): Indique si la personne a franchi la ligne
+            - kalman (dict or None): Filtre de Kalman de la boîte (voir create_kalman_filter),
+              None sans détection espacée
     """
     return {
         'bbox': person_bbox_coords,
@@ -35,7 +57,8 @@ def create_tracked_person(person_bbox_coords, person_id, person_confidence):
         'value': None,
         'frames_disappeared': 0,
         'movement_trajectory': [],
-        'has_crossed_line': False
+        'has_crossed_line': False,
+        'kalman': create_kalman_filter(person_bbox_coords) if use_kalman else None
     }
 
 def get_bbox_bottom_center(person_bbox_coords):
@@ -117,6 +140,143 @@ def check_line_crossing(person_data, counting_line_start, counting_line_end):
         return True
     return False
 
+def get_distance_to_line(point, counting_line_start, counting_line_end):
+    """
+    Calcule la distance d'un point au segment de la ligne de comptage.
+    
+    Args:
+        point (tuple): Point (x, y)
+        counting_line_start (tuple): Point de départ (x, y)
+        counting_line_end (tuple): Point d'arrivée (x, y)
+    
+    Returns:
+        float: Distance euclidienne en pixels
+    """
+    point = np.asarray(point, dtype=np.float64)
+    line_start = np.asarray(counting_line_start, dtype=np.float64)
+    line_vector = np.asarray(counting_line_end, dtype=np.float64) - line_start
+    line_length_sq = float(np.dot(line_vector, line_vector))
+    projection = 0.0 if line_length_sq == 0 else np.clip(np.dot(point - line_start, line_vector) / line_length_sq, 0.0, 1.0)
+    return float(np.linalg.norm(point - (line_start + projection * line_vector)))
+
+def get_line_band_region(counting_line_start, counting_line_end, frame_shape,
+                         margin_above=LINE_BAND_MARGIN_ABOVE,
+                         margin_below=LINE_BAND_MARGIN_BELOW,
+                         margin_side=LINE_BAND_MARGIN_SIDE):
+    """
+    Calcule la bande de détection autour de la ligne de comptage.
+    
+    Seules les personnes proches de la ligne peuvent la franchir: la bande
+    couvre la boîte englobante de la ligne, étendue vers le haut pour contenir
+    le corps entier d'une personne dont les pieds sont sur la ligne.
+    
+    Args:
+        counting_line_start (tuple): Point de départ (x, y)
+        counting_line_end (tuple): Point d'arrivée (x, y)
+        frame_shape (tuple): Dimensions (h, w, ...) de la frame
+        margin_above (int): Marge au-dessus de la ligne
+        margin_below (int): Marge en dessous de la ligne
+        margin_side (int): Marge à gauche et à droite de la ligne
+    
+    Returns:
+        tuple: Région (x1, y1, x2, y2) limitée à la frame
+    """
+    frame_height, frame_width = frame_shape[:2]
+    line_x = (counting_line_start[0], counting_line_end[0])
+    line_y = (counting_line_start[1], counting_line_end[1])
+    return (max(int(min(line_x)) - margin_side, 0),
+            max(int(min(line_y)) - margin_above, 0),
+            min(int(max(line_x)) + margin_side, frame_width),
+            min(int(max(line_y)) + margin_below, frame_height))
+
+def intersect_regions(first_region, second_region):
+    """
+    Calcule l'intersection de deux régions (x1, y1, x2, y2).
+    
+    Returns:
+        tuple: Région commune, réduite à la première région si elles sont disjointes
+    """
+    intersection = (max(first_region[0], second_region[0]),
+                    max(first_region[1], second_region[1]),
+                    min(first_region[2], second_region[2]),
+                    min(first_region[3], second_region[3]))
+    if intersection[0] >= intersection[2] or intersection[1] >= intersection[3]:
+        return first_region
+    return intersection
+
+def get_detection_region(processing_region, frame_shape):
+    """
+    Détermine la région envoyée au détecteur de personnes.
+    
+    Args:
+        processing_region (tuple or None): Région active du masque (voir get_processing_region)
+        frame_shape (tuple): Dimensions de la frame traitée
+    
+    Returns:
+        tuple or None: Région (x1, y1, x2, y2), None pour la frame complète
+    """
+    if not LINE_BAND_ENABLED:
+        return processing_region
+    line_band_region = get_line_band_region(line_start, line_end, frame_shape)
+    if processing_region is None:
+        return line_band_region
+    return intersect_regions(processing_region, line_band_region)
+
+def setup_compute_device():
+    """
+    Configure le dispositif de calcul (GPU/CPU) pour le traitement.
+    
+    Returns:
+        torch.device: Dispositif à utiliser pour les calculs
+    """
+    import torch
+    
+    try:
+        if not torch.cuda.is_available():
+            print("CUDA n'est pas disponible")
+            print(f"Version PyTorch: {torch.__version__}")
+            return torch.device("cpu")
+        
+        # Vérification plus détaillée du GPU
+        gpu_count = torch.cuda.device_count()
+        if gpu_count == 0:
+            print("Aucun GPU détecté")
+            return torch.device("cpu")
+            
+        # Sélection du premier GPU disponible
+        compute_device = torch.device("cuda:0")
+        print(f"GPU détectée: {torch.cuda.get_device_name(0)}")
+        print(f"Nombre de GPUs: {gpu_count}")
+        print(f"Version CUDA: {torch.cuda.get_device_capability(0)}")
+        
+        # Test rapide pour vérifier que le GPU fonctionne
+        test_tensor = torch.tensor([1.0], device=compute_device)
+        if test_tensor.device.type == "cuda":
+            print("Test GPU réussi")
+        
+        return compute_device
+        
+    except Exception as e:
+        print(f"Erreur lors de la configuration du GPU: {str(e)}")
+        return torch.device("cpu")
+
+def load_detection_model(model_path):
+    """
+    Charge le modèle YOLO de détection des personnes.
+    
+    Args:
+        model_path (str): Chemin des poids du modèle
+    
+    Returns:
+        YOLO: Modèle chargé
+    
+    Notes:
+        - ultralytics (et torch) ne sont importés qu'ici, pour ne pas
+          ralentir le démarrage des modes qui n'utilisent pas le détecteur
+    """
+    from ultralytics import YOLO
+    return YOLO(model_path)
+
 def create_tracker():
     """
     Crée un dictionnaire contenant l'état initial du tracker.
@@ -129,45 +289,261 @@ def create_tracker():
             - person_detection_model (YOLO): Modèle de détection chargé
             - persons_crossed_line (set): IDs des personnes ayant déjà traversé
             - bytetrack_to_internal_ids (dict): Mapping entre IDs ByteTrack et internes
+            - detection_imgsz (int or None): Taille d'entrée du détecteur (bande de ligne)
+            - motion_gate (dict or None): État du filtre de mouvement (voir create_motion_gate)
+            - detection_interval_max (int): Frames maximales entre deux détections (1: chaque frame)
+            - frames_until_detection (int): Frames prédites restantes avant la prochaine détection
     """
     return {
         'next_person_id': 1,
         'active_tracked_persons': {},
         'line_crossing_counter': defaultdict(int),
-        'person_detection_model': YOLO(MODEL_PATH),
+        'person_detection_model': load_detection_model(MODEL_PATH),
         'persons_crossed_line': set(),
-        'bytetrack_to_internal_ids': {}
+        'bytetrack_to_internal_ids': {},
+        'detection_imgsz': LINE_BAND_IMGSZ if LINE_BAND_ENABLED else None,
+        'motion_gate': create_motion_gate() if MOTION_GATE_ENABLED else None,
+        'detection_interval_max': DETECTION_INTERVAL_MAX if DETECTION_INTERVAL_ENABLED else 1,
+        'frames_until_detection': 0
     }
 
-def update_tracker(tracker_state, frame_raw):
+def age_tracked_persons(tracker_state, detected_person_ids=()):
+    """
+    Vieillit les personnes non détectées dans la frame courante.
+    
+    Args:
+        tracker_state (dict): État du tracker (voir create_tracker)
+        detected_person_ids (set): IDs internes détectés dans la frame
+    
+    Returns:
+        list: Liste des personnes actuellement suivies
+    
+    Notes:
+        - Incrémente frames_disappeared des personnes absentes
+        - Supprime celles absentes depuis plus de MAX_DISAPPEAR_FRAMES frames
+    """
+    disappeared_ids = [pid for pid in tracker_state['active_tracked_persons'] if pid not in detected_person_ids]
+    
+    for disappeared_id in disappeared_ids:
+        tracker_state['active_tracked_persons'][disappeared_id]['frames_disappeared'] += 1
+        if tracker_state['active_tracked_persons'][disappeared_id]['frames_disappeared'] > MAX_DISAPPEAR_FRAMES:
+            del tracker_state['active_tracked_persons'][disappeared_id]
+    
+    return list(tracker_state['active_tracked_persons'].values())
+
+def predict_tracked_persons(tracker_state):
+    """
+    Avance les personnes suivies d'une frame sans lancer le détecteur.
+    
+    Args:
+        tracker_state (dict): État du tracker (voir create_tracker)
+    
+    Returns:
+        list: Liste des personnes actuellement suivies
+    
+    Notes:
+        - Seules les personnes détectées lors de la dernière détection sont avancées
+          par leur filtre de Kalman; les autres restent figées pour ne pas
+          extrapoler une trajectoire perdue jusqu'à la ligne
+        - La position prédite est ajoutée à la trajectoire, ce qui permet à
+          check_line_crossing de fonctionner à chaque frame
+    """
+    for tracked_person in tracker_state['active_tracked_persons'].values():
+        if tracked_person['frames_disappeared'] == 0:
+            update_person_position(tracked_person, predict_kalman(tracked_person['kalman']))
+    return list(tracker_state['active_tracked_persons'].values())
+
+def compute_detection_interval(tracker_state, counting_line_start, counting_line_end):
+    """
+    Détermine le nombre de frames jusqu'à la prochaine détection.
+    
+    L'intervalle est le nombre de frames estimé avant qu'une personne n'entre
+    dans la zone proche de la ligne (DETECTION_NEAR_LINE_DISTANCE), à sa vitesse
+    actuelle, borné par detection_interval_max.
+    
+    Args:
+        tracker_state (dict): État du tracker (voir create_tracker)
+        counting_line_start (tuple): Point de départ (x, y)
+        counting_line_end (tuple): Point d'arrivée (x, y)
+    
+    Returns:
+        int: Intervalle en frames (1: détection à chaque frame)
+    """
+    frames_to_line = tracker_state['detection_interval_max']
+    for tracked_person in tracker_state['active_tracked_persons'].values():
+        if len(tracked_person['movement_trajectory']) < 2:
+            return 1  # Vitesse encore inconnue
+        bottom_center = get_bbox_bottom_center(tracked_person['bbox'])
+        remaining_distance = (get_distance_to_line(bottom_center, counting_line_start, counting_line_end)
+                              - DETECTION_NEAR_LINE_DISTANCE)
+        if remaining_distance <= 0:
+            return 1
+        speed = max(float(np.linalg.norm(get_bottom_center_velocity(tracked_person['kalman']))), 1.0)
+        frames_to_line = min(frames_to_line, remaining_distance / speed)
+    return max(1, int(frames_to_line))
+
+def update_tracker(tracker_state, frame_raw, detection_region=None):
     """
     Met à jour l'état du tracker avec une nouvelle frame.
     
     Args:
         tracker_state (dict): État actuel (voir create_tracker)
         frame_raw (np.ndarray): Image BGR à analyser
+        detection_region (tuple, optional): Région (x1, y1, x2, y2) à analyser.
+            Seule cette région est envoyée au détecteur; les boîtes détectées
+            sont ramenées en coordonnées de la frame complète.
+    
+    Returns:
+        list: Liste des personnes actuellement suivies
+    
+    Notes:
+        - En mode détection espacée, les frames entre deux détections sont
+          prédites par filtre de Kalman (voir predict_tracked_persons)
+        - Avec le filtre de mouvement, l'inférence est sautée quand rien ne bouge
+          dans la région: les personnes suivies sont seulement vieillies
+    """
+    if tracker_state['frames_until_detection'] > 0:
+        tracker_state['frames_until_detection'] -= 1
+        with profile_stage('tracker_bookkeeping'):
+            return predict_tracked_persons(tracker_state)
+    
+    if tracker_state.get('motion_gate') is not None:
+        with profile_stage('motion_gate'):
+            run_detection = should_run_detection(tracker_state['motion_gate'], frame_raw, detection_region)
+        if not run_detection:
+            with profile_stage('tracker_bookkeeping'):
+                return age_tracked_persons(tracker_state)
+    
+    frame_raw, region_offset = crop_detection_region(frame_raw, detection_region)
+    detection_results = run_person_detection(tracker_state, frame_raw)
+    detection_result = detection_results[0] if detection_results else None
+    with profile_stage('tracker_bookkeeping'):
+        return apply_detection_result(tracker_state, detection_result, region_offset)
+
+def warmup_detection_model(tracker_state, frame_shape, detection_region=None):
+    """
+    Lance une inférence sur une frame noire pour que la première frame réelle
+    ne soit pas ralentie par l'initialisation du modèle.
+    
+    Les options sont celles de run_person_detection, afin que le prédicteur
+    créé ici soit réutilisé tel quel. Les trackers BoT-SORT sont ensuite
+    réinitialisés.
+    
+    Args:
+        tracker_state (dict): État du tracker (voir create_tracker)
+        frame_shape (tuple): Dimensions (h, w, 3) des frames traitées
+        detection_region (tuple, optional): Région (x1, y1, x2, y2) envoyée au détecteur
+    """
+    warmup_frame, _ = crop_detection_region(np.zeros(frame_shape, dtype=np.uint8), detection_region)
+    run_person_detection(tracker_state, warmup_frame)
+    
+    predictor = tracker_state['person_detection_model'].predictor
+    for person_tracker in getattr(predictor, 'trackers', []):
+        person_tracker.reset()
+
+def update_tracker_batch(tracker_state, frames, detection_region=None):
+    """
+    Met à jour l'état du tracker avec un lot de frames consécutives.
+    
+    Les frames du lot passent dans le détecteur en une seule inférence;
+    l'association BoT-SORT est faite frame par frame dans l'ordre. Les
+    résultats sont ensuite appliqués à l'état du tracker un par un, à chaque
+    itération du générateur: l'appelant peut donc vérifier et enregistrer les
+    franchissements d'une frame (mark_person_as_crossed) avant que la suivante
+    ne soit appliquée, comme en mode frame par frame.
+    
+    Args:
+        tracker_state (dict): État actuel (voir create_tracker)
+        frames (list): Images BGR consécutives de mêmes dimensions; elles ne
+            doivent pas être modifiées avant la fin de l'itération
+        detection_region (tuple, optional): Région (x1, y1, x2, y2) à analyser
+    
+    Yields:
+        list: Liste des personnes suivies après chaque frame du lot
+    
+    Notes:
+        - Mode hors ligne: le filtre de mouvement et la détection espacée ne
+          s'appliquent pas, toutes les frames passent dans le détecteur
+    """
+    cropped_frames = []
+    region_offset = None
+    for frame_raw in frames:
+        cropped_frame, region_offset = crop_detection_region(frame_raw, detection_region)
+        cropped_frames.append(cropped_frame)
+    if not cropped_frames:
+        return
+    
+    detection_results = run_person_detection(tracker_state, cropped_frames)
+    for frame_index in range(len(cropped_frames)):
+        detection_result = detection_results[frame_index] if frame_index < len(detection_results) else None
+        with profile_stage('tracker_bookkeeping'):
+            tracked_persons = apply_detection_result(tracker_state, detection_result, region_offset)
+        yield tracked_persons
+
+def crop_detection_region(frame_raw, detection_region):
+    """
+    Extrait la région envoyée au détecteur.
+    
+    Args:
+        frame_raw (np.ndarray): Image BGR complète
+        detection_region (tuple or None): Région (x1, y1, x2, y2), None pour la frame complète
+    
+    Returns:
+        tuple: (vue sur la région, décalage [x1, y1, x1, y1] à ajouter aux boîtes détectées)
+    """
+    region_offset = np.zeros(4, dtype=np.float32)
+    if detection_region is not None:
+        region_x1, region_y1, region_x2, region_y2 = detection_region
+        frame_raw = frame_raw[region_y1:region_y2, region_x1:region_x2]
+        region_offset[:] = (region_x1, region_y1, region_x1, region_y1)
+    return frame_raw, region_offset
+
+def run_person_detection(tracker_state, detection_source):
+    """
+    Lance la détection et l'association BoT-SORT.
+    
+    Args:
+        tracker_state (dict): État actuel (voir create_tracker)
+        detection_source (np.ndarray or list): Image ou liste d'images traitées en un lot
+    
+    Returns:
+        list: Résultats Ultralytics, un par image
+    """
+    track_options = {}
+    if tracker_state.get('detection_imgsz'):
+        track_options['imgsz'] = tracker_state['detection_imgsz']
+    
+    with profile_stage('yolo_track'):
+        return tracker_state['person_detection_model'].track(
+            source=detection_source,
+            persist=True,
+            #tracker=BYTETRACK_PATH,
+            tracker=BOTSORT_PATH,
+            classes=0,
+            conf=MIN_CONFIDENCE,
+            iou=IOU_THRESHOLD,
+            verbose=False,
+            **track_options
+        )
+
+def apply_detection_result(tracker_state, detection_result, region_offset):
+    """
+    Applique le résultat de détection d'une frame à l'état du tracker.
+    
+    Args:
+        tracker_state (dict): État actuel (voir create_tracker)
+        detection_result (ultralytics.engine.results.Results or None): Résultat de la frame
+        region_offset (np.ndarray): Décalage [x1, y1, x1, y1] de la région analysée
     
     Returns:
         list: Liste des personnes actuellement suivies
     """
-    detection_results = tracker_state['person_detection_model'].track(
-        source=frame_raw,
-        persist=True,
-        #tracker=BYTETRACK_PATH,
-        tracker=BOTSORT_PATH,
-        classes=0,
-        conf=MIN_CONFIDENCE,
-        iou=IOU_THRESHOLD,
-        verbose=False
-    )
-
-    if detection_results and len(detection_results) > 0 and detection_results[0].boxes.id is not None:
-        detected_bboxes = detection_results[0].boxes.xyxy.cpu().numpy()
-        detected_bytetrack_ids = detection_results[0].boxes.id.cpu().numpy().astype(int)
+    active_person_ids = set()
+    if detection_result is not None and detection_result.boxes.id is not None:
+        detected_bboxes = detection_result.boxes.xyxy.cpu().numpy() + region_offset
+        detected_bytetrack_ids = detection_result.boxes.id.cpu().numpy().astype(int)
         
         # Approche vectorisée pour le traitement des détections
-        active_person_ids = set()
-        
         # Créer un masque pour les IDs qui ne sont pas encore dans le mapping
         new_ids_mask = np.array([bid not in tracker_state['bytetrack_to_internal_ids'] for bid in detected_bytetrack_ids])
         new_bytetrack_ids = detected_bytetrack_ids[new_ids_mask]
@@ -185,25 +561,35 @@ def update_tracker(tracker_state, frame_raw):
         valid_internal_ids = internal_ids[valid_mask]
         valid_bboxes = detected_bboxes[valid_mask]
         
+        # Filtres de Kalman tenus à jour seulement si la détection espacée les utilise
+        use_kalman = tracker_state['detection_interval_max'] > 1
+        
         # Mettre à jour les personnes existantes et créer les nouvelles
         for internal_id, bbox in zip(valid_internal_ids, valid_bboxes):
             active_person_ids.add(internal_id)
             
             if internal_id not in tracker_state['active_tracked_persons']:
-                tracker_state['active_tracked_persons'][internal_id] = create_tracked_person(bbox, internal_id, 1.0)
+                tracker_state['active_tracked_persons'][internal_id] = create_tracked_person(bbox, internal_id, 1.0,
+                                                                                             use_kalman)
             else:
-                update_person_position(tracker_state['active_tracked_persons'][internal_id], bbox)
-                tracker_state['active_tracked_persons'][internal_id]['frames_disappeared'] = 0
+                tracked_person = tracker_state['active_tracked_persons'][internal_id]
+                if use_kalman:
+                    if tracked_person['frames_disappeared'] > 0 or tracked_person['kalman'] is None:
+                        # Filtre figé pendant la disparition: on repart de la boîte détectée
+                        tracked_person['kalman'] = create_kalman_filter(bbox)
+                    else:
+                        predict_kalman(tracked_person['kalman'])
+                        correct_kalman(tracked_person['kalman'], bbox)
+                update_person_position(tracked_person, bbox)
+                tracked_person['frames_disappeared'] = 0
 
-        # Traitement des personnes disparues en une seule opération
-        disappeared_ids = [pid for pid in tracker_state['active_tracked_persons'] if pid not in active_person_ids]
-        
-        for disappeared_id in disappeared_ids:
-            tracker_state['active_tracked_persons'][disappeared_id]['frames_disappeared'] += 1
-            if tracker_state['active_tracked_persons'][disappeared_id]['frames_disappeared'] > MAX_DISAPPEAR_FRAMES:
-                del tracker_state['active_tracked_persons'][disappeared_id]
-
-    return list(tracker_state['active_tracked_persons'].values())
+    # Traitement des personnes disparues, y compris quand aucune détection n'est retournée
+    tracked_persons = age_tracked_persons(tracker_state, active_person_ids)
+    
+    if tracker_state['detection_interval_max'] > 1:
+        tracker_state['frames_until_detection'] = compute_detection_interval(tracker_state, line_start, line_end) - 1
+    
+    return tracked_persons
 
 def mark_person_as_crossed(tracker_state, person_id):
     """
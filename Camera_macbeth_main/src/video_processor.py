@@ -1,18 +1,34 @@
 import cv2
 import numpy as np
-from src.macbeth_nonlinear_color_correction import corriger_image
+from src.macbeth_nonlinear_color_correction import (
+    corriger_image,
+    preparer_correction_frame,
+    construire_lut_correction,
+    appliquer_lut_correction,
+    FULL_LUT_SIZE,
+    _interpolate_lut_pixel
+)
 import os
 from config.display_config import (output_width, output_height, desired_fps) 
-from config.color_config import (COLOR_RANGES, COLOR_MASKS)
+from config.color_config import (COLOR_RANGES, COLOR_MASKS, COLOR_CORRECTION_LUT_SIZE)
 from config.paths_config import (DETECTION_MASK_PATH, CACHE_FILE_PATH)
-from numba import njit
+from config.performance_config import (
+    FUSED_PREPROCESSING_ENABLED,
+    MASK_CROP_ENABLED,
+    MASK_CROP_MARGIN
+)
+from numba import njit, prange
+from src.stage_profiler import profile_stage
 from functools import lru_cache
 
 # Variables globales
 mask: np.ndarray | None = None
 resized_mask: np.ndarray | None = None
+resized_mask_bgr: np.ndarray | None = None
+mask_bbox: tuple[int, int, int, int] | None = None
 frame_count = 0
 last_correction_coefficients = None
+fused_output_buffer: np.ndarray | None = None
 
 def load_mask():
     """
@@ -22,43 +38,87 @@ def load_mask():
     elle crée un masque blanc par défaut. Le masque est automatiquement redimensionné
     aux dimensions de sortie configurées.
     
+    La boîte englobante de la zone non nulle du masque (plus MASK_CROP_MARGIN)
+    est ensuite calculée: les étapes suivantes ne traitent que cette région.
+    
     Notes:
         Le masque est stocké dans la variable globale 'mask'
+        La boîte englobante est stockée dans la variable globale 'mask_bbox'
         En cas d'erreur, un masque blanc est créé par défaut
     """
-    global mask, resized_mask
+    global mask, resized_mask, resized_mask_bgr, mask_bbox
     print(f"Tentative de chargement du masque depuis: {DETECTION_MASK_PATH}")
 
     def create_default_mask() -> None:
         """Crée un masque blanc par défaut aux dimensions de sortie."""
-        global mask, resized_mask
+        global mask, resized_mask, resized_mask_bgr
         if output_width is None or output_height is None:
             raise ValueError("Les dimensions de sortie doivent être initialisées")
         mask = np.ones((output_height, output_width), dtype=np.uint8) * 255
         resized_mask = mask.copy()
+        resized_mask_bgr = cv2.merge([resized_mask] * 3)
         print("Création d'un masque blanc par défaut")
 
     try:
         if not os.path.exists(DETECTION_MASK_PATH):
             print(f"ERREUR: Le fichier de masque n'existe pas: {DETECTION_MASK_PATH}")
             create_default_mask()
-            return
-
-        # Chargement du masque en niveaux de gris
-        mask = cv2.imread(DETECTION_MASK_PATH, 0)
-        
-        if mask is None:
-            print(f"ERREUR: Impossible de charger le masque: {DETECTION_MASK_PATH}")
-            create_default_mask()
         else:
-            # Pré-calcul du masque redimensionné une seule fois
-            original_shape = mask.shape
-            resized_mask = cv2.resize(mask, (output_width, output_height))
-            print(f"Masque chargé avec succès: {original_shape} et redimensionné à {(output_height, output_width)}")
+            # Chargement du masque en niveaux de gris
+            mask = cv2.imread(DETECTION_MASK_PATH, 0)
+            
+            if mask is None:
+                print(f"ERREUR: Impossible de charger le masque: {DETECTION_MASK_PATH}")
+                create_default_mask()
+            else:
+                # Pré-calcul du masque redimensionné une seule fois
+                original_shape = mask.shape
+                resized_mask = cv2.resize(mask, (output_width, output_height))
+                resized_mask_bgr = cv2.merge([resized_mask] * 3)
+                print(f"Masque chargé avec succès: {original_shape} et redimensionné à {(output_height, output_width)}")
             
     except Exception as e:
         print(f"ERREUR lors du chargement du masque: {str(e)}")
         create_default_mask()
+    
+    mask_bbox = compute_mask_bbox(resized_mask, MASK_CROP_MARGIN)
+    crop_ratio = ((mask_bbox[2] - mask_bbox[0]) * (mask_bbox[3] - mask_bbox[1])) / (output_width * output_height)
+    print(f"Région active du masque: {mask_bbox} ({crop_ratio:.0%} de la frame)")
+
+def compute_mask_bbox(mask_image, margin):
+    """
+    Calcule la boîte englobante de la zone non nulle d'un masque.
+    
+    Args:
+        mask_image (np.ndarray): Masque en niveaux de gris
+        margin (int): Marge ajoutée de chaque côté (en pixels)
+    
+    Returns:
+        tuple: (x1, y1, x2, y2) limitée à l'image, x2/y2 exclus.
+            L'image entière si le masque est vide.
+    """
+    mask_height, mask_width = mask_image.shape[:2]
+    non_zero_points = cv2.findNonZero(mask_image)
+    if non_zero_points is None:
+        return (0, 0, mask_width, mask_height)
+    
+    bbox_x, bbox_y, bbox_width, bbox_height = cv2.boundingRect(non_zero_points)
+    return (max(bbox_x - margin, 0),
+            max(bbox_y - margin, 0),
+            min(bbox_x + bbox_width + margin, mask_width),
+            min(bbox_y + bbox_height + margin, mask_height))
+
+def get_processing_region():
+    """
+    Retourne la région de la frame réellement traitée.
+    
+    Returns:
+        tuple or None: (x1, y1, x2, y2) de la boîte englobante du masque,
+            None si le recadrage est désactivé ou le masque non chargé
+    """
+    if not MASK_CROP_ENABLED:
+        return None
+    return mask_bbox
 
 def setup_video_capture(video_path):
     """
@@ -78,8 +138,17 @@ def setup_video_capture(video_path):
     cap.set(cv2.CAP_PROP_FPS, desired_fps)
     return cap
 
-@njit
 def apply_mask(frame, mask):
+    """
+    Applique un masque binaire à une frame.
+    
+    Args:
+        frame (np.ndarray): Image uint8 à masquer
+        mask (np.ndarray): Masque uint8 (pixels conservés si non nuls)
+    
+    Returns:
+        np.ndarray: Image masquée
+    """
     return cv2.bitwise_and(frame, frame, mask=mask)
 
 @lru_cache(maxsize=1)
@@ -106,35 +175,199 @@ def get_resize_matrix(input_shape):
     
     return cv2.getAffineTransform(src_points, dst_points)
 
-@njit
-def _apply_single_mask(frame, mask):
+def apply_masks_batch(frames, masks):
     """
-    Applique un masque unique à une frame en utilisant Numba pour l'optimisation.
+    Applique un lot de masques à un lot de frames.
+    
+    Le masque est appliqué en uint8 (frame * masque / 255, arrondi), ce qui
+    conserve les bords progressifs des masques JPEG sans passer en flottant.
     
     Args:
-        frame (np.ndarray): Image à masquer
-        mask (np.ndarray): Masque binaire à appliquer
+        frames (np.ndarray): Lot d'images uint8 à masquer
+        masks (np.ndarray): Lot de masques uint8 (1 ou 3 canaux) à appliquer
     
     Returns:
-        np.ndarray: Image masquée
+        np.ndarray: Lot d'images masquées (uint8)
     """
-    return frame * (mask[:, :, None] / 255.0)
+    frames_masked = np.empty_like(frames)
+    for frame_index, (frame, frame_mask) in enumerate(zip(frames, masks)):
+        if frame_mask.ndim == 2:
+            frame_mask = cv2.merge([frame_mask] * 3)
+        cv2.multiply(frame, frame_mask, dst=frames_masked[frame_index], scale=1.0 / 255.0)
+    return frames_masked
 
-def apply_masks_batch(frames, masks):
+# Noyau compilé mis en cache sur disque (__pycache__). Numba n'invalide pas ce cache
+# quand _interpolate_lut_pixel change dans son module: supprimer alors les fichiers .nbi/.nbc
+@njit(parallel=True, cache=True, nogil=True)
+def _resize_mask_correct_kernel(frame_raw, scale_x, scale_y, frame_mask, region,
+                                correction_lut, lut_indices, lut_weights, frame_output):
     """
-    Applique un lot de masques à un lot de frames.
+    Noyau fusionné: redimensionnement, masque et correction en une seule passe.
+    
+    Pour chaque pixel de sortie:
+    1. Échantillonnage bilinéaire de la frame brute (même correspondance que
+       la matrice de get_resize_matrix, coins alignés)
+    2. Multiplication par le masque (arrondi uint8, comme apply_masks_batch)
+    3. Correction des couleurs par la LUT 3D
+    
+    Les pixels hors masque ne sont ni échantillonnés ni interpolés: ils
+    reçoivent directement la valeur corrigée du noir. Les pixels hors de la
+    région traitée ne sont pas écrits.
+    
+    Args:
+        frame_raw (np.ndarray): Frame brute (H, W, 3) uint8
+        scale_x, scale_y (float): Rapports (W - 1) / (w - 1) et (H - 1) / (h - 1)
+        frame_mask (np.ndarray): Masque (h, w) uint8 aux dimensions de sortie
+        region (tuple): Région traitée (x1, y1, x2, y2) en coordonnées de sortie
+        correction_lut (np.ndarray): Table (n, n, n, 3) de la LUT de correction
+        lut_indices, lut_weights (np.ndarray): Tables d'interpolation de la LUT
+        frame_output (np.ndarray): Image de sortie (h, w, 3) uint8
+    """
+    output_h, output_w = frame_mask.shape
+    input_h, input_w = frame_raw.shape[0], frame_raw.shape[1]
+    lut_size = correction_lut.shape[0]
+    flat_lut = correction_lut.reshape(-1, 3)
+    same_size = input_h == output_h and input_w == output_w
+    
+    # Valeur corrigée du noir, écrite directement pour les pixels masqués
+    masked_pixel = np.empty((1, 1, 3), dtype=np.uint8)
+    _interpolate_lut_pixel(flat_lut, lut_size, lut_indices, lut_weights, 0, 0, 0, masked_pixel, 0, 0)
+    
+    region_x1, region_y1, region_x2, region_y2 = region
+    
+    for y in prange(region_y1, region_y2):
+        source_y = y * scale_y
+        y0 = min(int(source_y), input_h - 1)
+        y1 = min(y0 + 1, input_h - 1)
+        weight_y = np.float32(source_y - y0)
+        for x in range(region_x1, region_x2):
+            if frame_mask[y, x] == 0:
+                frame_output[y, x, 0] = masked_pixel[0, 0, 0]
+                frame_output[y, x, 1] = masked_pixel[0, 0, 1]
+                frame_output[y, x, 2] = masked_pixel[0, 0, 2]
+                continue
+            if same_size:
+                pixel_b = np.float32(frame_raw[y, x, 0])
+                pixel_g = np.float32(frame_raw[y, x, 1])
+                pixel_r = np.float32(frame_raw[y, x, 2])
+            else:
+                source_x = x * scale_x
+                x0 = min(int(source_x), input_w - 1)
+                x1 = min(x0 + 1, input_w - 1)
+                weight_x = np.float32(source_x - x0)
+                w00 = (1 - weight_x) * (1 - weight_y)
+                w01 = weight_x * (1 - weight_y)
+                w10 = (1 - weight_x) * weight_y
+                w11 = weight_x * weight_y
+                pixel_b = (frame_raw[y0, x0, 0] * w00 + frame_raw[y0, x1, 0] * w01 +
+                           frame_raw[y1, x0, 0] * w10 + frame_raw[y1, x1, 0] * w11)
+                pixel_g = (frame_raw[y0, x0, 1] * w00 + frame_raw[y0, x1, 1] * w01 +
+                           frame_raw[y1, x0, 1] * w10 + frame_raw[y1, x1, 1] * w11)
+                pixel_r = (frame_raw[y0, x0, 2] * w00 + frame_raw[y0, x1, 2] * w01 +
+                           frame_raw[y1, x0, 2] * w10 + frame_raw[y1, x1, 2] * w11)
+            
+            mask_scale = frame_mask[y, x] / np.float32(255.0)
+            b = min(int(pixel_b * mask_scale + 0.5), 255)
+            g = min(int(pixel_g * mask_scale + 0.5), 255)
+            r = min(int(pixel_r * mask_scale + 0.5), 255)
+            _interpolate_lut_pixel(flat_lut, lut_size, lut_indices, lut_weights,
+                                   b, g, r, frame_output, y, x)
+
+def _fill_outside_region(frame_output, region, correction_lut):
+    """
+    Remplit le tampon hors de la région traitée avec la valeur corrigée du noir.
+    
+    Le noyau fusionné n'écrit que la région: sans ce remplissage, les marges
+    d'un tampon réutilisé gardent la frame précédente et les éléments
+    d'affichage dessinés dessus (compteurs, chronomètre, boîtes).
+    
+    Args:
+        frame_output (np.ndarray): Tampon de sortie (h, w, 3) uint8
+        region (tuple): Région traitée (x1, y1, x2, y2)
+        correction_lut (dict): LUT de correction courante
+    """
+    region_x1, region_y1, region_x2, region_y2 = region
+    output_h, output_w = frame_output.shape[:2]
+    if (region_x1, region_y1, region_x2, region_y2) == (0, 0, output_w, output_h):
+        return
+    # Même valeur que celle écrite par le noyau pour les pixels masqués
+    masked_pixel = np.empty((1, 1, 3), dtype=np.uint8)
+    correction_table = correction_lut['table']
+    _interpolate_lut_pixel(correction_table.reshape(-1, 3), correction_table.shape[0],
+                           correction_lut['indices'], correction_lut['weights'], 0, 0, 0, masked_pixel, 0, 0)
+    masked_color = tuple(int(v) for v in masked_pixel[0, 0])
+    # Quatre marges; cv2.rectangle plein est bien plus rapide qu'une affectation numpy par pixel BGR
+    for margin_x1, margin_y1, margin_x2, margin_y2 in ((0, 0, output_w, region_y1), (0, region_y2, output_w, output_h),
+                                                      (0, region_y1, region_x1, region_y2),
+                                                      (region_x2, region_y1, output_w, region_y2)):
+        if margin_x2 > margin_x1 and margin_y2 > margin_y1:
+            cv2.rectangle(frame_output, (margin_x1, margin_y1), (margin_x2 - 1, margin_y2 - 1), masked_color, -1)
+
+def _process_frame_fused(frame_raw, correction_lut, frame_output=None):
+    """
+    Traite une frame avec le noyau fusionné redimensionnement + masque + correction.
     
     Args:
-        frames (np.ndarray): Lot d'images à masquer
-        masks (np.ndarray): Lot de masques binaires à appliquer
+        frame_raw (np.ndarray): Frame brute (H, W, 3) uint8
+        correction_lut (dict): LUT de correction courante
+        frame_output (np.ndarray, optional): Tampon de sortie (h, w, 3) uint8.
+            Par défaut, un tampon global réutilisé d'une frame à l'autre.
     
     Returns:
-        np.ndarray: Lot d'images masquées
+        np.ndarray: Frame traitée (le tampon de sortie)
+    
+    Notes:
+        Avec le recadrage actif, le noyau ne traite que la région du masque; le
+        reste du tampon reçoit à chaque frame la valeur corrigée du noir, comme
+        les pixels masqués.
     """
-    return np.array([_apply_single_mask(frame, mask) 
-                    for frame, mask in zip(frames, masks)])
+    global fused_output_buffer
+    
+    if frame_output is None:
+        if fused_output_buffer is None:
+            fused_output_buffer = np.zeros((output_height, output_width, 3), dtype=np.uint8)
+        frame_output = fused_output_buffer
+    
+    region = get_processing_region()
+    if region is None:
+        region = (0, 0, output_width, output_height)
+    
+    input_h, input_w = frame_raw.shape[:2]
+    scale_x = (input_w - 1) / (output_width - 1)
+    scale_y = (input_h - 1) / (output_height - 1)
+    _resize_mask_correct_kernel(np.ascontiguousarray(frame_raw), scale_x, scale_y, resized_mask, region,
+                                correction_lut['table'], correction_lut['indices'],
+                                correction_lut['weights'], frame_output)
+    _fill_outside_region(frame_output, region, correction_lut)
+    return frame_output
 
-def process_frame(frame_raw, detect_squares):
+def resize_and_mask_frame(frame_raw):
+    """
+    Redimensionne une frame aux dimensions configurées et applique le masque.
+    
+    Args:
+        frame_raw (np.array): Image brute (format BGR)
+    
+    Returns:
+        np.array: Image redimensionnée et masquée, sans correction des couleurs
+    """
+    # Éviter le redimensionnement si les dimensions sont déjà correctes
+    with profile_stage('resize'):
+        matrix = get_resize_matrix(frame_raw.shape)
+        if matrix is None:
+            frame_resized = frame_raw
+        else:
+            frame_resized = cv2.warpAffine(frame_raw, matrix, (output_width, output_height))
+    
+    # Application du masque en uint8
+    with profile_stage('mask'):
+        if resized_mask_bgr is not None:
+            frame_masked = cv2.multiply(frame_resized, resized_mask_bgr, scale=1.0 / 255.0)
+        else:
+            frame_masked = frame_resized
+    return frame_masked
+
+def process_frame(frame_raw, detect_squares, frame_output=None):
     """
     Traite une frame individuelle de la vidéo.
     
@@ -143,32 +376,33 @@ def process_frame(frame_raw, detect_squares):
     2. Application du masque si disponible
     3. Correction des couleurs via l'algorithme Macbeth
     
+    Hors recalibration synchrone, ces trois étapes sont faites en une seule
+    passe par le noyau fusionné (FUSED_PREPROCESSING_ENABLED), sans allocation.
+    Une recalibration en arrière-plan redimensionne et masque sa propre copie
+    de la frame brute.
+    
     Args:
         frame_raw (np.array): Image brute à traiter (format BGR)
         detect_squares (bool): Si True, détecte les carrés Macbeth, sinon utilise le cache
+        frame_output (np.array, optional): Tampon de sortie pour le noyau fusionné.
+            Par défaut, un tampon réutilisé: la frame retournée n'est alors valide
+            que jusqu'au prochain appel.
     
     Returns:
         np.array: Image traitée avec les couleurs corrigées et le masque appliqué
     """
     try:
-        # Éviter le redimensionnement si les dimensions sont déjà correctes
-        matrix = get_resize_matrix(frame_raw.shape)
-        if matrix is None:
-            frame_resized = frame_raw
-        else:
-            frame_resized = cv2.warpAffine(frame_raw, matrix, (output_width, output_height))
+        if FUSED_PREPROCESSING_ENABLED and resized_mask is not None and frame_raw.dtype == np.uint8:
+            correction_lut = preparer_correction_frame(detect_squares, frame_raw, resize_and_mask_frame)
+            if correction_lut is not None:
+                with profile_stage('preprocess_fused'):
+                    return _process_frame_fused(frame_raw, correction_lut, frame_output)
         
-        # Application vectorisée du masque
-        if resized_mask is not None:
-            frame_masked = apply_masks_batch(
-                np.array([frame_resized]), 
-                np.array([resized_mask])
-            )[0]
-        else:
-            frame_masked = frame_resized
+        frame_masked = resize_and_mask_frame(frame_raw)
         
         # Correction des couleurs avec gestion des erreurs
-        frame_corrected = corriger_image(frame_masked, CACHE_FILE_PATH, detect_squares)
+        with profile_stage('color_correction'):
+            frame_corrected = corriger_image(frame_masked, CACHE_FILE_PATH, detect_squares)
         if frame_corrected is None:
             print("Erreur: La correction des couleurs a échoué")
             return frame_masked
@@ -179,6 +413,57 @@ def process_frame(frame_raw, detect_squares):
         print(f"Erreur lors du traitement de la frame: {str(e)}")
         return frame_raw
 
+def warmup_kernels():
+    """
+    Charge ou compile les noyaux numba sur de petites données factices.
+    
+    Les types des données factices sont ceux des appels réels: la première
+    frame ne paie donc ni la compilation ni le chargement du cache disque.
+    
+    Notes:
+        - Compile la construction de LUT, la correction par LUT et le noyau fusionné
+    """
+    identity_coefficients = np.array([1, 0, 0, 0, 1,
+                                      0, 1, 0, 0, 1,
+                                      0, 0, 1, 0, 1], dtype=np.float64)
+    warmup_lut = construire_lut_correction(identity_coefficients, 2)
+    if COLOR_CORRECTION_LUT_SIZE == FULL_LUT_SIZE:
+        warmup_lut['table'] = warmup_lut['table'].astype(np.uint8)
+    warmup_frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    
+    if COLOR_CORRECTION_LUT_SIZE > 0:
+        appliquer_lut_correction(warmup_frame, dict(warmup_lut, size=COLOR_CORRECTION_LUT_SIZE))
+    if FUSED_PREPROCESSING_ENABLED:
+        _resize_mask_correct_kernel(warmup_frame, 1.0, 1.0, np.zeros((4, 4), dtype=np.uint8), (0, 0, 4, 4),
+                                    warmup_lut['table'], warmup_lut['indices'], warmup_lut['weights'],
+                                    np.empty_like(warmup_frame))
+        _fill_outside_region(np.empty_like(warmup_frame), (1, 1, 3, 3), warmup_lut)
+
+def process_frame_to_buffer(frame_raw, detect_squares, frame_buffers, buffer_index):
+    """
+    Traite une frame dans un tampon propre, pour conserver plusieurs frames traitées.
+    
+    process_frame écrit par défaut dans un tampon réutilisé; cette fonction
+    garde un tampon par indice pour les traitements par lots.
+    
+    Args:
+        frame_raw (np.array): Image brute à traiter (format BGR)
+        detect_squares (bool): Si True, détecte les carrés Macbeth, sinon utilise le cache
+        frame_buffers (list): Tampons par indice, complétés au besoin
+        buffer_index (int): Indice du tampon à utiliser
+    
+    Returns:
+        np.array: Image traitée, valide jusqu'à la réutilisation du même indice
+    """
+    if buffer_index >= len(frame_buffers):
+        frame_buffers.extend([None] * (buffer_index + 1 - len(frame_buffers)))
+    frame_processed = process_frame(frame_raw, detect_squares, frame_buffers[buffer_index])
+    if frame_processed is not frame_buffers[buffer_index]:
+        # Frame retournée dans un tampon réutilisé: copie conservée pour cet indice
+        frame_processed = frame_processed.copy()
+        frame_buffers[buffer_index] = frame_processed
+    return frame_processed
+
 def initialize_color_masks():
     """
     Initialise les masques de couleur avec vérification vectorisée.
@@ -213,10 +498,14 @@ def get_color_mask(color_name):
         raise ValueError(f"Couleur non reconnue : {color_name}")
     return COLOR_MASKS[color_name]['min'], COLOR_MASKS[color_name]['max']
 
-@njit
 def process_color_ranges():
-    """Pré-calcule les plages de couleurs"""
+    """
+    Pré-calcule les plages de couleurs.
+    
+    Returns:
+        np.ndarray: Tableau (n, 2, 3) uint8 des seuils HSV [min, max] par couleur
+    """
     return np.array([
         (hsv_min, hsv_max) 
-        for _, (hsv_min, hsv_max) in COLOR_RANGES.items()
-    ])
+        for hsv_min, hsv_max in COLOR_RANGES.values()
+    ], dtype=np.uint8)
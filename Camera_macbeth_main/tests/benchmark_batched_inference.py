@@ -0,0 +1,96 @@
+"""
+Benchmark de l'inférence par lots hors ligne.
+
+Compare le suivi frame par frame (update_tracker) au suivi par lots de K
+frames consécutives (update_tracker_batch):
+- temps moyen de suivi par frame
+- identité des boîtes et des IDs suivis frame par frame avec le mode séquentiel
+- nombre de franchissements de ligne détectés
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_batched_inference.py [chemin_video]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.display_config import line_start, line_end
+from src.tracker import (
+    create_tracker,
+    update_tracker,
+    update_tracker_batch,
+    check_line_crossing,
+    mark_person_as_crossed
+)
+from benchmark_line_band import DEFAULT_VIDEO_PATH, read_frames
+
+BATCH_SIZES = (4, 8, 16)
+
+
+def record_frame(tracker_state, tracked_persons):
+    """Vérifie les franchissements et retourne l'état suivi de la frame."""
+    crossing_count = 0
+    frame_tracks = sorted((int(person['id']), tuple(np.round(person['bbox'], 1)))
+                          for person in tracked_persons if person['frames_disappeared'] == 0)
+    for tracked_person in tracked_persons:
+        if check_line_crossing(tracked_person, line_start, line_end):
+            crossing_count += 1
+            mark_person_as_crossed(tracker_state, tracked_person['id'])
+    return frame_tracks, crossing_count
+
+
+def run_sequential(frames):
+    """Suivi frame par frame. Returns: (ms/frame, suivis par frame, franchissements)"""
+    tracker_state = create_tracker()
+    update_tracker(tracker_state, frames[0])  # Chauffe
+    tracker_state = create_tracker()
+
+    tracks_per_frame = []
+    crossing_count = 0
+    start_time = time.perf_counter()
+    for frame in frames:
+        frame_tracks, frame_crossings = record_frame(tracker_state, update_tracker(tracker_state, frame))
+        tracks_per_frame.append(frame_tracks)
+        crossing_count += frame_crossings
+    return (time.perf_counter() - start_time) * 1000 / len(frames), tracks_per_frame, crossing_count
+
+
+def run_batched(frames, batch_size):
+    """Suivi par lots. Returns: (ms/frame, suivis par frame, franchissements)"""
+    tracker_state = create_tracker()
+    list(update_tracker_batch(tracker_state, frames[:batch_size]))  # Chauffe
+    tracker_state = create_tracker()
+
+    tracks_per_frame = []
+    crossing_count = 0
+    start_time = time.perf_counter()
+    for batch_start in range(0, len(frames), batch_size):
+        for tracked_persons in update_tracker_batch(tracker_state, frames[batch_start:batch_start + batch_size]):
+            frame_tracks, frame_crossings = record_frame(tracker_state, tracked_persons)
+            tracks_per_frame.append(frame_tracks)
+            crossing_count += frame_crossings
+    return (time.perf_counter() - start_time) * 1000 / len(frames), tracks_per_frame, crossing_count
+
+
+def main():
+    video_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VIDEO_PATH
+    frames = read_frames(video_path)
+    print(f"{len(frames)} frames")
+
+    sequential_ms, sequential_tracks, sequential_crossings = run_sequential(frames)
+    print(f"Frame par frame: {sequential_ms:6.1f} ms/frame, {sequential_crossings} franchissement(s)")
+
+    for batch_size in BATCH_SIZES:
+        batched_ms, batched_tracks, batched_crossings = run_batched(frames, batch_size)
+        matching_frames = sum(first == second for first, second in zip(sequential_tracks, batched_tracks))
+        print(f"Lots de {batch_size:2d}:     {batched_ms:6.1f} ms/frame, {batched_crossings} franchissement(s), "
+              f"x{sequential_ms / batched_ms:.2f}, suivis identiques sur {matching_frames}/{len(frames)} frames")
+
+
+if __name__ == "__main__":
+    main()
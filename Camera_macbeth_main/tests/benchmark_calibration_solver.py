@@ -0,0 +1,124 @@
+"""
+Benchmark du solveur de calibration Macbeth.
+
+Compare, sur les carrés du cache Macbeth, le solveur d'origine (départ
+identitaire, jacobienne par différences finies) au solveur actuel (jacobienne
+analytique, départ depuis la calibration précédente, nombre d'évaluations
+plafonné):
+- temps moyen d'une calibration
+- erreur résiduelle RMS et maximale, en niveaux [0-255]
+
+La recalibration est simulée par une dérive des couleurs mesurées (gain et
+décalage par canal, bruit de mesure), à partir des paramètres calibrés sur
+les couleurs du cache.
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_calibration_solver.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.color_config import MACBETH_REFERENCE_COLORS
+from src.macbeth_nonlinear_color_correction import (
+    calibrer_transformation_non_lineaire,
+    modele_non_lineaire
+)
+from benchmark_lut_correction import load_cached_colors
+
+MAX_NFEV_CAPS = (3, 5, 10)
+REPEATS = 20
+
+
+def calibrer_solveur_origine(colors_measured, colors_target):
+    """Solveur d'origine: départ identitaire et jacobienne par différences finies."""
+    from scipy.optimize import least_squares
+
+    def residuals(correction_coefficients):
+        return (modele_non_lineaire(correction_coefficients, colors_measured) - colors_target).ravel()
+
+    coefficients_init = np.array([1, 0, 0, 0, 1,
+                                  0, 1, 0, 0, 1,
+                                  0, 0, 1, 0, 1], dtype=np.float32)
+    bounds_lower = [-np.inf] * 15
+    bounds_upper = [np.inf] * 15
+    bounds_lower[4::5] = [0.1] * 3
+    bounds_upper[4::5] = [5] * 3
+    return least_squares(residuals, coefficients_init, bounds=(bounds_lower, bounds_upper), method="trf").x
+
+
+def drift_colors(colors_measured, seed):
+    """Couleurs mesurées après une dérive d'éclairage simulée."""
+    rng = np.random.default_rng(seed)
+    channel_gains = rng.uniform(0.9, 1.1, 3)
+    channel_offsets = rng.uniform(-0.02, 0.02, 3)
+    measurement_noise = rng.normal(0, 0.004, colors_measured.shape)
+    return np.clip(colors_measured * channel_gains + channel_offsets + measurement_noise, 0, 1)
+
+
+def time_calibration(function, repeats=REPEATS):
+    """Temps moyen en millisecondes et paramètres retournés (après un appel de chauffe)."""
+    correction_params = function()
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start_time) * 1000 / repeats, correction_params
+
+
+def residual_levels(correction_params, colors_measured, colors_target):
+    """Erreur RMS et maximale entre prédiction et cible, en niveaux [0-255]."""
+    error = (np.clip(modele_non_lineaire(correction_params, colors_measured), 0, 1) - colors_target) * 255
+    return np.sqrt(np.mean(error ** 2)), np.abs(error).max()
+
+
+def print_result(label, elapsed_ms, reference_ms, correction_params, colors_measured, colors_target):
+    """Affiche le temps, le gain par rapport au solveur d'origine et l'erreur résiduelle."""
+    rms_error, max_error = residual_levels(correction_params, colors_measured, colors_target)
+    print(f"  {label:<48} {elapsed_ms:7.2f} ms (x{reference_ms / elapsed_ms:5.1f}), "
+          f"RMS {rms_error:6.3f}, max {max_error:6.2f} niveaux")
+
+
+def main():
+    colors_measured = load_cached_colors()
+    colors_target = np.array(MACBETH_REFERENCE_COLORS, dtype=np.float64) / 255.0
+
+    print("Calibration initiale (couleurs du cache):")
+    reference_ms, reference_params = time_calibration(
+        lambda: calibrer_solveur_origine(colors_measured, colors_target))
+    print_result("solveur d'origine", reference_ms, reference_ms, reference_params,
+                 colors_measured, colors_target)
+    elapsed_ms, initial_params = time_calibration(
+        lambda: calibrer_transformation_non_lineaire(colors_measured, colors_target))
+    print_result("jacobienne analytique", elapsed_ms, reference_ms, initial_params,
+                 colors_measured, colors_target)
+
+    for seed in range(3):
+        colors_drifted = drift_colors(colors_measured, seed)
+        print(f"Recalibration après dérive {seed + 1}:")
+        reference_ms, reference_params = time_calibration(
+            lambda: calibrer_solveur_origine(colors_drifted, colors_target))
+        print_result("solveur d'origine", reference_ms, reference_ms, reference_params,
+                     colors_drifted, colors_target)
+        elapsed_ms, correction_params = time_calibration(
+            lambda: calibrer_transformation_non_lineaire(colors_drifted, colors_target))
+        print_result("jacobienne analytique", elapsed_ms, reference_ms, correction_params,
+                     colors_drifted, colors_target)
+        elapsed_ms, correction_params = time_calibration(
+            lambda: calibrer_transformation_non_lineaire(colors_drifted, colors_target, initial_params))
+        print_result("analytique + départ précédent", elapsed_ms, reference_ms, correction_params,
+                     colors_drifted, colors_target)
+        for max_nfev in MAX_NFEV_CAPS:
+            elapsed_ms, correction_params = time_calibration(
+                lambda: calibrer_transformation_non_lineaire(colors_drifted, colors_target,
+                                                             initial_params, max_nfev))
+            print_result(f"analytique + départ précédent, max_nfev={max_nfev}", elapsed_ms, reference_ms,
+                         correction_params, colors_drifted, colors_target)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark de la détection de la charte Macbeth selon la résolution.
+
+Projette l'image redressée du cache Macbeth, entourée de son cadre noir, sur
+un fond texturé en 720p, 1080p et 4K (même cadrage relatif, plusieurs vues,
+bruit de capteur), et compare la recherche du cadre noir à pleine résolution
+(CHART_DETECTION_PYRAMID_SCALE = 1) à la recherche pyramidale (frame réduite
+puis coins affinés par cv2.cornerSubPix):
+- temps moyen de detect_macbeth_in_scene
+- erreur des coins (moyenne et maximale, en pixels de la frame source)
+
+L'écriture du cache est désactivée pendant la mesure.
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_chart_detection.py
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.detection_config import CHART_DETECTION_PYRAMID_SCALE
+import src.macbeth_color_and_rectangle_detector as detector
+from benchmark_chart_tracking import SENSOR_NOISE, build_chart_image
+
+RESOLUTIONS = [(1280, 720), (1920, 1080), (3840, 2160)]
+REPETITIONS = 5
+# (largeur de la charte rapportée à la frame, rotation en degrés, perspective x, perspective y), en 720p
+VIEWS = [(0.35, 0.0, 0.0, 0.0), (0.3, 4.0, 0.00008, 0.00004), (0.25, -10.0, -0.0002, 0.0001)]
+
+
+def view_homography(view, chart_shape, frame_size):
+    """Homographie image de la charte -> frame, indépendante de la résolution à l'échelle près."""
+    width_ratio, angle_degrees, perspective_x, perspective_y = view
+    chart_height, chart_width = chart_shape[:2]
+    scale = width_ratio * frame_size[0] / chart_width
+    resolution_scale = frame_size[0] / RESOLUTIONS[0][0]
+    angle = np.deg2rad(angle_degrees)
+    to_center = np.array([[1, 0, -chart_width / 2], [0, 1, -chart_height / 2], [0, 0, 1]])
+    rotation_scale = np.array([[scale * np.cos(angle), -scale * np.sin(angle), 0],
+                               [scale * np.sin(angle), scale * np.cos(angle), 0], [0, 0, 1]])
+    # La perspective est exprimée en 720p: ramenée aux pixels de la frame
+    perspective = np.array([[1, 0, 0], [0, 1, 0],
+                            [perspective_x / resolution_scale, perspective_y / resolution_scale, 1]])
+    to_frame = np.array([[1, 0, 0.55 * frame_size[0]], [0, 1, 0.45 * frame_size[1]], [0, 0, 1]])
+    return to_frame @ perspective @ rotation_scale @ to_center
+
+
+def build_frame(rng, chart_image, view, frame_size):
+    """Frame de la vue et coins réels (4, 2) de la charte."""
+    noise = rng.uniform(0, 1, (RESOLUTIONS[0][1] // 16, RESOLUTIONS[0][0] // 16, 3)).astype(np.float32)
+    background = np.clip(80 + 120 * cv2.resize(noise, frame_size, interpolation=cv2.INTER_CUBIC), 0, 255)
+    homography = view_homography(view, chart_image.shape, frame_size)
+    chart_projected = cv2.warpPerspective(chart_image, homography, frame_size)
+    mask_projected = cv2.warpPerspective(np.full(chart_image.shape[:2], 255, dtype=np.uint8), homography, frame_size)
+    frame = np.where(mask_projected[..., None] > 127, chart_projected, background)
+    frame = np.clip(frame + rng.normal(0, SENSOR_NOISE, frame.shape), 0, 255).astype(np.uint8)
+    chart_height, chart_width = chart_image.shape[:2]
+    chart_corners = np.array([[0, 0], [chart_width - 1, 0], [chart_width - 1, chart_height - 1],
+                              [0, chart_height - 1]], dtype=np.float64).reshape(-1, 1, 2)
+    return frame, cv2.perspectiveTransform(chart_corners, homography).reshape(4, 2)
+
+
+def measure_detection(frame, true_corners):
+    """Temps moyen (ms) de detect_macbeth_in_scene et erreurs des coins détectés."""
+    start_time = time.perf_counter()
+    for _ in range(REPETITIONS):
+        detector.detect_macbeth_in_scene(frame)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000 / REPETITIONS
+    estimated_corners = detector.compute_chart_corners(detector.load_chart_geometry())
+    return elapsed_ms, np.linalg.norm(estimated_corners - true_corners, axis=1)
+
+
+def main():
+    detector.CHART_CACHE_PERSIST_ENABLED = False
+    detector.CHART_DEBUG_IMAGES_ENABLED = False
+    rng = np.random.default_rng(0)
+    chart_image = build_chart_image()
+
+    print(f"{len(VIEWS)} vues par résolution, {REPETITIONS} détections par vue")
+    print(f"  {'résolution':>10} {'réduction':>9} {'ms':>7} {'erreur moy.':>11} {'erreur max':>10}")
+    for frame_size in RESOLUTIONS:
+        frames = [build_frame(rng, chart_image, view, frame_size) for view in VIEWS]
+        for pyramid_scale in (1, CHART_DETECTION_PYRAMID_SCALE):
+            detector.CHART_DETECTION_PYRAMID_SCALE = pyramid_scale
+            effective_scale = detector._chart_pyramid_scale(frame_size[0])
+            timings, errors = [], []
+            for frame, true_corners in frames:
+                elapsed_ms, corner_errors = measure_detection(frame, true_corners)
+                timings.append(elapsed_ms)
+                errors.extend(corner_errors)
+            print(f"  {f'{frame_size[0]}x{frame_size[1]}':>10} {f'1/{effective_scale}':>9} {np.mean(timings):7.2f} "
+                  f"{np.mean(errors):11.2f} {np.max(errors):10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark du suivi de la charte Macbeth.
+
+Construit une séquence 1280x720 où l'image redressée du cache Macbeth,
+entourée de son cadre noir, est projetée par une homographie connue sur un
+fond texturé, avec un bruit de capteur par frame:
+- frames immobiles, puis déplacement lent (translation, rotation, échelle),
+  puis de nouveau immobiles
+- un saut brutal de la charte en fin de séquence, que le suivi doit rejeter
+
+Compare la détection complète à chaque frame (detect_macbeth_in_scene) au
+suivi avec repli sur la détection (locate_macbeth):
+- temps moyen par frame
+- erreur des coins (moyenne et maximale, en pixels) par rapport à la vérité
+- frames suivies, rejetées et détections complètes
+
+Le cache Macbeth est écrit dans un répertoire temporaire.
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_chart_tracking.py
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.paths_config import WARPED_IMAGE_PATH
+import src.macbeth_color_and_rectangle_detector as detector
+
+FRAME_SIZE = (1280, 720)
+BORDER_WIDTH = 24         # Cadre noir ajouté autour de l'image redressée (pixels)
+SENSOR_NOISE = 2.0        # Écart type du bruit par frame (niveaux)
+STATIC_FRAMES = 50
+MOVING_FRAMES = 100
+JUMP_OFFSET = (-180, 60)  # Déplacement brutal de la dernière frame (pixels)
+
+
+def build_chart_image():
+    """Image redressée de la charte entourée de son cadre noir."""
+    chart_warped = cv2.imread(WARPED_IMAGE_PATH)
+    return cv2.copyMakeBorder(chart_warped, BORDER_WIDTH, BORDER_WIDTH, BORDER_WIDTH, BORDER_WIDTH,
+                              cv2.BORDER_CONSTANT, value=(10, 10, 10))
+
+
+def build_background(rng):
+    """Fond texturé clair (aucune zone assez sombre pour passer pour le cadre)."""
+    noise = rng.uniform(0, 1, (FRAME_SIZE[1] // 16, FRAME_SIZE[0] // 16, 3)).astype(np.float32)
+    texture = cv2.resize(noise, FRAME_SIZE, interpolation=cv2.INTER_CUBIC)
+    return np.clip(80 + 120 * texture, 0, 255).astype(np.uint8)
+
+
+def chart_homography(frame_index, chart_shape):
+    """Homographie image de la charte -> frame, selon la phase de la séquence."""
+    motion_step = min(max(frame_index - STATIC_FRAMES, 0), MOVING_FRAMES)
+    chart_height, chart_width = chart_shape[:2]
+    scale = 0.6 * (1 + 0.001 * motion_step)
+    angle = np.deg2rad(0.05 * motion_step)
+    center_x = 700 + 1.5 * motion_step
+    center_y = 300 + 0.5 * motion_step
+    if frame_index == 2 * STATIC_FRAMES + MOVING_FRAMES:
+        center_x += JUMP_OFFSET[0]
+        center_y += JUMP_OFFSET[1]
+    to_center = np.array([[1, 0, -chart_width / 2], [0, 1, -chart_height / 2], [0, 0, 1]])
+    rotation_scale = np.array([[scale * np.cos(angle), -scale * np.sin(angle), 0],
+                               [scale * np.sin(angle), scale * np.cos(angle), 0], [0, 0, 1]])
+    # Légère perspective: la charte n'est pas face à la caméra
+    perspective = np.array([[1, 0, 0], [0, 1, 0], [0.00008, 0.00004, 1]])
+    to_frame = np.array([[1, 0, center_x], [0, 1, center_y], [0, 0, 1]])
+    return to_frame @ perspective @ rotation_scale @ to_center
+
+
+def build_sequence():
+    """Frames de la séquence et coins réels (4, 2) de la charte dans chaque frame."""
+    rng = np.random.default_rng(0)
+    chart_image = build_chart_image()
+    background = build_background(rng)
+    chart_height, chart_width = chart_image.shape[:2]
+    chart_corners = np.array([[0, 0], [chart_width - 1, 0], [chart_width - 1, chart_height - 1],
+                              [0, chart_height - 1]], dtype=np.float64).reshape(-1, 1, 2)
+    chart_mask = np.full(chart_image.shape[:2], 255, dtype=np.uint8)
+
+    frames, true_corners = [], []
+    for frame_index in range(2 * STATIC_FRAMES + MOVING_FRAMES + 1):
+        homography = chart_homography(frame_index, chart_image.shape)
+        chart_projected = cv2.warpPerspective(chart_image, homography, FRAME_SIZE)
+        mask_projected = cv2.warpPerspective(chart_mask, homography, FRAME_SIZE)
+        frame = np.where(mask_projected[..., None] > 127, chart_projected, background)
+        sensor_noise = rng.normal(0, SENSOR_NOISE, frame.shape)
+        frames.append(np.clip(frame + sensor_noise, 0, 255).astype(np.uint8))
+        true_corners.append(cv2.perspectiveTransform(chart_corners, homography).reshape(4, 2))
+    return frames, true_corners
+
+
+def corner_error(true_corners):
+    """Erreur moyenne des coins (pixels) de la géométrie enregistrée dans le cache."""
+    estimated_corners = detector.compute_chart_corners(detector.load_chart_geometry())
+    return float(np.mean(np.linalg.norm(estimated_corners - true_corners, axis=1)))
+
+
+def run_sequence(frames, true_corners, locate_chart):
+    """Localise la charte sur chaque frame; retourne (ms par frame, erreurs des coins, échecs)."""
+    errors, failures = [], 0
+    elapsed = 0.0
+    for frame, frame_corners in zip(frames, true_corners):
+        start_time = time.perf_counter()
+        try:
+            locate_chart(frame)
+        except ValueError:
+            failures += 1
+            continue
+        finally:
+            elapsed += time.perf_counter() - start_time
+        errors.append(corner_error(frame_corners))
+    return elapsed * 1000 / len(frames), np.array(errors), failures
+
+
+def main():
+    detector.CACHE_FILE_PATH = os.path.join(tempfile.mkdtemp(), "macbeth_cache.json")
+    frames, true_corners = build_sequence()
+    print(f"{len(frames)} frames: {STATIC_FRAMES} immobiles, {MOVING_FRAMES} en mouvement, "
+          f"{STATIC_FRAMES} immobiles, 1 saut de {JUMP_OFFSET} pixels")
+
+    detection_ms, detection_errors, detection_failures = run_sequence(
+        frames, true_corners, detector.detect_macbeth_in_scene)
+    print(f"  détection complète:  {detection_ms:6.2f} ms/frame, erreur des coins "
+          f"{detection_errors.mean():.2f} px (max {detection_errors.max():.2f}), {detection_failures} échec(s)")
+
+    detector.chart_tracker = detector.create_chart_tracker()
+    tracking_ms, tracking_errors, tracking_failures = run_sequence(
+        frames, true_corners, detector.locate_macbeth)
+    tracking_stats = detector.get_chart_tracking_stats()
+    print(f"  suivi + repli:       {tracking_ms:6.2f} ms/frame, erreur des coins "
+          f"{tracking_errors.mean():.2f} px (max {tracking_errors.max():.2f}), {tracking_failures} échec(s)")
+    print(f"  {tracking_stats['tracked_frames']} frames suivies (dont {tracking_stats['static_frames']} immobiles), "
+          f"{tracking_stats['rejected_frames']} rejetées, "
+          f"{len(frames) - tracking_stats['tracked_frames']} détections complètes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark du cache des paramètres de correction avec des mesures bruitées.
+
+Alterne entre quelques états d'éclairage (gains BGR appliqués aux couleurs
+de la charte du cache Macbeth) et mesure les 24 patchs avec un bruit de
+capteur à chaque recalibration. Deux états sont proches: leur écart est
+juste au-dessus de COLOR_DRIFT_DELTA_E_THRESHOLD, le cache ne doit pas les
+confondre. Pour plusieurs niveaux de bruit, compare:
+- l'ancienne clé (mesure quantifiée par pas de 4 niveaux, égalité exacte),
+  reproduite ici
+- la recherche de l'état le plus proche en ΔE moyen (calculer_correction)
+
+Pour chaque méthode: proportion de recalibrations servies par le cache,
+proportion servies par l'état d'un autre éclairage, ΔE moyen des patchs
+corrigés (éclairage réel, sans bruit) par rapport aux couleurs de
+référence, et temps moyen par recalibration.
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_correction_cache.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.color_config import MACBETH_REFERENCE_COLORS, COLOR_DRIFT_DELTA_E_THRESHOLD
+import src.macbeth_nonlinear_color_correction as correction
+from src.color_drift_monitor import bgr_to_lab
+from benchmark_lut_correction import load_cached_colors
+
+RECALIBRATION_COUNT = 200
+MEASUREMENT_NOISES = (0.5, 1.0, 1.5, 2.5)  # Bruit de mesure des patchs (niveaux [0-255])
+LEGACY_QUANTIZATION = 4
+# Gains BGR des états d'éclairage; le dernier est proche du premier
+LIGHTING_STATES = [(1.0, 1.0, 1.0), (0.8, 0.85, 0.95), (1.1, 1.0, 0.85), (0.65, 0.7, 0.7), (1.0, 1.0, 1.0)]
+
+
+def calibrate_near_state(base_colors):
+    """Ajuste le gain du dernier état pour qu'il soit juste au-dessus du seuil de dérive du premier."""
+    first_lab = bgr_to_lab(base_colors * 255)
+    for gain in np.arange(1.0, 1.5, 0.005):
+        if np.mean(np.linalg.norm(bgr_to_lab(np.clip(base_colors * 255 * gain, 0, 255)) - first_lab, axis=1)) \
+                > 1.2 * COLOR_DRIFT_DELTA_E_THRESHOLD:
+            LIGHTING_STATES[-1] = (gain, gain, gain)
+            return gain
+    return None
+
+
+def corrected_delta_e(correction_params, state_colors):
+    """ΔE moyen des patchs de l'éclairage réel corrigés par des paramètres."""
+    predict = correction.active_correction_model['predict']
+    corrected = np.clip(predict(np.asarray(correction_params), state_colors.astype(np.float32)), 0, 1) * 255
+    reference_lab = bgr_to_lab(np.array(MACBETH_REFERENCE_COLORS, dtype=np.float64))
+    return float(np.mean(np.linalg.norm(bgr_to_lab(corrected) - reference_lab, axis=1)))
+
+
+def reset_cache():
+    """Vide le cache et ses compteurs."""
+    correction.correction_cache.clear()
+    for stat_name in correction.correction_cache_stats:
+        correction.correction_cache_stats[stat_name] = 0
+    correction.last_correction_params = correction.target_correction_params = None
+
+
+def run_sequence(base_colors, measurement_noise, legacy):
+    """
+    Enchaîne RECALIBRATION_COUNT recalibrations sur des états d'éclairage tirés au hasard.
+
+    Returns:
+        dict: hit_rate, wrong_hit_rate, delta_e (patchs corrigés) et time_ms (par recalibration)
+    """
+    rng = np.random.default_rng(0)
+    current_measurement = {}
+    correction.get_average_colors = lambda frame, detect_squares: [
+        tuple(color) for color in current_measurement['colors']]
+    reset_cache()
+    legacy_cache = {}
+    fitted_states = {}
+    hits = wrong_hits = 0
+    delta_e_sum = elapsed = 0.0
+    for _ in range(RECALIBRATION_COUNT):
+        state_index = int(rng.integers(len(LIGHTING_STATES)))
+        state_colors = np.clip(base_colors * np.array(LIGHTING_STATES[state_index]), 0, 1)
+        current_measurement['colors'] = np.clip(
+            np.rint(state_colors * 255 + rng.normal(0, measurement_noise, state_colors.shape)), 0, 255).astype(int)
+
+        start_time = time.perf_counter()
+        if legacy:
+            cache_key = np.rint(current_measurement['colors'] / LEGACY_QUANTIZATION).astype(np.int16).tobytes()
+            cached = legacy_cache.get(cache_key)
+            if cached is None:
+                correction.COLOR_CORRECTION_CACHE_SIZE = 0
+                correction_params, _ = correction.calculer_correction(None, False)
+                legacy_cache[cache_key] = (correction_params, state_index)
+            else:
+                correction_params, _ = cached
+        else:
+            correction.COLOR_CORRECTION_CACHE_SIZE = len(LIGHTING_STATES) * 2
+            hits_before = correction.correction_cache_stats['hits']
+            correction_params, _ = correction.calculer_correction(None, False)
+            cached = correction.correction_cache_stats['hits'] > hits_before
+        elapsed += time.perf_counter() - start_time
+
+        if cached:
+            hits += 1
+            source_state = cached[1] if legacy else fitted_states[id(correction_params)]
+            wrong_hits += source_state != state_index
+        else:
+            fitted_states[id(correction_params)] = state_index
+        delta_e_sum += corrected_delta_e(correction_params, state_colors)
+
+    return {
+        'hit_rate': hits / RECALIBRATION_COUNT,
+        'wrong_hit_rate': wrong_hits / RECALIBRATION_COUNT,
+        'delta_e': delta_e_sum / RECALIBRATION_COUNT,
+        'time_ms': elapsed * 1000 / RECALIBRATION_COUNT
+    }
+
+
+def main():
+    correction.COLOR_CORRECTION_LUT_SIZE = 0
+    base_colors = load_cached_colors()
+    near_gain = calibrate_near_state(base_colors)
+    correction.calibrer_transformation_non_lineaire(base_colors, np.array(MACBETH_REFERENCE_COLORS) / 255.0)
+
+    print(f"{RECALIBRATION_COUNT} recalibrations sur {len(LIGHTING_STATES)} états d'éclairage "
+          f"(état proche: gain {near_gain:.3f}), tolérance du cache ΔE {correction.COLOR_CORRECTION_CACHE_DELTA_E}")
+    print(f"  {'bruit':>5} {'méthode':>12} {'cache':>6} {'autre état':>10} {'ΔE corrigé':>10} {'ms':>6}")
+    for measurement_noise in MEASUREMENT_NOISES:
+        for method_name, legacy in (("clé exacte", True), ("plus proche", False)):
+            result = run_sequence(base_colors, measurement_noise, legacy)
+            print(f"  {measurement_noise:>5} {method_name:>12} {result['hit_rate']:>6.0%} "
+                  f"{result['wrong_hit_rate']:>10.0%} {result['delta_e']:>10.2f} {result['time_ms']:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark des modèles de correction des couleurs.
+
+Pour chaque modèle de color_correction_models, sur les carrés du cache
+Macbeth:
+- temps d'ajustement des paramètres
+- ΔE (CIE76, Lab) entre couleurs corrigées et cibles sur les 24 patchs,
+  et ΔE en validation croisée (chaque patch prédit par un ajustement sur
+  les 23 autres), qui révèle le surajustement des modèles à nombreux termes
+- coût par frame 1280x720 de la correction directe (sans LUT)
+- coût de construction de la LUT 3D et de son application, identique pour
+  tous les modèles une fois la table construite
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_correction_models.py
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.color_config import COLOR_CORRECTION_LUT_SIZE, MACBETH_REFERENCE_COLORS
+from src.color_correction_models import CORRECTION_MODELS
+from src.macbeth_nonlinear_color_correction import construire_lut_correction, appliquer_lut_correction
+from benchmark_lut_correction import load_cached_colors, build_test_frame, time_call
+
+
+def delta_e(colors_predicted, colors_target):
+    """ΔE CIE76 par patch entre deux ensembles de couleurs BGR normalisées (n,3)."""
+    lab_predicted = cv2.cvtColor(np.clip(colors_predicted, 0, 1).astype(np.float32).reshape(-1, 1, 3),
+                                 cv2.COLOR_BGR2Lab)
+    lab_target = cv2.cvtColor(colors_target.astype(np.float32).reshape(-1, 1, 3), cv2.COLOR_BGR2Lab)
+    return np.linalg.norm((lab_predicted - lab_target).reshape(-1, 3), axis=1)
+
+
+def leave_one_out_delta_e(correction_model, colors_measured, colors_target):
+    """ΔE moyen de chaque patch prédit par un modèle ajusté sur les autres."""
+    patch_errors = []
+    for patch_index in range(len(colors_measured)):
+        kept = np.arange(len(colors_measured)) != patch_index
+        model_params = correction_model['fit'](colors_measured[kept], colors_target[kept])
+        patch_errors.append(delta_e(correction_model['predict'](model_params, colors_measured[~kept]),
+                                    colors_target[~kept])[0])
+    return float(np.mean(patch_errors))
+
+
+def main():
+    colors_measured = load_cached_colors()
+    colors_target = np.array(MACBETH_REFERENCE_COLORS, dtype=np.float64) / 255.0
+    frame = build_test_frame()
+    frame_corrected = np.empty_like(frame)
+
+    print(f"{'Modèle':<16}{'ajust. ms':>10}{'ΔE moy':>8}{'ΔE max':>8}{'ΔE croisé':>11}"
+          f"{'direct ms':>11}{'LUT ms':>8}{'LUT/frame ms':>14}")
+    for model_name in sorted(CORRECTION_MODELS, key=lambda name: name != 'gamma'):
+        correction_model = CORRECTION_MODELS[model_name]
+        fit_ms = time_call(lambda: correction_model['fit'](colors_measured, colors_target))
+        model_params = correction_model['fit'](colors_measured, colors_target)
+        patch_errors = delta_e(correction_model['predict'](model_params, colors_measured), colors_target)
+        cross_error = leave_one_out_delta_e(correction_model, colors_measured, colors_target)
+
+        direct_ms = time_call(lambda: correction_model['apply'](frame, model_params), repeats=5)
+        lut_build_ms = time_call(lambda: construire_lut_correction(model_params, COLOR_CORRECTION_LUT_SIZE,
+                                                                   correction_model), repeats=3)
+        correction_lut = construire_lut_correction(model_params, COLOR_CORRECTION_LUT_SIZE, correction_model)
+        lut_apply_ms = time_call(lambda: appliquer_lut_correction(frame, correction_lut, frame_corrected))
+
+        print(f"{model_name:<16}{fit_ms:>10.2f}{patch_errors.mean():>8.2f}{patch_errors.max():>8.2f}"
+              f"{cross_error:>11.2f}{direct_ms:>11.2f}{lut_build_ms:>8.1f}{lut_apply_ms:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Benchmark du lissage temporel de la correction des couleurs.
+
+Simule une dérive lente de l'éclairage (gain sinusoïdal par canal) sur la
+charte du cache Macbeth, avec une mesure bruitée des patchs à chaque
+recalibration, et corrige une image des 24 patchs frame par frame par
+corriger_image. Pour plusieurs intervalles de recalibration et poids de
+lissage (COLOR_CORRECTION_SMOOTHING, 1 = échange immédiat):
+- ΔE moyen (CIE76) entre patchs corrigés et couleurs de référence
+- saut de couleur entre deux frames consécutives (p99 et max du ΔE par patch)
+- changements de classe de couleur (detect_dominant_color) d'une frame à
+  l'autre, pour 1000 frames, et proportion de patchs mal classés par rapport
+  aux couleurs de référence
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_correction_smoothing.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.color_config import MACBETH_REFERENCE_COLORS
+import src.macbeth_nonlinear_color_correction as correction
+from src.color_detector import detect_dominant_color
+from src.color_drift_monitor import bgr_to_lab
+from src.video_processor import initialize_color_masks, warmup_kernels
+from benchmark_lut_correction import load_cached_colors
+
+FRAME_COUNT = 3000
+RECALIBRATION_INTERVALS = (30, 300, 1000)
+SMOOTHING_WEIGHTS = (1.0, 0.1, 0.03)
+LIGHTING_AMPLITUDE = 0.12      # Variation relative maximale du gain de chaque canal
+LIGHTING_PERIOD = 1500         # Période de la dérive (frames)
+MEASUREMENT_NOISE = 2.5        # Bruit de mesure des patchs (niveaux [0-255])
+PATCH_SIZE = 8                 # Côté d'un patch dans l'image corrigée (pixels)
+
+
+def lighting_gains(frame_index):
+    """Gains BGR de l'éclairage simulé pour une frame."""
+    phases = np.array([0.0, 2.1, 4.2])
+    return 1 + LIGHTING_AMPLITUDE * np.sin(2 * np.pi * frame_index / LIGHTING_PERIOD + phases)
+
+
+def build_patch_frame(patch_colors):
+    """Image (4*PATCH_SIZE, 6*PATCH_SIZE, 3) uint8 des 24 patchs, dans l'ordre de la charte."""
+    patch_grid = np.clip(patch_colors, 0, 255).astype(np.uint8).reshape(4, 6, 1, 1, 3)
+    patch_grid = np.broadcast_to(patch_grid, (4, 6, PATCH_SIZE, PATCH_SIZE, 3))
+    return np.ascontiguousarray(patch_grid.transpose(0, 2, 1, 3, 4).reshape(4 * PATCH_SIZE, 6 * PATCH_SIZE, 3))
+
+
+def read_patch_colors(frame):
+    """Couleurs moyennes (24, 3) des patchs d'une image construite par build_patch_frame."""
+    return frame.reshape(4, PATCH_SIZE, 6, PATCH_SIZE, 3).mean(axis=(1, 3)).reshape(24, 3)
+
+
+def classify_patches(frame):
+    """Classe de couleur (detect_dominant_color) de chaque patch."""
+    return [detect_dominant_color(frame[row * PATCH_SIZE:(row + 1) * PATCH_SIZE,
+                                        column * PATCH_SIZE:(column + 1) * PATCH_SIZE])[0]
+            for row in range(4) for column in range(6)]
+
+
+def reset_correction_state():
+    """Remet le module de correction dans son état initial (aucune calibration)."""
+    correction.last_correction_params = correction.last_correction_lut = None
+    correction.target_correction_params = correction.target_correction_lut = None
+    correction.frame_count = 0
+    for stat_name in correction.recalibration_stats:
+        correction.recalibration_stats[stat_name] = type(correction.recalibration_stats[stat_name])(0)
+
+
+def run_simulation(base_colors, recalibration_interval, smoothing_weight, seed=0):
+    """
+    Corrige FRAME_COUNT frames sous éclairage variable.
+
+    Returns:
+        dict: delta_e (ΔE moyen), jump_p99 et jump_max (ΔE entre frames), flips
+            (changements de classe pour 1000 frames), misclassified (proportion),
+            fits (nombre de calibrations) et frame_ms (temps moyen par frame)
+    """
+    rng = np.random.default_rng(seed)
+    current_measurement = {}
+    correction.get_average_colors = lambda frame, detect_squares: [
+        tuple(color) for color in current_measurement['colors']]
+    correction.COLOR_CORRECTION_INTERVAL = recalibration_interval
+    correction.COLOR_CORRECTION_SMOOTHING = smoothing_weight
+    reset_correction_state()
+
+    reference_colors = np.array(MACBETH_REFERENCE_COLORS, dtype=np.float64)
+    reference_lab = bgr_to_lab(reference_colors)
+    reference_classes = classify_patches(build_patch_frame(reference_colors))
+    delta_e_sum = 0.0
+    jumps = []
+    flips = misclassified = 0
+    previous_lab = previous_classes = None
+    elapsed = 0.0
+    for frame_index in range(FRAME_COUNT):
+        patch_colors = base_colors * 255 * lighting_gains(frame_index)
+        current_measurement['colors'] = np.clip(
+            np.rint(patch_colors + rng.normal(0, MEASUREMENT_NOISE, patch_colors.shape)), 0, 255).astype(int)
+        frame = build_patch_frame(patch_colors)
+
+        start_time = time.perf_counter()
+        frame_corrected = correction.corriger_image(frame, None, False)
+        elapsed += time.perf_counter() - start_time
+
+        corrected_lab = bgr_to_lab(read_patch_colors(frame_corrected))
+        corrected_classes = classify_patches(frame_corrected)
+        delta_e_sum += np.mean(np.linalg.norm(corrected_lab - reference_lab, axis=1))
+        misclassified += sum(label != reference for label, reference in zip(corrected_classes, reference_classes))
+        if previous_lab is not None:
+            jumps.append(np.max(np.linalg.norm(corrected_lab - previous_lab, axis=1)))
+            flips += sum(label != previous for label, previous in zip(corrected_classes, previous_classes))
+        previous_lab, previous_classes = corrected_lab, corrected_classes
+
+    return {
+        'delta_e': delta_e_sum / FRAME_COUNT,
+        'jump_p99': float(np.percentile(jumps, 99)),
+        'jump_max': float(np.max(jumps)),
+        'flips': flips * 1000 / FRAME_COUNT,
+        'misclassified': misclassified / (24 * FRAME_COUNT),
+        'fits': correction.recalibration_stats['count'],
+        'frame_ms': elapsed * 1000 / FRAME_COUNT
+    }
+
+
+def main():
+    initialize_color_masks()
+    warmup_kernels()
+    correction.ASYNC_RECALIBRATION_ENABLED = False
+    correction.COLOR_DRIFT_MONITOR_ENABLED = False
+    correction.COLOR_CORRECTION_CACHE_SIZE = 0
+    base_colors = load_cached_colors()
+
+    print(f"{FRAME_COUNT} frames, dérive ±{LIGHTING_AMPLITUDE:.0%} par canal sur {LIGHTING_PERIOD} frames, "
+          f"bruit de mesure {MEASUREMENT_NOISE} niveaux")
+    print(f"  {'intervalle':>10} {'lissage':>8} {'calib.':>6} {'ΔE moyen':>9} {'saut p99':>9} {'saut max':>9} "
+          f"{'chgts/1000':>10} {'mal classés':>11} {'ms/frame':>9}")
+    for recalibration_interval in RECALIBRATION_INTERVALS:
+        for smoothing_weight in SMOOTHING_WEIGHTS:
+            result = run_simulation(base_colors, recalibration_interval, smoothing_weight)
+            print(f"  {recalibration_interval:>10} {smoothing_weight:>8.2f} {result['fits']:>6} "
+                  f"{result['delta_e']:>9.2f} {result['jump_p99']:>9.2f} {result['jump_max']:>9.2f} "
+                  f"{result['flips']:>10.1f} {result['misclassified']:>11.2%} {result['frame_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
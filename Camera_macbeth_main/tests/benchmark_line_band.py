@@ -0,0 +1,128 @@
+"""
+Benchmark de l'inférence limitée à la bande autour de la ligne de comptage.
+
+Compare le suivi sur la frame complète et sur la bande (LINE_BAND_*):
+- temps moyen de update_tracker par frame
+- rappel des détections de la bande par rapport à la frame complète, pour
+  les personnes dont les pieds sont dans la bande (les seules pouvant franchir)
+- nombre de franchissements de ligne détectés
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_line_band.py [chemin_video]
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.paths_config import ASSETS_DIR
+from config.display_config import line_start, line_end, output_width, output_height
+from config.detection_config import LINE_BAND_IMGSZ
+from src.video_processor import get_resize_matrix
+from src.tracker import (
+    create_tracker,
+    update_tracker,
+    check_line_crossing,
+    mark_person_as_crossed,
+    get_line_band_region
+)
+
+DEFAULT_VIDEO_PATH = os.path.join(ASSETS_DIR, "video", "man_alone.mp4")
+RECALL_IOU_THRESHOLD = 0.5
+
+
+def read_frames(video_path):
+    """Lit et redimensionne toutes les frames de la vidéo."""
+    video_capture = cv2.VideoCapture(video_path)
+    frames = []
+    while True:
+        ret, frame = video_capture.read()
+        if not ret:
+            break
+        matrix = get_resize_matrix(frame.shape)
+        if matrix is not None:
+            frame = cv2.warpAffine(frame, matrix, (output_width, output_height))
+        frames.append(frame)
+    video_capture.release()
+    return frames
+
+
+def run_tracking(frames, detection_region, detection_imgsz):
+    """
+    Exécute le suivi sur toutes les frames.
+
+    Returns:
+        tuple: (temps moyen en ms, boîtes détectées par frame, nombre de franchissements)
+    """
+    tracker_state = create_tracker()
+    tracker_state['detection_imgsz'] = detection_imgsz
+    update_tracker(tracker_state, frames[0], detection_region)  # Chauffe
+    tracker_state = create_tracker()
+    tracker_state['detection_imgsz'] = detection_imgsz
+
+    detected_boxes_per_frame = []
+    crossing_count = 0
+    total_time = 0.0
+    for frame in frames:
+        start_time = time.perf_counter()
+        tracked_persons = update_tracker(tracker_state, frame, detection_region)
+        total_time += time.perf_counter() - start_time
+
+        detected_boxes_per_frame.append(np.array([person['bbox'] for person in tracked_persons
+                                                  if person['frames_disappeared'] == 0]).reshape(-1, 4))
+        for tracked_person in tracked_persons:
+            if check_line_crossing(tracked_person, line_start, line_end):
+                crossing_count += 1
+                mark_person_as_crossed(tracker_state, tracked_person['id'])
+
+    return total_time * 1000 / len(frames), detected_boxes_per_frame, crossing_count
+
+
+def box_iou(first_boxes, second_boxes):
+    """Matrice des IoU entre deux ensembles de boîtes (x1, y1, x2, y2)."""
+    top_left = np.maximum(first_boxes[:, None, :2], second_boxes[None, :, :2])
+    bottom_right = np.minimum(first_boxes[:, None, 2:], second_boxes[None, :, 2:])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    first_area = np.prod(first_boxes[:, 2:] - first_boxes[:, :2], axis=1)
+    second_area = np.prod(second_boxes[:, 2:] - second_boxes[:, :2], axis=1)
+    return intersection / (first_area[:, None] + second_area[None, :] - intersection + 1e-9)
+
+
+def compute_recall(reference_boxes_per_frame, band_boxes_per_frame, band_region):
+    """Rappel de la bande sur les personnes de référence dont les pieds sont dans la bande."""
+    band_x1, band_y1, band_x2, band_y2 = band_region
+    expected_count = 0
+    found_count = 0
+    for reference_boxes, band_boxes in zip(reference_boxes_per_frame, band_boxes_per_frame):
+        feet_x = (reference_boxes[:, 0] + reference_boxes[:, 2]) / 2
+        feet_y = reference_boxes[:, 3]
+        in_band = (feet_x >= band_x1) & (feet_x < band_x2) & (feet_y >= band_y1) & (feet_y < band_y2)
+        expected_boxes = reference_boxes[in_band]
+        expected_count += len(expected_boxes)
+        if len(expected_boxes) and len(band_boxes):
+            found_count += int(np.sum(box_iou(expected_boxes, band_boxes).max(axis=1) >= RECALL_IOU_THRESHOLD))
+    return found_count / expected_count if expected_count else 1.0
+
+
+def main():
+    video_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_VIDEO_PATH
+    frames = read_frames(video_path)
+    band_region = get_line_band_region(line_start, line_end, frames[0].shape)
+    print(f"{len(frames)} frames, bande {band_region}, imgsz {LINE_BAND_IMGSZ}")
+
+    full_ms, full_boxes, full_crossings = run_tracking(frames, None, None)
+    band_ms, band_boxes, band_crossings = run_tracking(frames, band_region, LINE_BAND_IMGSZ)
+    recall = compute_recall(full_boxes, band_boxes, band_region)
+
+    print(f"Frame complète: {full_ms:6.1f} ms/frame, {full_crossings} franchissement(s)")
+    print(f"Bande:          {band_ms:6.1f} ms/frame, {band_crossings} franchissement(s)")
+    print(f"Accélération x{full_ms / band_ms:.2f}, rappel {recall:.1%}")
+
+
+if __name__ == "__main__":
+    main()
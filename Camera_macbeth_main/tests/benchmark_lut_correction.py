@@ -0,0 +1,88 @@
+"""
+Benchmark de la correction Macbeth par LUT 3D.
+
+Compare, sur une frame 1280x720, le noyau de correction actuel (trois pow
+par pixel en float32) à la correction par LUT pour plusieurs tailles de
+grille, et rapporte l'erreur maximale et moyenne par rapport au noyau.
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_lut_correction.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.color_config import MACBETH_REFERENCE_COLORS
+from config.display_config import output_width, output_height
+from config.paths_config import CACHE_FILE_PATH, WARPED_IMAGE_PATH
+from src.macbeth_nonlinear_color_correction import (
+    calibrer_transformation_non_lineaire,
+    appliquer_correction_non_lineaire,
+    construire_lut_correction,
+    appliquer_lut_correction
+)
+
+LUT_SIZES = (17, 33, 65, 256)
+REPEATS = 20
+
+
+def load_cached_colors():
+    """Couleurs moyennes (24, 3) des carrés du cache Macbeth, normalisées [0,1]."""
+    with open(CACHE_FILE_PATH, "r") as f:
+        squares = json.load(f)["squares"]
+    frame_warped = cv2.imread(WARPED_IMAGE_PATH)
+    colors_measured = [cv2.mean(frame_warped[y:y+h, x:x+w])[:3] for (x, y, w, h) in squares]
+    return np.array(colors_measured[::-1]) / 255.0
+
+
+def load_calibration_params():
+    """Calibre les paramètres sur les carrés du cache Macbeth."""
+    colors_target = np.array(MACBETH_REFERENCE_COLORS) / 255.0
+    return calibrer_transformation_non_lineaire(load_cached_colors(), colors_target)
+
+
+def build_test_frame():
+    """Frame de test: moitié image de la charte, moitié couleurs aléatoires."""
+    frame_chart = cv2.resize(cv2.imread(WARPED_IMAGE_PATH), (output_width // 2, output_height))
+    rng = np.random.default_rng(0)
+    frame_random = rng.integers(0, 256, (output_height, output_width - output_width // 2, 3), dtype=np.uint8)
+    return np.ascontiguousarray(np.hstack([frame_chart, frame_random]))
+
+
+def time_call(function, repeats=REPEATS):
+    """Temps moyen d'un appel en millisecondes (après un appel de chauffe)."""
+    function()
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start_time) * 1000 / repeats
+
+
+def main():
+    correction_params = load_calibration_params()
+    frame = build_test_frame()
+
+    reference_ms = time_call(lambda: appliquer_correction_non_lineaire(frame, correction_params))
+    frame_reference = appliquer_correction_non_lineaire(frame, correction_params).astype(np.int16)
+    print(f"Noyau actuel (float32, pow):   {reference_ms:7.2f} ms/frame")
+
+    frame_corrected = np.empty_like(frame)
+    for lut_size in LUT_SIZES:
+        build_ms = time_call(lambda: construire_lut_correction(correction_params, lut_size), repeats=3)
+        correction_lut = construire_lut_correction(correction_params, lut_size)
+        apply_ms = time_call(lambda: appliquer_lut_correction(frame, correction_lut, frame_corrected))
+        error = np.abs(frame_corrected.astype(np.int16) - frame_reference)
+        print(f"LUT {lut_size:3d}³: construction {build_ms:8.2f} ms, application {apply_ms:6.2f} ms/frame "
+              f"(x{reference_ms / apply_ms:4.1f}), erreur max {error.max():3d}, "
+              f"moyenne {error.mean():.3f}, >2 niveaux {np.mean(error > 2):.2%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Benchmark de la reconstitution des 24 carrés de la charte Macbeth.
+
+Part des carrés trouvés par Canny sur l'image redressée du cache Macbeth
+(référence), en retire un nombre croissant au hasard et ajoute un contour
+parasite une fois sur deux, puis compare:
+- l'ancienne reconstitution ligne par ligne (regroupement des lignes à 20
+  pixels près et interpolation des positions x manquantes), reproduite ici
+- l'ajustement de la grille 4x6 (fit_patch_grid)
+
+Pour chaque nombre de carrés retirés: proportion de réussites (24 carrés,
+chacun dans l'ordre de la référence à moins d'un quart de pas de son centre),
+proportion de réussites sans tenir compte de l'ordre (chaque carré de
+référence retrouvé une seule fois), erreur moyenne des centres réussis et
+temps moyen.
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_patch_grid.py
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.paths_config import WARPED_IMAGE_PATH
+import src.macbeth_color_and_rectangle_detector as detector
+
+TRIALS = 200
+MISSING_COUNTS = (0, 1, 3, 6, 10, 14, 18)
+POSITION_JITTER = 1.5  # Écart type du bruit sur la position des carrés détectés (pixels)
+
+
+def detect_squares(frame_warped):
+    """Carrés (x, y, w, h) trouvés par Canny, comme detect_macbeth_in_scene."""
+    frame_edges = cv2.Canny(cv2.cvtColor(frame_warped, cv2.COLOR_BGR2GRAY), 50, 200)
+    contours, _ = cv2.findContours(frame_edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    squares = []
+    for contour in contours:
+        contour_approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(contour_approx) == 4:
+            x, y, w, h = cv2.boundingRect(contour_approx)
+            if w > 10 and h > 10:
+                squares.append((x + 5, y + 20, w - 10, h - 40))
+    return squares
+
+
+def legacy_recover_squares(detected_squares, warped_size):
+    """Ancienne reconstitution ligne par ligne des carrés manquants."""
+    if len(detected_squares) == 24:
+        return detected_squares
+    squares = []
+    detected_squares = sorted(detected_squares, key=lambda s: (s[1], s[0]))
+    rows, current_row, last_y = [], [], None
+    for square in detected_squares:
+        if last_y is None or abs(square[1] - last_y) < 20:
+            current_row.append(square)
+        else:
+            if current_row:
+                rows.append(sorted(current_row, key=lambda s: s[0]))
+                current_row = [square]
+        last_y = square[1]
+    if current_row:
+        rows.append(sorted(current_row, key=lambda s: s[0]))
+    for row in rows:
+        if len(row) < 6:
+            avg_width = sum(s[2] for s in row) / len(row)
+            avg_height = sum(s[3] for s in row) / len(row)
+            spacing = (row[-1][0] - row[0][0]) / 5
+            existing_x = [s[0] for s in row]
+            for pos in [row[0][0] + i * spacing for i in range(6)]:
+                if not any(abs(pos - ex) < avg_width / 2 for ex in existing_x):
+                    row.append((int(pos), row[0][1], int(avg_width), int(avg_height)))
+            row.sort(key=lambda s: s[0])
+        squares.extend(row)
+    return squares
+
+
+def square_centers(squares):
+    """Centres (n, 2) de carrés (x, y, w, h)."""
+    squares = np.array(squares, dtype=np.float64).reshape(-1, 4)
+    return squares[:, :2] + squares[:, 2:] / 2
+
+
+def evaluate(recover, reference_squares, warped_size, missing_count, rng):
+    """Réussites, réussites sans l'ordre, erreurs des centres et temps (s) d'une méthode sur TRIALS tirages."""
+    reference_centers = square_centers(reference_squares)
+    tolerance = 0.25 * np.min(np.abs(np.diff(reference_centers[:6, 0])))
+    successes, unordered_successes, errors, elapsed = 0, 0, [], 0.0
+    for _ in range(TRIALS):
+        kept = rng.permutation(24)[missing_count:]
+        jitter = np.rint(rng.normal(0, POSITION_JITTER, (len(kept), 2))).astype(int)
+        detected = [(x + dx, y + dy, w, h) for (x, y, w, h), (dx, dy) in
+                    zip(np.array(reference_squares)[np.sort(kept)], jitter)]
+        if rng.random() < 0.5:
+            # Contour parasite: cadre intérieur de la charte
+            detected.append((8, 8, warped_size[0] - 16, warped_size[1] - 16))
+        start_time = time.perf_counter()
+        try:
+            squares = recover(detected, warped_size)
+        except ValueError:
+            squares = []
+        elapsed += time.perf_counter() - start_time
+        if len(squares) != 24:
+            continue
+        pair_distances = np.linalg.norm(square_centers(squares)[:, None] - reference_centers[None], axis=2)
+        if np.all((pair_distances < tolerance).sum(axis=0) == 1) and np.all((pair_distances < tolerance).sum(axis=1) == 1):
+            unordered_successes += 1
+        center_errors = np.linalg.norm(square_centers(squares) - reference_centers, axis=1)
+        if np.all(center_errors < tolerance):
+            successes += 1
+            errors.extend(center_errors)
+    return (successes / TRIALS, unordered_successes / TRIALS, float(np.mean(errors)) if errors else float('nan'),
+            elapsed / TRIALS)
+
+
+def main():
+    frame_warped = cv2.imread(WARPED_IMAGE_PATH)
+    warped_size = (frame_warped.shape[1], frame_warped.shape[0])
+    reference_squares = detect_squares(frame_warped)
+    print(f"{len(reference_squares)} carrés de référence, {TRIALS} tirages par cas, "
+          f"bruit de position {POSITION_JITTER} px, contour parasite une fois sur deux")
+    print(f"  {'retirés':>7} {'méthode':>14} {'réussite':>8} {'sans ordre':>10} {'erreur px':>9} {'µs':>7}")
+    for missing_count in MISSING_COUNTS:
+        for method_name, recover in (("ligne à ligne", legacy_recover_squares), ("grille 4x6", detector.fit_patch_grid)):
+            success_rate, unordered_rate, mean_error, mean_time = evaluate(
+                recover, reference_squares, warped_size, missing_count, np.random.default_rng(missing_count))
+            print(f"  {missing_count:>7} {method_name:>14} {success_rate:>8.0%} {unordered_rate:>10.0%} {mean_error:>9.2f} "
+                  f"{mean_time * 1e6:>7.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark de la mesure des couleurs des patchs de la charte Macbeth.
+
+Projette l'image redressée du cache Macbeth dans des frames 1280x720 par des
+homographies connues (échelles, rotations et perspectives variées), avec un
+bruit de capteur, et compare deux mesures des 24 patchs à partir de la
+géométrie exacte:
+- redressement de la frame (cv2.warpPerspective) puis moyenne de chaque
+  rectangle, comme avant measure_patch_colors
+- moyenne sous le quadrilatère projeté de chaque patch, sur la frame
+  (measure_patch_colors)
+
+Pour chaque méthode: temps moyen par mesure et écart (niveaux [0-255], moyen
+et maximal) aux couleurs moyennes des patchs de l'image d'origine.
+
+Utilisation (depuis Camera_macbeth_main):
+    python tests/benchmark_patch_sampling.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.paths_config import CACHE_FILE_PATH
+import src.macbeth_color_and_rectangle_detector as detector
+from benchmark_chart_tracking import FRAME_SIZE, BORDER_WIDTH, SENSOR_NOISE, build_chart_image, build_background
+
+REPETITIONS = 50
+# (échelle, rotation en degrés, perspective x, perspective y)
+VIEWS = [(1.0, 0.0, 0.0, 0.0), (0.6, 3.0, 0.00008, 0.00004), (0.4, -8.0, -0.0002, 0.0001), (1.4, 12.0, 0.0001, -0.0002)]
+
+
+def view_homography(view, chart_shape):
+    """Homographie image de la charte (avec cadre) -> frame, centrée dans la frame."""
+    scale, angle_degrees, perspective_x, perspective_y = view
+    chart_height, chart_width = chart_shape[:2]
+    angle = np.deg2rad(angle_degrees)
+    to_center = np.array([[1, 0, -chart_width / 2], [0, 1, -chart_height / 2], [0, 0, 1]])
+    rotation_scale = np.array([[scale * np.cos(angle), -scale * np.sin(angle), 0],
+                               [scale * np.sin(angle), scale * np.cos(angle), 0], [0, 0, 1]])
+    perspective = np.array([[1, 0, 0], [0, 1, 0], [perspective_x, perspective_y, 1]])
+    to_frame = np.array([[1, 0, FRAME_SIZE[0] / 2], [0, 1, FRAME_SIZE[1] / 2], [0, 0, 1]])
+    return to_frame @ perspective @ rotation_scale @ to_center
+
+
+def warp_and_mean(frame, chart_geometry):
+    """Mesure des patchs par redressement de la frame."""
+    frame_warped = cv2.warpPerspective(frame, chart_geometry["perspective_matrix"], chart_geometry["warped_size"])
+    return [tuple(int(v) for v in cv2.mean(frame_warped[y:y+h, x:x+w])[:3])
+            for (x, y, w, h) in chart_geometry["squares"]]
+
+
+def time_measure(measure, frame, chart_geometry):
+    """Temps moyen (ms) et couleurs mesurées."""
+    start_time = time.perf_counter()
+    for _ in range(REPETITIONS):
+        colors = measure(frame, chart_geometry)
+    return (time.perf_counter() - start_time) * 1000 / REPETITIONS, np.array(colors, dtype=np.float64)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    chart_image = build_chart_image()
+    background = build_background(rng)
+    with open(CACHE_FILE_PATH, "r") as f:
+        squares = [tuple(square) for square in json.load(f)["squares"]]
+    chart_warped = chart_image[BORDER_WIDTH:-BORDER_WIDTH, BORDER_WIDTH:-BORDER_WIDTH]
+    true_colors = np.array([cv2.mean(chart_warped[y:y+h, x:x+w])[:3] for (x, y, w, h) in squares])
+    chart_mask = np.full(chart_image.shape[:2], 255, dtype=np.uint8)
+    border_offset = np.array([[1, 0, BORDER_WIDTH], [0, 1, BORDER_WIDTH], [0, 0, 1]], dtype=np.float64)
+
+    print(f"{len(VIEWS)} vues, {REPETITIONS} mesures chacune, bruit {SENSOR_NOISE} niveaux")
+    print(f"  {'vue (éch., rot., persp.)':>34} {'méthode':>12} {'ms':>6} {'écart moy.':>10} {'écart max':>9}")
+    for view in VIEWS:
+        homography = view_homography(view, chart_image.shape)
+        chart_projected = cv2.warpPerspective(chart_image, homography, FRAME_SIZE)
+        mask_projected = cv2.warpPerspective(chart_mask, homography, FRAME_SIZE)
+        frame = np.where(mask_projected[..., None] > 127, chart_projected, background)
+        frame = np.clip(frame + rng.normal(0, SENSOR_NOISE, frame.shape), 0, 255).astype(np.uint8)
+        chart_geometry = {
+            "squares": squares,
+            "perspective_matrix": np.linalg.inv(homography @ border_offset),
+            "source_shape": frame.shape[:2],
+            "warped_size": (chart_warped.shape[1], chart_warped.shape[0])
+        }
+        for method_name, measure in (("redressement", warp_and_mean), ("polygones", detector.measure_patch_colors)):
+            elapsed_ms, colors = time_measure(measure, frame, chart_geometry)
+            errors = np.abs(colors - true_colors)
+            print(f"  {str(view):>34} {method_name:>12} {elapsed_ms:6.3f} {errors.mean():10.2f} {errors.max():9.2f}")
+
+
+if __name__ == "__main__":
+    main()